@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from somaapp.models import ShardedCounter
+from somaapp.utilities.cache_utils import bump_feed_version
+from somaapp.utilities.sharded_counter_utils import compact_counter
+from somaapp.utilities.vote_utils import PENDING_VOTE_KINDS
+
+
+class Command(BaseCommand):
+    help = 'Fold sharded counters into their model columns (run periodically, e.g. every minute from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', help='Only compact counters of this kind (e.g. impressions)')
+
+    def handle(self, *args, **options):
+        counters = ShardedCounter.objects.all()
+        if options['kind']:
+            counters = counters.filter(name__startswith=f"{options['kind']}:")
+        names = list(counters.values_list('name', flat=True).distinct().order_by('name'))
+
+        folded = 0
+        for name in names:
+            total = compact_counter(name)
+            folded += total
+            self.stdout.write(f"{name}: folded {total}")
+
+        # Post vote totals are rendered in cached pages
+        if any(name.startswith(tuple(f"{kind}:" for kind in PENDING_VOTE_KINDS.values())) for name in names):
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(f"Compacted {len(names)} counters ({folded} counted)"))
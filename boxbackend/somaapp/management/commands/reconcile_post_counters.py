@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from somaapp.models import Post, PostCounter
+from somaapp.utilities.counter_utils import ALL_POSTS_KEY, get_user_posts_key
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized post counters from the Post table and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        # The real counts, computed with two grouped queries
+        expected = {ALL_POSTS_KEY: Post.objects.count()}
+        per_user = Post.objects.filter(is_anonymous=False).values('user').annotate(total=Count('id'))
+        for row in per_user:
+            expected[get_user_posts_key(row['user'])] = row['total']
+
+        stored = dict(PostCounter.objects.values_list('key', 'count'))
+
+        # Counters that are wrong or missing, and counters for users with no posts left
+        drifted = {key: count for key, count in expected.items() if stored.get(key) != count}
+        stale = [key for key in stored if key not in expected]
+
+        for key, count in drifted.items():
+            self.stdout.write(f"{key}: {stored.get(key)} -> {count}")
+        for key in stale:
+            self.stdout.write(f"{key}: {stored[key]} -> removed")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {len(drifted)} counters drifted, {len(stale)} stale"))
+            return
+
+        with transaction.atomic():
+            PostCounter.objects.filter(key__in=stale).delete()
+            for key, count in drifted.items():
+                PostCounter.objects.update_or_create(key=key, defaults={'count': count})
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(drifted)} counters, removed {len(stale)} stale counters"))
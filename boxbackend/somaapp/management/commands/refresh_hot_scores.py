@@ -0,0 +1,40 @@
+import datetime
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from somaapp.models import Post
+from somaapp.utilities.cache_utils import bump_feed_version
+from somaapp.utilities.ranking_utils import compute_hot_score
+
+
+class Command(BaseCommand):
+    help = 'Recompute decayed hot scores for recent posts (run periodically, e.g. every 10 minutes from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, default=7,
+                            help='Only refresh posts newer than this; older scores are already negligible (0 = all posts)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts loaded and updated per batch')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        posts = Post.objects.only('id', 'upvotes', 'downvotes', 'comment_count', 'created_at', 'hot_score').order_by('id')
+        if options['max_age_days']:
+            posts = posts.filter(created_at__gte=now - datetime.timedelta(days=options['max_age_days']))
+
+        # Walk the posts by primary key so each batch is a cheap range scan
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                post.hot_score = compute_hot_score(post.upvotes, post.downvotes, post.comment_count, post.created_at, now)
+            Post.objects.bulk_update(batch, ['hot_score'])
+            updated += len(batch)
+            last_id = batch[-1].id
+
+        # Hot feed pages cached before the sweep are now out of order
+        bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed hot scores for {updated} posts"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from somaapp.utilities.impression_utils import rollup_impressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll daily impressions up into monthly totals and delete hourly buckets past the retention period '
+        '(idempotent; run periodically, e.g. hourly from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int,
+                            help='Days of hourly buckets to keep (defaults to IMPRESSIONS_HOURLY_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        months, pruned = rollup_impressions(options['retention_days'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {months} monthly rollups, deleted {pruned} hourly buckets"))
@@ -0,0 +1,384 @@
+import contextlib
+import datetime
+import json
+import random
+import time
+import uuid
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from somaapp.models import User, Post, PostVote, Comment, Parties, Candidates
+from somaapp.utilities.cache_utils import bump_feed_version
+from somaapp.utilities.ranking_utils import compute_hot_score
+
+
+# Words used to build post and comment text
+WORDS = (
+    'campus vote party candidate manifesto student council election debate support policy '
+    'library residence transport fees meeting rally results campaign union sports society '
+    'budget exam lecture faculty change future promise agree disagree today tomorrow'
+).split()
+
+STRUCTURES = ['SRC', 'Faculty Council', 'Residence Council', 'Sports Council', 'Societies Council']
+
+
+@contextlib.contextmanager
+def explicit_timestamps(model, *field_names):
+    """Let bulk_create keep the timestamps we generate instead of auto_now/auto_now_add"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate (or import from JSON Lines) users, parties, candidates and posts with bulk_create. '
+        'Example: manage.py seed_data --users 100000 --posts 5000000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Number of users to generate')
+        parser.add_argument('--parties', type=int, default=0, help='Number of parties to generate')
+        parser.add_argument('--candidates', type=int, default=0, help='Number of candidates to generate')
+        parser.add_argument('--posts', type=int, default=0, help='Number of posts to generate')
+        parser.add_argument('--import-file', help='JSON Lines file to import instead of generating (see import_file)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--days', type=int, default=365, help='Spread generated posts over this many days')
+        parser.add_argument('--comments-mean', type=float, default=2.0, help='Mean number of comments per post')
+        parser.add_argument('--votes-mean', type=float, default=5.0, help='Mean number of upvotes per post (each from a distinct user)')
+        parser.add_argument('--vote-distribution', choices=['exponential', 'pareto', 'uniform'], default='pareto',
+                            help='Shape of the per-post vote distribution (pareto gives a few viral posts)')
+        parser.add_argument('--anonymous-ratio', type=float, default=0.1, help='Share of anonymous posts')
+        parser.add_argument('--max-parties-per-post', type=int, default=2, help='Parties linked to each post (0..N)')
+        parser.add_argument('--password', default='password123', help='Password for every generated user (hashed once)')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible datasets')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Hash once and reuse: one PBKDF2 run instead of one per user
+        self.password_hash = make_password(options['password'])
+        started = time.monotonic()
+
+        if options['import_file']:
+            self.import_file(options['import_file'])
+        else:
+            # A per-run tag keeps usernames and emails unique across repeated runs
+            tag = uuid.uuid4().hex[:6]
+            user_ids = self.generate_users(options['users'], tag)
+            party_ids = self.generate_parties(options['parties'], tag)
+            self.generate_candidates(options['candidates'], tag)
+            if options['posts']:
+                user_ids = user_ids or list(User.objects.values_list('id', flat=True))
+                party_ids = party_ids or list(Parties.objects.values_list('id', flat=True))
+                if not user_ids:
+                    raise CommandError('Posts need authors: pass --users or seed users first')
+                self.generate_posts(options['posts'], user_ids, party_ids, options)
+
+        # Derived data: maintained post counters and the feed cache
+        call_command('reconcile_post_counters', stdout=self.stdout)
+        bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(f"Seeding finished in {time.monotonic() - started:.1f}s"))
+
+    # Generators
+
+    def sentence(self, min_words, max_words):
+        words = self.random.choices(WORDS, k=self.random.randint(min_words, max_words))
+        return ' '.join(words).capitalize() + '.'
+
+    def sample_votes(self, mean, distribution):
+        if mean <= 0:
+            return 0
+        if distribution == 'uniform':
+            return self.random.randint(0, int(2 * mean))
+        if distribution == 'pareto':
+            # Shape 1.5 has mean 3 (minimum 1), scaled so the mean is `mean`
+            return int((self.random.paretovariate(1.5) - 1) * mean / 2)
+        return int(self.random.expovariate(1 / mean))
+
+    def bulk_insert(self, model, rows, label):
+        """bulk_create rows in batches; returns the created primary keys"""
+        ids = []
+        for start in range(0, len(rows), self.batch_size):
+            created = model.objects.bulk_create(rows[start:start + self.batch_size], batch_size=self.batch_size)
+            ids.extend(obj.pk for obj in created)
+        self.stdout.write(f"Created {len(ids)} {label}")
+        return ids
+
+    def generate_users(self, count, tag):
+        ids = []
+        now = timezone.now()
+        for start in range(0, count, self.batch_size):
+            rows = [
+                User(
+                    username=f"u{tag}_{i}",
+                    email=f"u{tag}_{i}@seed.example.com",
+                    full_name=self.sentence(2, 3).rstrip('.'),
+                    password=self.password_hash,
+                    is_email_verified=True,
+                    structure=self.random.choice(STRUCTURES),
+                    date_joined=now - datetime.timedelta(seconds=self.random.randint(0, 365 * 86400)),
+                )
+                for i in range(start, min(start + self.batch_size, count))
+            ]
+            ids.extend(obj.pk for obj in User.objects.bulk_create(rows))
+        if count:
+            self.stdout.write(f"Created {len(ids)} users")
+        return ids
+
+    def generate_parties(self, count, tag):
+        rows = [
+            Parties(
+                party_name=f"Party {tag} {i}",
+                manifesto=self.sentence(20, 60),
+                party_leader=self.sentence(2, 3).rstrip('.'),
+                structure=self.random.choice(STRUCTURES),
+                votes=self.sample_votes(100, 'pareto'),
+            )
+            for i in range(count)
+        ]
+        return self.bulk_insert(Parties, rows, 'parties') if rows else []
+
+    def generate_candidates(self, count, tag):
+        rows = [
+            Candidates(
+                candidate_name=f"Candidate {tag} {i}",
+                manifesto=self.sentence(20, 60),
+                department=self.random.choice(['President', 'Secretary', 'Treasurer', 'Sports', 'Academics']),
+                structure=self.random.choice(STRUCTURES),
+                votes=self.sample_votes(50, 'pareto'),
+            )
+            for i in range(count)
+        ]
+        return self.bulk_insert(Candidates, rows, 'candidates') if rows else []
+
+    def generate_comments(self, mean, user_ids, created_at):
+        count = int(self.random.expovariate(1 / mean)) if mean > 0 else 0
+        return [
+            Comment(
+                user_id=self.random.choice(user_ids),
+                text=self.sentence(3, 20),
+                created_at=created_at + datetime.timedelta(minutes=n + 1),
+            )
+            for n in range(count)
+        ]
+
+    def insert_comments(self, posts):
+        """bulk_create the comments attached to freshly inserted posts"""
+        comments = []
+        for post in posts:
+            for comment in post.seed_comments:
+                comment.post_id = post.pk
+                comments.append(comment)
+        Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+
+    def generate_votes(self, upvotes, downvotes, user_ids):
+        """Ledger rows for a post's votes, each from a distinct user (so at most one vote per user)"""
+        voters = self.random.sample(user_ids, min(upvotes + downvotes, len(user_ids)))
+        return [
+            PostVote(user_id=user_id, value=PostVote.UPVOTE if n < upvotes else PostVote.DOWNVOTE)
+            for n, user_id in enumerate(voters)
+        ]
+
+    def insert_votes(self, posts):
+        """bulk_create the vote ledger rows of freshly inserted posts"""
+        votes = []
+        for post in posts:
+            for vote in post.seed_votes:
+                vote.post_id = post.pk
+                votes.append(vote)
+        PostVote.objects.bulk_create(votes, batch_size=self.batch_size)
+
+    def count_votes(self, post):
+        """Set a post's vote counters from its ledger rows"""
+        post.upvotes = sum(1 for vote in post.seed_votes if vote.value == PostVote.UPVOTE)
+        post.downvotes = len(post.seed_votes) - post.upvotes
+
+    def generate_posts(self, count, user_ids, party_ids, options):
+        now = timezone.now()
+        span = options['days'] * 86400
+        usernames = dict(User.objects.filter(id__in=user_ids).values_list('id', 'username'))
+        through = Post.parties.through
+        created = 0
+
+        with explicit_timestamps(Post, 'created_at', 'updated_at'), explicit_timestamps(Comment, 'created_at'):
+            for start in range(0, count, self.batch_size):
+                posts = []
+                for i in range(start, min(start + self.batch_size, count)):
+                    user_id = self.random.choice(user_ids)
+                    created_at = now - datetime.timedelta(seconds=self.random.randint(0, span))
+                    comments = self.generate_comments(options['comments_mean'], user_ids, created_at)
+                    post = Post(
+                        user_id=user_id,
+                        content=self.sentence(5, 60),
+                        is_anonymous=self.random.random() < options['anonymous_ratio'],
+                        user_data={'username': usernames.get(user_id, ''), 'userId': user_id},
+                        created_at=created_at,
+                        updated_at=created_at,
+                        comment_count=len(comments),
+                    )
+                    post.seed_comments = comments
+                    # Every counted vote gets its ledger row, so toggling a seeded vote stays consistent
+                    post.seed_votes = self.generate_votes(
+                        self.sample_votes(options['votes_mean'], options['vote_distribution']),
+                        self.sample_votes(options['votes_mean'] / 4, options['vote_distribution']),
+                        user_ids
+                    )
+                    self.count_votes(post)
+                    post.hot_score = compute_hot_score(post.upvotes, post.downvotes, len(comments), created_at, now)
+                    posts.append(post)
+
+                with transaction.atomic():
+                    Post.objects.bulk_create(posts, batch_size=self.batch_size)
+                    self.insert_comments(posts)
+                    self.insert_votes(posts)
+                    # Party links go straight into the M2M table
+                    if party_ids and options['max_parties_per_post']:
+                        links = []
+                        for post in posts:
+                            k = self.random.randint(0, min(options['max_parties_per_post'], len(party_ids)))
+                            for party_id in self.random.sample(party_ids, k):
+                                links.append(through(post_id=post.pk, parties_id=party_id))
+                        through.objects.bulk_create(links, batch_size=self.batch_size)
+
+                created += len(posts)
+                self.stdout.write(f"Created {created}/{count} posts")
+
+    # Import
+
+    def import_file(self, path):
+        """
+        Import a JSON Lines file. Each line is an object with a "model" key
+        ("user", "party", "candidate" or "post") and that model's fields.
+
+        Users may carry a plain "password" (hashed once per distinct value).
+        Posts reference their author by "username" (or "user_id") and their
+        parties by "party_names"; referenced rows must appear earlier in the file.
+        A post's "comments" is a list of {"username" or "user_id", "text",
+        "created_at"} objects, and its "votes" a list of {"username" or
+        "user_id", "value"} objects (1 or -1, one per user); the post's
+        upvotes and downvotes are counted from its votes.
+        """
+        buffers = {'user': [], 'party': [], 'candidate': [], 'post': []}
+        password_hashes = {}
+        user_ids = {}
+        party_ids = {}
+        counts = {name: 0 for name in buffers}
+
+        def flush(name):
+            rows = buffers[name]
+            if not rows:
+                return
+            if name == 'user':
+                User.objects.bulk_create(rows, batch_size=self.batch_size)
+                user_ids.update((user.username, user.pk) for user in rows)
+            elif name == 'party':
+                Parties.objects.bulk_create(rows, batch_size=self.batch_size)
+                party_ids.update((party.party_name, party.pk) for party in rows)
+            elif name == 'candidate':
+                Candidates.objects.bulk_create(rows, batch_size=self.batch_size)
+            else:
+                self.insert_imported_posts(rows)
+            counts[name] += len(rows)
+            buffers[name] = []
+
+        def resolve_user(record):
+            if 'user_id' in record:
+                return record['user_id']
+            username = record['username']
+            if username not in user_ids:
+                flush('user')
+                user_ids[username] = User.objects.filter(username=username).values_list('id', flat=True).first()
+            if user_ids[username] is None:
+                raise CommandError(f"Unknown username in post: {username}")
+            return user_ids[username]
+
+        def resolve_party(name):
+            if name not in party_ids:
+                flush('party')
+                party_ids[name] = Parties.objects.filter(party_name=name).values_list('id', flat=True).first()
+            return party_ids[name]
+
+        with open(path) as handle, explicit_timestamps(Post, 'created_at', 'updated_at'), \
+                explicit_timestamps(Comment, 'created_at'):
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                name = record.pop('model', None)
+                if name not in buffers:
+                    raise CommandError(f"Line {line_number}: unknown model {name!r}")
+
+                if name == 'user':
+                    password = record.pop('password', None)
+                    if password not in password_hashes:
+                        password_hashes[password] = make_password(password) if password else self.password_hash
+                    record['password'] = password_hashes[password]
+                    buffers[name].append(User(**record))
+                elif name == 'party':
+                    buffers[name].append(Parties(**record))
+                elif name == 'candidate':
+                    buffers[name].append(Candidates(**record))
+                else:
+                    user_id = resolve_user(record)
+                    record.pop('username', None)
+                    record['user_id'] = user_id
+                    party_names = record.pop('party_names', [])
+                    created_at = parse_datetime(record['created_at']) if record.get('created_at') else timezone.now()
+                    record['created_at'] = created_at
+                    record.setdefault('updated_at', created_at)
+                    comments = [
+                        Comment(
+                            user_id=resolve_user(comment),
+                            text=comment['text'],
+                            created_at=parse_datetime(comment['created_at']) if comment.get('created_at') else created_at,
+                        )
+                        for comment in record.pop('comments', [])
+                    ]
+                    votes = [
+                        PostVote(user_id=resolve_user(vote), value=vote['value'])
+                        for vote in record.pop('votes', [])
+                    ]
+                    record.pop('upvotes', None)
+                    record.pop('downvotes', None)
+                    post = Post(**record, comment_count=len(comments))
+                    post.seed_comments = comments
+                    post.seed_votes = votes
+                    self.count_votes(post)
+                    post.hot_score = compute_hot_score(
+                        post.upvotes, post.downvotes, post.comment_count, created_at
+                    )
+                    post.seed_party_ids = [
+                        party_id for party_id in (resolve_party(party) for party in party_names) if party_id
+                    ]
+                    buffers[name].append(post)
+
+                if len(buffers[name]) >= self.batch_size:
+                    flush(name)
+
+            for name in buffers:
+                flush(name)
+
+        for name, count in counts.items():
+            self.stdout.write(f"Imported {count} {name} rows")
+
+    def insert_imported_posts(self, posts):
+        through = Post.parties.through
+        with transaction.atomic():
+            Post.objects.bulk_create(posts, batch_size=self.batch_size)
+            self.insert_comments(posts)
+            self.insert_votes(posts)
+            links = [
+                through(post_id=post.pk, parties_id=party_id)
+                for post in posts for party_id in post.seed_party_ids
+            ]
+            through.objects.bulk_create(links, batch_size=self.batch_size)
@@ -0,0 +1,43 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from somaapp.utilities.snapshot_utils import SNAPSHOT_METRICS, get_first_date, snapshot_metric
+
+
+class Command(BaseCommand):
+    help = (
+        'Store daily and monthly statistics snapshots for closed periods (idempotent; run nightly from cron). '
+        'By default refreshes the previous month up to yesterday; use --backfill to rebuild all history.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First day to snapshot (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', help='Last day to snapshot (YYYY-MM-DD, defaults to yesterday)')
+        parser.add_argument('--backfill', action='store_true', help="Start from each metric's earliest record")
+        parser.add_argument('--metric', action='append', choices=list(SNAPSHOT_METRICS),
+                            help='Only snapshot this metric (repeatable)')
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        try:
+            end = datetime.date.fromisoformat(options['end']) if options['end'] else yesterday
+            start = datetime.date.fromisoformat(options['start']) if options['start'] else None
+        except ValueError:
+            raise CommandError('--from and --to must be YYYY-MM-DD dates')
+        if end > yesterday:
+            raise CommandError('Only closed days can be snapshotted (--to must be before today)')
+        if start is None and not options['backfill']:
+            # The start of the previous month, so the month that just ended is completed too
+            start = (end.replace(day=1) - datetime.timedelta(days=1)).replace(day=1)
+
+        written = 0
+        for metric in options['metric'] or SNAPSHOT_METRICS:
+            metric_start = start or get_first_date(metric)
+            if metric_start is None or metric_start > end:
+                self.stdout.write(f"{metric}: nothing to snapshot")
+                continue
+            rows = snapshot_metric(metric, metric_start, end)
+            written += rows
+            self.stdout.write(f"{metric}: {metric_start} to {end}, {rows} snapshots")
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} snapshots"))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0002_user_is_email_verified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', 'is_anonymous', '-created_at', '-id'], name='post_user_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+
+# Posts rewritten per chunk (each chunk is committed on its own)
+CHUNK_SIZE = 500
+
+# Avatar URL as routed when this migration was written (migrations must not depend on the current URLconf;
+# snapshots are re-resolved from userId at read time anyway)
+AVATAR_PATH = '/somaapp/user-avatar/{user_id}/'
+
+
+def is_embedded_picture(value):
+    """A snapshot avatar that is still the picture itself rather than a reference"""
+    return bool(value) and not value.startswith('/')
+
+
+def replace_embedded_avatars(apps, schema_editor):
+    """Swap base64 pictures in user_data and comment snapshots for avatar URLs"""
+    Post = apps.get_model('somaapp', 'Post')
+
+    last_id = 0
+    while True:
+        posts = list(
+            Post.objects.filter(id__gt=last_id).order_by('id').only('id', 'user_id', 'user_data', 'comments')[:CHUNK_SIZE]
+        )
+        if not posts:
+            break
+        last_id = posts[-1].id
+
+        changed = []
+        for post in posts:
+            dirty = False
+            user_data = post.user_data
+            if isinstance(user_data, dict) and 'userId' not in user_data:
+                picture = user_data.pop('profile_picture', None) or user_data.get('profilePicture')
+                user_data['userId'] = post.user_id
+                user_data['profilePicture'] = AVATAR_PATH.format(user_id=post.user_id) if picture else None
+                dirty = True
+            for comment in post.comments or []:
+                if not isinstance(comment, dict):
+                    continue
+                picture = comment.get('profile_picture')
+                if is_embedded_picture(picture) and comment.get('user_id'):
+                    comment['profile_picture'] = AVATAR_PATH.format(user_id=comment['user_id'])
+                    dirty = True
+            if dirty:
+                changed.append(post)
+
+        if changed:
+            Post.objects.bulk_update(changed, ['user_data', 'comments'])
+
+
+class Migration(migrations.Migration):
+    # Commit chunk by chunk instead of rewriting every post in one transaction
+    atomic = False
+
+    dependencies = [
+        ('somaapp', '0006_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_embedded_avatars, migrations.RunPython.noop),
+    ]
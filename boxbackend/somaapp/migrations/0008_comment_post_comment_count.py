@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0007_post_snapshot_avatar_references'),
+    ]
+
+    operations = [
+        # Keep the JSON comments under another name until 0009 has copied them,
+        # so the new reverse accessor post.comments does not clash with them
+        migrations.RenameField(
+            model_name='post',
+            old_name='comments',
+            new_name='legacy_comments',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, unique=True)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='somaapp.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['post', 'created_at', 'id'], name='comment_post_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,129 @@
+from django.db import migrations, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+# Posts processed per chunk (each chunk is committed on its own, so an interrupted run can be resumed)
+CHUNK_SIZE = 500
+
+
+def parse_comment_time(comment, fallback):
+    """Read the creation time of a legacy comment dict"""
+    value = parse_datetime(comment.get('created_at') or comment.get('timestamp') or '')
+    if value is None:
+        return fallback
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def move_comments(apps, schema_editor):
+    """Copy every JSON comment into its own Comment row and fill comment_count"""
+    Post = apps.get_model('somaapp', 'Post')
+    Comment = apps.get_model('somaapp', 'Comment')
+    User = apps.get_model('somaapp', 'User')
+
+    # Keep the original comment times instead of the migration time
+    created_at = Comment._meta.get_field('created_at')
+    created_at.auto_now_add = False
+    try:
+        _move_chunks(Post, Comment, User)
+    finally:
+        created_at.auto_now_add = True
+
+
+def _move_chunks(Post, Comment, User):
+    """Move the comments of every post, one chunk of posts at a time"""
+    last_id = 0
+    while True:
+        posts = list(
+            Post.objects.filter(id__gt=last_id).order_by('id').only('id', 'created_at', 'legacy_comments')[:CHUNK_SIZE]
+        )
+        if not posts:
+            break
+        last_id = posts[-1].id
+        with transaction.atomic():
+            _move_chunk(posts, Comment, User)
+
+
+def _move_chunk(posts, Comment, User):
+    """Move the comments of one chunk of posts (run inside its own transaction)"""
+    # Posts that already have Comment rows were moved by an earlier, interrupted run
+    moved_posts = set(
+        Comment.objects.filter(post_id__in=[post.id for post in posts]).values_list('post_id', flat=True).distinct()
+    )
+    posts = [post for post in posts if post.id not in moved_posts]
+    if not posts:
+        return
+
+    user_ids = {
+        comment.get('user_id')
+        for post in posts for comment in post.legacy_comments or []
+        if isinstance(comment, dict)
+    }
+    existing_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+
+    rows = []
+    for post in posts:
+        # Comments without a (still existing) author cannot be kept
+        moved = [
+            Comment(
+                post_id=post.id,
+                user_id=comment['user_id'],
+                text=comment.get('text') or '',
+                created_at=parse_comment_time(comment, post.created_at),
+            )
+            for comment in post.legacy_comments or []
+            if isinstance(comment, dict) and comment.get('user_id') in existing_users
+        ]
+        post.comment_count = len(moved)
+        rows.extend(moved)
+
+    Comment.objects.bulk_create(rows)
+    Post.objects.bulk_update(posts, ['comment_count'])
+
+
+def restore_comments(apps, schema_editor):
+    """Rebuild the JSON comment lists from the Comment rows"""
+    Post = apps.get_model('somaapp', 'Post')
+    Comment = apps.get_model('somaapp', 'Comment')
+
+    last_id = 0
+    while True:
+        posts = list(Post.objects.filter(id__gt=last_id).order_by('id').only('id')[:CHUNK_SIZE])
+        if not posts:
+            break
+        last_id = posts[-1].id
+
+        comments = {post.id: [] for post in posts}
+        rows = Comment.objects.filter(post_id__in=comments).select_related('user').order_by('created_at', 'id')
+        for comment in rows:
+            comments[comment.post_id].append({
+                'id': f"comment_{comment.post_id}_{comment.id}",
+                'user_id': comment.user_id,
+                'username': comment.user.username,
+                'user_email': comment.user.email,
+                'profile_picture': None,
+                'full_name': comment.user.full_name or comment.user.username,
+                'text': comment.text,
+                'post_id': comment.post_id,
+                'timestamp': comment.created_at.isoformat(),
+                'created_at': comment.created_at.isoformat(),
+            })
+        for post in posts:
+            post.legacy_comments = comments[post.id]
+        with transaction.atomic():
+            Post.objects.bulk_update(posts, ['legacy_comments'])
+
+
+class Migration(migrations.Migration):
+    # Commit chunk by chunk instead of moving every comment in one transaction
+    atomic = False
+
+    dependencies = [
+        ('somaapp', '0008_comment_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_comments, restore_comments),
+    ]
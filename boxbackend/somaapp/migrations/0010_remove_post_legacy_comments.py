@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0009_move_post_comments'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='post',
+            name='legacy_comments',
+        ),
+    ]
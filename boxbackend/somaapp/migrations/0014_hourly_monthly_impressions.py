@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0013_post_view_share_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyImpressions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True)),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Hourly Impression',
+                'verbose_name_plural': 'Hourly Impressions',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyImpressions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Monthly Impression',
+                'verbose_name_plural': 'Monthly Impressions',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0014_hourly_monthly_impressions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyimpressions',
+            name='visitors_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monthlyimpressions',
+            name='visitors_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0015_impressions_visitors_sketch'),
+    ]
+
+    operations = [
+        # Existing rows keep NULL (their real creation dates are unknown): they count in the totals but in no month
+        migrations.AddField(
+            model_name='candidates',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='parties',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='candidates',
+            index=models.Index(fields=['created_at'], name='candidate_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parties',
+            index=models.Index(fields=['created_at'], name='party_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ),
+    ]
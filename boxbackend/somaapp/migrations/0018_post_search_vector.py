@@ -0,0 +1,81 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, transaction
+
+
+# Keeps Post.search_vector in step with the columns it indexes on every insert and update,
+# including bulk and raw writes. Author names of anonymous posts are left out.
+CREATE_TRIGGER_SQL = """
+CREATE FUNCTION somaapp_post_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'A') ||
+        setweight(to_tsvector('simple', CASE WHEN NEW.is_anonymous THEN '' ELSE coalesce(NEW.user_data ->> 'username', '') END), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER somaapp_post_search_vector_update
+    BEFORE INSERT OR UPDATE OF content, user_data, is_anonymous ON somaapp_post
+    FOR EACH ROW EXECUTE FUNCTION somaapp_post_search_vector();
+"""
+
+# Fill the column for existing posts (the trigger fires on the no-op update) before the index is built,
+# one id range at a time
+BACKFILL_SQL = "UPDATE somaapp_post SET content = content WHERE id > %s AND id <= %s;"
+
+# Post ids covered per backfill statement (each range is committed on its own)
+CHUNK_SIZE = 1000
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS somaapp_post_search_vector_update ON somaapp_post;
+DROP FUNCTION IF EXISTS somaapp_post_search_vector();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Full-text search is PostgreSQL only
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGER_SQL)
+        backfill_search_vectors(apps, schema_editor)
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Run the backfill over id ranges so no single statement rewrites (and locks) every post"""
+    Post = apps.get_model('somaapp', 'Post')
+    max_id = Post.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    last_id = 0
+    while last_id < max_id:
+        with transaction.atomic():
+            schema_editor.execute(BACKFILL_SQL, (last_id, last_id + CHUNK_SIZE))
+        last_id += CHUNK_SIZE
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+    # Commit the backfill range by range instead of rewriting every post in one transaction
+    atomic = False
+
+    dependencies = [
+        ('somaapp', '0017_statssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='post_search_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('somaapp', '0018_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shardedcounter',
+            index=models.Index(fields=['name'], name='counter_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 
 
@@ -57,12 +59,21 @@ class User(AbstractUser):
     # SUPERUSER REQUIRED FIELDS
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Monthly sign-up counts in the dashboard statistics
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
 
 # Post Model
 class Post(models.Model):
+    # Number of comments embedded in each post of a list (oldest first, the rest come from get-post-comments)
+    COMMENT_PREVIEW = 3
+
     # Post ID
     id = models.AutoField(primary_key=True, unique=True, null=False, blank=False)
     # User who created the post (foreign key to User model)
@@ -85,17 +96,106 @@ class Post(models.Model):
     upvotes = models.PositiveIntegerField(default=0, null=False, blank=False)
     # Downvotes count
     downvotes = models.PositiveIntegerField(default=0, null=False, blank=False)
-    # Comments count
-    comments = models.JSONField(default=list, null=True, blank=True)
+    # Comments count (maintained when comments are added, see the Comment model)
+    comment_count = models.PositiveIntegerField(default=0, null=False, blank=False)
+    # Number of times the post was opened (reported through track-events)
+    view_count = models.PositiveIntegerField(default=0, null=False, blank=False)
+    # Number of times the post was shared (reported through track-events)
+    share_count = models.PositiveIntegerField(default=0, null=False, blank=False)
     # Associated parties (many-to-many relationship)
     parties = models.ManyToManyField('Parties', related_name='posts', blank=True)
+    # Time-decayed ranking score for the hot feed (see utilities/ranking_utils.py)
+    hot_score = models.FloatField(default=0, null=False, blank=False)
+    # Full-text search document (content and public author name), kept current by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']  # Order by newest first
+        indexes = [
+            # Keyset (cursor) pagination of the public feed
+            models.Index(fields=['-created_at', '-id'], name='post_feed_idx'),
+            # Keyset (cursor) pagination of a single user's public posts
+            models.Index(fields=['user', 'is_anonymous', '-created_at', '-id'], name='post_user_feed_idx'),
+            # Keyset (cursor) pagination of the hot feed
+            models.Index(fields=['-hot_score', '-id'], name='post_hot_idx'),
+            # Full-text search (see utilities/search_utils.py)
+            GinIndex(fields=['search_vector'], name='post_search_idx'),
+        ]
     
     def __str__(self):
         return f"Post by {self.user.username if not self.is_anonymous else 'Anonymous'} - {self.content[:50]}..."
 
+    def get_comment_preview(self):
+        """First COMMENT_PREVIEW comments (prefetched into preview_comments by the list views)"""
+        if hasattr(self, 'preview_comments'):
+            return self.preview_comments
+        return self.comments.all()[:self.COMMENT_PREVIEW]
+
+
+
+# Comment Model (one row per comment, so adding a comment never rewrites the post)
+class Comment(models.Model):
+    # Comment ID
+    id = models.AutoField(primary_key=True, unique=True, null=False, blank=False)
+    # Post the comment belongs to
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
+    # User who wrote the comment
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
+    # Comment text
+    text = models.TextField(null=False, blank=False)
+    # Comment created at
+    created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        ordering = ['created_at', 'id']  # Oldest first, like a conversation
+        indexes = [
+            # Keyset (cursor) pagination of a post's comments
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.user.username} on post {self.post_id}"
+
+
+# Post Vote Model (one row per user and post, the ledger behind Post.upvotes/downvotes)
+class PostVote(models.Model):
+    # Vote values
+    UPVOTE = 1
+    DOWNVOTE = -1
+    VALUE_CHOICES = [(UPVOTE, 'Upvote'), (DOWNVOTE, 'Downvote')]
+
+    # Post that was voted on
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='votes')
+    # User who voted
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='post_votes')
+    # 1 for an upvote, -1 for a downvote
+    value = models.SmallIntegerField(choices=VALUE_CHOICES, null=False, blank=False)
+    # Vote created at
+    created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
+    # Vote updated at (when switched between up and down)
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        constraints = [
+            # A user has at most one vote per post
+            models.UniqueConstraint(fields=['user', 'post'], name='unique_post_vote'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} voted {self.value} on post {self.post_id}"
+
+
+# Post Counter Model (denormalized post totals so feeds never run COUNT(*))
+class PostCounter(models.Model):
+    # Counter key: "all" for every post, "user:<id>" for a user's non-anonymous posts
+    key = models.CharField(max_length=50, unique=True, null=False, blank=False)
+    # Number of posts counted under this key
+    count = models.PositiveIntegerField(default=0, null=False, blank=False)
+    # Counter updated at
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
 
 
 class Parties(models.Model):
@@ -133,6 +233,16 @@ class Parties(models.Model):
     x = models.URLField(max_length=255, null=True, blank=True)
     # Parties and Candidates Threads
     threads = models.URLField(max_length=255, null=True, blank=True)
+    # Party created at (NULL for rows registered before it was recorded)
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, editable=False)
+    # Party updated at
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        indexes = [
+            # Monthly registration counts in the dashboard statistics
+            models.Index(fields=['created_at'], name='party_created_idx'),
+        ]
 
 
 
@@ -171,17 +281,75 @@ class Candidates(models.Model):
     x = models.URLField(max_length=255, null=True, blank=True)
     # Candidate Threads
     threads = models.URLField(max_length=255, null=True, blank=True)
+    # Candidate created at (NULL for rows registered before it was recorded)
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, editable=False)
+    # Candidate updated at
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        indexes = [
+            # Monthly registration counts in the dashboard statistics
+            models.Index(fields=['created_at'], name='candidate_created_idx'),
+        ]
 
     def __str__(self):
         return self.candidate_name
 
 
+# Sharded Counter Model (spreads increments of one hot counter over several rows)
+class ShardedCounter(models.Model):
+    # Counter name, "<kind>:<key>" (see utilities/sharded_counter_utils.py)
+    name = models.CharField(max_length=100, null=False, blank=False)
+    # Shard number; increments pick one at random
+    shard = models.PositiveSmallIntegerField(null=False, blank=False)
+    # Amount counted on this shard since it was last compacted
+    count = models.BigIntegerField(default=0, null=False, blank=False)
+    # Shard updated at
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        constraints = [
+            # One row per shard of a counter (also serves lookups by name)
+            models.UniqueConstraint(fields=['name', 'shard'], name='unique_counter_shard'),
+        ]
+        indexes = [
+            # Prefix scans by kind ("<kind>:%"), which the unique index can't
+            # serve under a non-C collation
+            models.Index(fields=['name'], name='counter_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.name}#{self.shard}: {self.count}"
+
+
+# Hourly Impressions Model (fine-grained buckets, pruned after IMPRESSIONS_HOURLY_RETENTION_DAYS)
+class HourlyImpressions(models.Model):
+    # Start of the hour (UTC) for the impressions
+    hour = models.DateTimeField(unique=True, null=False, blank=False)
+    # Number of impressions in this hour
+    impressions = models.PositiveIntegerField(default=0, null=False, blank=False)
+    # Created at timestamp
+    created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
+    # Updated at timestamp
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        ordering = ['-hour']  # Order by newest hour first
+        verbose_name = 'Hourly Impression'
+        verbose_name_plural = 'Hourly Impressions'
+
+    def __str__(self):
+        return f"Impressions for {self.hour:%Y-%m-%d %H:00}: {self.impressions}"
+
+
 # Daily Impressions Model
 class DailyImpressions(models.Model):
     # Date for the impressions
     date = models.DateField(unique=True, null=False, blank=False, default=timezone.now)
     # Number of impressions for this date
     impressions = models.PositiveIntegerField(default=0, null=False, blank=False)
+    # HyperLogLog sketch of the day's distinct visitors (see utilities/hll_utils.py)
+    visitors_sketch = models.BinaryField(null=True, blank=True)
     # Created at timestamp
     created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
     # Updated at timestamp
@@ -196,6 +364,64 @@ class DailyImpressions(models.Model):
         return f"Impressions for {self.date}: {self.impressions}"
 
 
+# Monthly Impressions Model (rolled up from DailyImpressions by `manage.py rollup_impressions`)
+class MonthlyImpressions(models.Model):
+    # First day of the month for the impressions
+    month = models.DateField(unique=True, null=False, blank=False)
+    # Number of impressions in this month
+    impressions = models.PositiveBigIntegerField(default=0, null=False, blank=False)
+    # Union of the month's daily visitor sketches
+    visitors_sketch = models.BinaryField(null=True, blank=True)
+    # Created at timestamp
+    created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
+    # Updated at timestamp
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        ordering = ['-month']  # Order by newest month first
+        verbose_name = 'Monthly Impression'
+        verbose_name_plural = 'Monthly Impressions'
+
+    def __str__(self):
+        return f"Impressions for {self.month:%Y-%m}: {self.impressions}"
+
+
+# Stats Snapshot Model (closed-period totals for the dashboard, see `manage.py snapshot_stats`)
+class StatsSnapshot(models.Model):
+    # Snapshot periods
+    DAY = 'day'
+    MONTH = 'month'
+    PERIOD_CHOICES = [
+        (DAY, 'Day'),
+        (MONTH, 'Month'),
+    ]
+
+    # Metric name, e.g. "users" or "impressions" (see utilities/snapshot_utils.py)
+    metric = models.CharField(max_length=30, null=False, blank=False)
+    # Length of the period
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES, null=False, blank=False)
+    # First day of the period
+    date = models.DateField(null=False, blank=False)
+    # Amount added during the period
+    count = models.PositiveBigIntegerField(default=0, null=False, blank=False)
+    # Running total at the end of the period
+    total = models.PositiveBigIntegerField(default=0, null=False, blank=False)
+    # Created at timestamp
+    created_at = models.DateTimeField(auto_now_add=True, null=False, blank=False, editable=False)
+    # Updated at timestamp
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False, editable=False)
+
+    class Meta:
+        ordering = ['-date']  # Order by newest period first
+        constraints = [
+            # One row per metric and period (also serves lookups by metric)
+            models.UniqueConstraint(fields=['metric', 'period', 'date'], name='unique_stats_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.period} {self.date}: +{self.count} ({self.total})"
+
+
 # OTP Model for email verification
 class OTP(models.Model):
     # OTP ID
@@ -1,9 +1,87 @@
 from rest_framework import serializers
-from .models import User, Post, Parties, Candidates
+from .models import User, Post, Comment, Parties, Candidates
+from django.utils import timezone
+from .utilities.avatar_utils import USER_DATA_AVATAR_KEY, get_snapshot_avatar, get_user_avatar, resolve_comment_avatars, resolve_snapshot_avatars
+from .utilities.event_utils import EVENT_TYPES, POST_EVENT_COLUMNS, MAX_EVENT_AGE, MAX_CLOCK_SKEW
+from .utilities.vote_utils import merge_pending_votes
+
+
+# Sparse Fieldset Mixin (lets list views honour ?fields= and ?exclude=)
+class SparseFieldsetMixin:
+    # Model columns read by serializer fields that are not plain model fields
+    field_sources = {}
+    # Serializer fields that need the view's prefetch_related
+    prefetch_fields = []
+
+    def __init__(self, *args, **kwargs):
+        # Fields to keep and fields to drop from the output
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None or exclude:
+            keep = self.get_output_fields(fields, exclude)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_output_fields(cls, fields=None, exclude=None):
+        """
+        Get the readable field names left after applying fields/exclude.
+
+        Raises:
+            ValueError: If fields or exclude names a field that is not readable
+        """
+        write_only = {name for name, field in cls._declared_fields.items() if field.write_only}
+        write_only |= {
+            name for name, options in getattr(cls.Meta, 'extra_kwargs', {}).items()
+            if options.get('write_only')
+        }
+        names = [name for name in cls.Meta.fields if name not in write_only]
+        unknown = [name for name in (fields or []) + (exclude or []) if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(names)}")
+        if fields is not None:
+            names = [name for name in names if name in fields]
+        if exclude:
+            names = [name for name in names if name not in exclude]
+        return names
+
+    @classmethod
+    def get_only_columns(cls, fields=None, exclude=None):
+        """
+        Get the model columns to load with .only() for the requested fields.
+
+        Args:
+            fields (list): Field names to keep, or None for all
+            exclude (list): Field names to drop
+
+        Returns:
+            set: Column names (with user__x style lookups for joined columns)
+        """
+        model = cls.Meta.model
+        columns = {model._meta.pk.name}
+        for name in cls.get_output_fields(fields, exclude):
+            if name in cls.field_sources:
+                columns.update(cls.field_sources[name])
+                continue
+            try:
+                model_field = model._meta.get_field(name)
+            except Exception:
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(name)
+
+        # A relation serialized in full needs all of its columns
+        full_relations = {name for name in columns if '__' not in name and model._meta.get_field(name).is_relation}
+        columns = {name for name in columns if name.split('__')[0] not in full_relations or '__' not in name}
+        # Joined columns need their foreign key loaded too
+        columns.update(name.split('__')[0] for name in columns.copy() if '__' in name)
+        return columns
 
 
 # User Serializer
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         # Model to serialize
         model = User
@@ -39,14 +117,85 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
+# Post Author Serializer (the author nested in a post, with an avatar URL instead of the picture)
+class PostAuthorSerializer(UserSerializer):
+    # Author's versioned avatar URL
+    profile_picture = serializers.SerializerMethodField()
+
+    def get_profile_picture(self, obj):
+        """Get the author's avatar URL"""
+        return get_user_avatar(obj)
+
+
+# Comment List Serializer (resolves the avatars of a whole list with one lookup)
+class CommentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        comments = super().to_representation(data)
+        # Comments nested in a post are resolved together with the post
+        if self.parent is None:
+            resolve_comment_avatars(comments)
+        return comments
+
+
+# Comment Serializer
+class CommentSerializer(serializers.ModelSerializer):
+    # Include the username for easy access
+    username = serializers.CharField(source='user.username', read_only=True)
+    # Author's full name, falling back to the username
+    full_name = serializers.SerializerMethodField()
+    # Author's avatar URL (filled in by resolve_comment_avatars)
+    profile_picture = serializers.SerializerMethodField()
+    # Same as created_at, kept for clients of the former JSON comments
+    timestamp = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = [
+            'id', 'post_id', 'user_id', 'username', 'full_name', 'profile_picture', 'text', 'timestamp', 'created_at'
+        ]
+        read_only_fields = fields
+        # Lists resolve author avatars in one batch
+        list_serializer_class = CommentListSerializer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.parent is None:
+            resolve_comment_avatars([data])
+        return data
+
+    def get_full_name(self, obj):
+        """Get the author's full name or username"""
+        return obj.user.full_name or obj.user.username
+
+    def get_profile_picture(self, obj):
+        """Placeholder until the response's avatars are resolved"""
+        return None
+
+
+# Post List Serializer (resolves the avatars and buffered votes of a whole list with one lookup each)
+class PostListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        return merge_pending_votes(resolve_snapshot_avatars(super().to_representation(data)))
+
+
 # Post Serializer
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Columns read through the user relation
+    field_sources = {
+        'username': ['user__username'],
+        'profile_picture': ['user__updated_at'],
+    }
+    # Parties and comments are prefetched by the list views
+    prefetch_fields = ['parties', 'comments']
+
     # Include user details in the response
-    user = UserSerializer(read_only=True)
+    user = PostAuthorSerializer(read_only=True)
     # Include the username for easy access
     username = serializers.CharField(source='user.username', read_only=True)
-    # Include the profile picture for easy access
-    profile_picture = serializers.CharField(source='user.profile_picture', read_only=True)
+    # Include the author's avatar URL for easy access
+    profile_picture = serializers.SerializerMethodField()
+    # Include the post's first comments (prefetched by the list views, see Post.COMMENT_PREVIEW)
+    comments = CommentSerializer(source='get_comment_preview', many=True, read_only=True)
     # Include parties information
     parties = serializers.SerializerMethodField()
     # Allow parties to be set by ID during creation
@@ -61,9 +210,15 @@ class PostSerializer(serializers.ModelSerializer):
         model = Post
         fields = [
             'id', 'user', 'username', 'profile_picture', 'content', 'images', 'videos',
-            'is_anonymous', 'user_data', 'created_at', 'updated_at', 'upvotes', 'downvotes', 'comments', 'parties', 'parties_ids'
+            'is_anonymous', 'user_data', 'created_at', 'updated_at', 'upvotes', 'downvotes', 'comment_count',
+            'view_count', 'share_count', 'comments', 'parties', 'parties_ids'
         ]
-        read_only_fields = ['id', 'user', 'username', 'profile_picture', 'created_at', 'updated_at', 'upvotes', 'downvotes', 'comments', 'parties']
+        read_only_fields = [
+            'id', 'user', 'username', 'profile_picture', 'created_at', 'updated_at', 'upvotes', 'downvotes',
+            'comment_count', 'view_count', 'share_count', 'comments', 'parties'
+        ]
+        # Lists resolve snapshot avatars in one batch
+        list_serializer_class = PostListSerializer
     
     def create(self, validated_data):
         # Extract parties_ids before creating the post
@@ -79,8 +234,14 @@ class PostSerializer(serializers.ModelSerializer):
                 'username': user.username,
                 'email': user.email,
                 'fullName': user.full_name,
-                'profilePicture': user.profile_picture
             }
+        else:
+            validated_data['user_data'] = dict(validated_data['user_data'])
+            validated_data['user_data'].pop('profile_picture', None)
+
+        # Store an avatar reference, never the picture itself (it is resolved at read time)
+        validated_data['user_data']['userId'] = user.id
+        validated_data['user_data'][USER_DATA_AVATAR_KEY] = get_snapshot_avatar(user)
 
         # Create the post
         post = super().create(validated_data)
@@ -92,6 +253,20 @@ class PostSerializer(serializers.ModelSerializer):
 
         return post
 
+    def to_representation(self, instance):
+        # prepare_post_queryset flags authors with a picture instead of loading it
+        if hasattr(instance, 'author_has_avatar'):
+            instance.user.has_avatar = instance.author_has_avatar
+        data = super().to_representation(instance)
+        # Inside a list the PostListSerializer resolves avatars and votes for all posts at once
+        if self.parent is None:
+            merge_pending_votes(resolve_snapshot_avatars([data]))
+        return data
+
+    def get_profile_picture(self, obj):
+        """Get the author's avatar URL"""
+        return get_user_avatar(obj.user)
+
     def get_parties(self, obj):
         """Get parties data for the post"""
         parties_data = []
@@ -107,7 +282,12 @@ class PostSerializer(serializers.ModelSerializer):
 
 
 # Parties Serializer
-class PartiesSerializer(serializers.ModelSerializer):
+class PartiesSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Columns read by supporters_count
+    field_sources = {
+        'supporters_count': ['supporters'],
+    }
+
     # Calculate supporters count from the supporters JSON field
     supporters_count = serializers.SerializerMethodField()
     
@@ -136,7 +316,12 @@ class PartiesSerializer(serializers.ModelSerializer):
 
 
 # Candidates Serializer
-class CandidatesSerializer(serializers.ModelSerializer):
+class CandidatesSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Columns read by supporters_count
+    field_sources = {
+        'supporters_count': ['supporters'],
+    }
+
     # Calculate supporters count from the supporters JSON field
     supporters_count = serializers.SerializerMethodField()
     
@@ -162,3 +347,57 @@ class CandidatesSerializer(serializers.ModelSerializer):
             if field in data and (data[field] == '' or data[field] is None):
                 data[field] = None
         return data
+
+
+# Feed Post List Serializer (adds buffered votes to a whole list with one lookup)
+class FeedPostListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        return merge_pending_votes(super().to_representation(data))
+
+
+# Feed Post Serializer (compact projection used by the feed list endpoints)
+class FeedPostSerializer(serializers.ModelSerializer):
+    # Author reference, resolved through the page's `authors` map (hidden for anonymous posts)
+    author_id = serializers.SerializerMethodField()
+    # Party references without manifestos or logos
+    parties = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = [
+            'id', 'author_id', 'content', 'images', 'videos', 'is_anonymous',
+            'created_at', 'updated_at', 'upvotes', 'downvotes', 'comment_count', 'parties'
+        ]
+        read_only_fields = fields
+        # Lists merge buffered votes in one batch
+        list_serializer_class = FeedPostListSerializer
+
+    def get_author_id(self, obj):
+        """Return the author's ID unless the post is anonymous"""
+        return None if obj.is_anonymous else obj.user_id
+
+    def get_parties(self, obj):
+        """Get compact party references for the post"""
+        return [{'id': party.id, 'party_name': party.party_name} for party in obj.parties.all()]
+
+
+# Track Event Serializer (one client event in a track-events batch)
+class TrackEventSerializer(serializers.Serializer):
+    # Event type: impression, post_view or share
+    type = serializers.ChoiceField(choices=EVENT_TYPES)
+    # When the event happened on the client
+    timestamp = serializers.DateTimeField()
+    # Post the event refers to (post_view and share only)
+    post_id = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        """Require a post for post events and reject timestamps outside the accepted window"""
+        if data['type'] in POST_EVENT_COLUMNS and 'post_id' not in data:
+            raise serializers.ValidationError({'post_id': f"This field is required for {data['type']} events."})
+
+        now = timezone.now()
+        if data['timestamp'] > now + MAX_CLOCK_SKEW:
+            raise serializers.ValidationError({'timestamp': 'Timestamp is in the future.'})
+        if data['timestamp'] < now - MAX_EVENT_AGE:
+            raise serializers.ValidationError({'timestamp': 'Timestamp is too old.'})
+        return data
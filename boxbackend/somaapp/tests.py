@@ -0,0 +1,691 @@
+import datetime
+import io
+import json
+import random
+import threading
+import time
+import jwt
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import User, Post, PostVote, Comment, Parties, DailyImpressions, HourlyImpressions, MonthlyImpressions, StatsSnapshot
+from .utilities.counter_utils import get_post_count, record_post_created
+from .utilities.hll_utils import HLL_REGISTERS, add_hash, estimate_cardinality, hash_value, merge_sketches, new_sketch
+from .utilities import impression_utils
+from .utilities.impression_utils import flush_impressions, record_impression, record_visitor, rollup_impressions
+from .utilities.pagination_utils import MAX_PAGE_LIMIT
+from .utilities.search_utils import SEARCH_RANK_FIELD, get_search_query, search_posts
+from .utilities.snapshot_utils import get_month_snapshot
+from .utilities.stats_utils import get_growth_stats, get_month_starts
+from .utilities.streaming_utils import stream_json_response
+from .utilities.vote_utils import flush_pending_votes, toggle_vote
+
+
+# Vote Test Case (one post and a pool of voters, voted on from worker threads)
+class VoteTestCase(TransactionTestCase):
+    # Number of vote toggles fired at the post
+    VOTES = 400
+    # Number of distinct voters (small, so the same voters keep flipping their votes)
+    VOTERS = 40
+    # Parallel workers, each on its own connection
+    THREADS = 8
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Worker threads need their own connections to a database file or server')
+        password = make_password(None)
+        self.voters = User.objects.bulk_create([
+            User(username=f"voter{i}", email=f"voter{i}@example.com", password=password)
+            for i in range(self.VOTERS)
+        ])
+        with transaction.atomic():
+            self.post = Post.objects.create(user=self.voters[0], content='Concurrent votes', is_anonymous=True)
+            record_post_created(self.post)
+
+    def fire_votes(self, seed):
+        """Toggle random votes on the post from worker threads"""
+        rng = random.Random(seed)
+        plan = [
+            (rng.choice(self.voters), rng.choice([PostVote.UPVOTE, PostVote.DOWNVOTE]))
+            for _ in range(self.VOTES)
+        ]
+
+        def vote(items):
+            # Each worker keeps one connection for all its votes, like a server thread
+            try:
+                return [toggle_vote(user, self.post, value) for user, value in items]
+            finally:
+                # Worker threads must not leak their connections
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            batches = executor.map(vote, [plan[i::self.THREADS] for i in range(self.THREADS)])
+            return [action for batch in batches for action in batch]
+
+    def assertCountersMatchLedger(self):
+        self.post.refresh_from_db(fields=['upvotes', 'downvotes'])
+        ledger = PostVote.objects.filter(post=self.post)
+        self.assertEqual(self.post.upvotes, ledger.filter(value=PostVote.UPVOTE).count())
+        self.assertEqual(self.post.downvotes, ledger.filter(value=PostVote.DOWNVOTE).count())
+
+
+# Concurrent Vote Tests (parallel toggles must leave the counters equal to the ledger)
+# The workers need a test database they can all connect to. With the project's
+# PostgreSQL settings, `python manage.py test somaapp.tests.ConcurrentVoteTests` runs them
+# as is. On SQLite they are skipped unless the test database is a file, e.g.
+#   DATABASES['default']['TEST'] = {'NAME': 'test_db.sqlite3'}
+#   DATABASES['default']['OPTIONS'] = {'timeout': 60, 'transaction_mode': 'IMMEDIATE'}
+class ConcurrentVoteTests(VoteTestCase):
+    # Enough toggles to make lost updates and unique-vote races show up reliably
+    VOTES = 2000
+    VOTERS = 200
+    def test_counters_match_ledger(self):
+        actions = self.fire_votes(seed=1)
+        self.assertEqual(len(actions), self.VOTES)
+        self.assertCountersMatchLedger()
+
+    # The test flushes itself instead of starting the background flusher
+    @override_settings(VOTE_WRITE_BEHIND=True)
+    @mock.patch('somaapp.utilities.vote_utils.start_periodic_flush')
+    def test_write_behind_counters_match_ledger(self, start_periodic_flush):
+        actions = self.fire_votes(seed=2)
+        self.assertEqual(len(actions), self.VOTES)
+        start_periodic_flush.assert_called()
+        # Write out everything still buffered before checking
+        while flush_pending_votes():
+            pass
+        self.assertCountersMatchLedger()
+
+
+# Vote Throughput Benchmark (votes/s on one hot post, write-behind off and on)
+class VoteThroughputTests(VoteTestCase):
+    VOTES = 2000
+    VOTERS = 200
+    THREADS = 32
+
+    def setUp(self):
+        # Row lock contention is what write-behind avoids; only PostgreSQL measures it realistically
+        if connection.vendor != 'postgresql':
+            self.skipTest('The vote benchmark runs on PostgreSQL')
+        super().setUp()
+
+    def measure(self, seed):
+        """Fire the votes and return the rate in votes per second"""
+        started = time.monotonic()
+        self.fire_votes(seed)
+        return self.VOTES / (time.monotonic() - started)
+
+    def flush_periodically(self, stop):
+        """Stand-in for the background flusher, stopped with the test"""
+        try:
+            while not stop.wait(settings.VOTE_FLUSH_INTERVAL_MS / 1000):
+                flush_pending_votes()
+        finally:
+            connection.close()
+
+    @mock.patch('somaapp.utilities.vote_utils.start_periodic_flush')
+    def test_throughput(self, start_periodic_flush):
+        direct = self.measure(seed=1)
+        self.assertCountersMatchLedger()
+
+        stop = threading.Event()
+        flusher = threading.Thread(target=self.flush_periodically, args=(stop,))
+        with override_settings(VOTE_WRITE_BEHIND=True):
+            flusher.start()
+            try:
+                buffered = self.measure(seed=2)
+            finally:
+                stop.set()
+                flusher.join()
+            while flush_pending_votes():
+                pass
+        self.assertCountersMatchLedger()
+
+        print(
+            f"\n{self.VOTES} votes on one post with {self.THREADS} threads: "
+            f"{direct:.0f} votes/s direct, {buffered:.0f} votes/s write-behind ({buffered / direct:.2f}x)"
+        )
+
+
+# Query Count Tests (list endpoints must cost the same number of queries however many posts they return)
+class QueryCountTests(TestCase):
+    # Number of posts in the fixture (one default page, so a per-post query would show)
+    POSTS = 5
+
+    def setUp(self):
+        # Rendered feed pages are cached; every request here must reach the database
+        cache.clear()
+        authors = [
+            User.objects.create_user(username=f"author{i}", email=f"author{i}@example.com", password='password123')
+            for i in range(3)
+        ]
+        parties = [Parties.objects.create(party_name=f"Party {i}") for i in range(2)]
+        self.posts = []
+        for i in range(self.POSTS):
+            with transaction.atomic():
+                post = Post.objects.create(user=authors[i % 3], content=f"Election post {i}")
+                record_post_created(post)
+            post.parties.set(parties[:i % 3])
+            for author in authors[:i % 3 + 1]:
+                Comment.objects.create(post=post, user=author, text=f"Comment on post {i}")
+            self.posts.append(post)
+        # The post total is counted once and maintained afterwards
+        get_post_count()
+
+    def get(self, path, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_feed(self):
+        # Total, posts, parties, comment previews and avatars
+        data = self.get('/somaapp/get-all-posts/', 5)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+    def test_feed_compact(self):
+        # Total, posts, parties and authors
+        data = self.get('/somaapp/get-all-posts/?view=compact', 4)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+    def test_feed_cursor(self):
+        # Cursor mode skips the total: posts, parties, comment previews and avatars
+        data = self.get('/somaapp/get-all-posts/?cursor=&limit=3', 4)
+        self.assertEqual(len(data['posts']), 3)
+        data = self.get(f"/somaapp/get-all-posts/?cursor={data['next_cursor']}&limit=3", 4)
+        self.assertEqual(len(data['posts']), self.POSTS - 3)
+
+    def test_batch(self):
+        # Posts, parties, comment previews and avatars
+        ids = ','.join(str(post.id) for post in self.posts)
+        data = self.get(f"/somaapp/get-posts/?ids={ids}", 4)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+    def test_batch_compact(self):
+        # Posts, parties and authors
+        ids = ','.join(str(post.id) for post in self.posts)
+        data = self.get(f"/somaapp/get-posts/?ids={ids}&view=compact", 3)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+    def test_search(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Search runs on PostgreSQL full-text search')
+        # Ranked page with its total, posts, parties, comment previews and avatars
+        data = self.get('/somaapp/search-posts/?q=election', 5)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+    def test_search_compact(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Search runs on PostgreSQL full-text search')
+        # Ranked page with its total, posts, parties and authors
+        data = self.get('/somaapp/search-posts/?q=election&view=compact', 4)
+        self.assertEqual(len(data['posts']), self.POSTS)
+
+
+# Feed Pagination Tests (cursor pages cost the same at any depth)
+class FeedPaginationTests(TestCase):
+    # Number of posts in the fixture (more than one maximum-size page)
+    POSTS = MAX_PAGE_LIMIT + 20
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username='author', email='author@example.com', password='password123')
+        Post.objects.bulk_create([Post(user=author, content=f"Post {i}") for i in range(self.POSTS)])
+
+    def get_page(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), queries.captured_queries
+
+    def test_cursor_walk(self):
+        # Walk the whole feed: every post once, and the last page as cheap as the first
+        seen = []
+        costs = []
+        data, queries = self.get_page('/somaapp/get-all-posts/?cursor=&limit=10&view=compact')
+        while True:
+            seen.extend(post['id'] for post in data['posts'])
+            costs.append(len(queries))
+            # Deep pages seek on (created_at, id) instead of skipping rows
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries))
+            if not data['next_cursor']:
+                break
+            data, queries = self.get_page(f"/somaapp/get-all-posts/?cursor={data['next_cursor']}&limit=10&view=compact")
+        self.assertEqual(sorted(seen), sorted(Post.objects.values_list('id', flat=True)))
+        self.assertEqual(len(set(costs)), 1)
+
+    def test_limit_is_clamped(self):
+        data, _ = self.get_page(f"/somaapp/get-all-posts/?limit={self.POSTS}&view=compact")
+        self.assertEqual(len(data['posts']), MAX_PAGE_LIMIT)
+        self.assertEqual(data['limit'], MAX_PAGE_LIMIT)
+
+
+# Search Pagination Tests (cursor pages follow the rank order, PostgreSQL only)
+class SearchPaginationTests(TestCase):
+    # Number of matching posts (several pages, with tied ranks inside and across pages)
+    POSTS = 11
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Search runs on PostgreSQL full-text search')
+        cache.clear()
+        author = User.objects.create_user(username='author', email='author@example.com', password='password123')
+        Post.objects.bulk_create(
+            [Post(user=author, content=f"{'election ' * (i % 4 + 1)}post {i}", user_data={'username': 'author'}) for i in range(self.POSTS)]
+            + [Post(user=author, content='Unrelated post', user_data={'username': 'author'})]
+        )
+
+    def test_cursor_walk(self):
+        # Walk every page: each match once, best first, and the same total on every page
+        seen = []
+        totals = set()
+        path = '/somaapp/search-posts/?q=election&limit=3&view=compact'
+        cursor = ''
+        while True:
+            response = self.client.get(f"{path}&cursor={cursor}")
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen.extend(post['id'] for post in data['posts'])
+            totals.add(data['total'])
+            if not data['next_cursor']:
+                break
+            cursor = data['next_cursor']
+
+        ranked = search_posts(Post.objects.all(), get_search_query('election')).order_by(f'-{SEARCH_RANK_FIELD}', '-id')
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(seen, list(ranked.values_list('id', flat=True)))
+        self.assertEqual(totals, {self.POSTS})
+
+    def test_renamed_author(self):
+        # Renaming refreshes the snapshots the search indexes
+        author = User.objects.get(username='author')
+        self.assertEqual(self.client.get('/somaapp/search-posts/?q=author').json()['total'], self.POSTS + 1)
+        token = jwt.encode({'id': author.id, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)}, 'secret', algorithm='HS256')
+        self.client.cookies['jwt'] = token
+        response = self.client.post('/somaapp/update-profile/', {'username': 'renamed'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/somaapp/search-posts/?q=renamed').json()['total'], self.POSTS + 1)
+        self.assertEqual(self.client.get('/somaapp/search-posts/?q=author').json()['total'], 0)
+
+
+# Sparse Fieldset Tests (?fields= and ?exclude= only accept the serializer's readable fields)
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username='author', email='author@example.com', password='password123')
+        Post.objects.create(user=author, content='Post')
+
+    def test_known_fields(self):
+        response = self.client.get('/somaapp/get-all-posts/?fields=id,content')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['posts'][0]), {'id', 'content'})
+
+    def test_sort_column_is_loaded(self):
+        # The hot ordering keys its cursor on hot_score, which must not be loaded post by post
+        Post.objects.create(user=Post.objects.get().user, content='Another post')
+        with CaptureQueriesContext(connection) as new_queries:
+            self.client.get('/somaapp/get-all-posts/?fields=id&cursor=&limit=1')
+        with CaptureQueriesContext(connection) as hot_queries:
+            response = self.client.get('/somaapp/get-all-posts/?fields=id&sort=hot&cursor=&limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()['next_cursor'])
+        self.assertEqual(len(hot_queries), len(new_queries))
+
+    def test_unknown_field(self):
+        response = self.client.get('/somaapp/get-all-posts/?fields=id,contnet')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('contnet', response.json()['detail'])
+        self.assertIn('content', response.json()['detail'])
+
+    def test_unknown_excluded_field(self):
+        response = self.client.get('/somaapp/get-all-parties/?exclude=logo_url')
+        self.assertEqual(response.status_code, 400)
+
+    def test_write_only_field(self):
+        response = self.client.get('/somaapp/get-all-users/?fields=id,password')
+        self.assertEqual(response.status_code, 400)
+
+
+# Avatar Tests (only versioned avatar URLs are cached as immutable)
+class AvatarCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='author', email='author@example.com', password='password123')
+        User.objects.filter(id=self.user.id).update(profile_picture='data:image/png;base64,iVBORw0KGgo=')
+
+    def test_versioned(self):
+        response = self.client.get(f'/somaapp/user-avatar/{self.user.id}/?v=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_unversioned(self):
+        response = self.client.get(f'/somaapp/user-avatar/{self.user.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+# Impression Stats Tests (month buckets read rollups where they exist and days elsewhere, with the same figures)
+class ImpressionStatsTests(TestCase):
+    # Days seeded in each month (visitors overlap from one day to the next)
+    DAYS = 3
+
+    def setUp(self):
+        # Two closed months, far enough back for the rollup to keep them
+        month = timezone.now().date().replace(day=1)
+        for _ in range(4):
+            month = (month - datetime.timedelta(days=1)).replace(day=1)
+        self.months = [month, (month + datetime.timedelta(days=32)).replace(day=1)]
+        self.days = {}
+        for m, month in enumerate(self.months):
+            for d in range(self.DAYS):
+                date = month + datetime.timedelta(days=d)
+                sketch = new_sketch()
+                visitors = range((m * self.DAYS + d) * 50, (m * self.DAYS + d) * 50 + 100)
+                for visitor in visitors:
+                    add_hash(sketch, hash_value(f"visitor{visitor}"))
+                self.days[date] = (len(visitors) * 3, bytes(sketch))
+        DailyImpressions.objects.bulk_create([
+            DailyImpressions(date=date, impressions=impressions, visitors_sketch=sketch)
+            for date, (impressions, sketch) in self.days.items()
+        ])
+
+    def get_stats(self, start, end, bucket):
+        response = self.client.get(f'/somaapp/get-impressions-stats/?from={start}&to={end}&bucket={bucket}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def expected(self, start, end, period):
+        """Totals and uniques of the seeded days in a range, computed directly"""
+        days = {date: figures for date, figures in self.days.items() if start <= date <= end}
+        buckets = {}
+        for date, (impressions, sketch) in days.items():
+            bucket = buckets.setdefault(period(date), [0, []])
+            bucket[0] += impressions
+            bucket[1].append(sketch)
+        return {
+            'total_impressions': sum(impressions for impressions, _ in days.values()),
+            'unique_visitors': estimate_cardinality(merge_sketches(sketch for _, sketch in days.values())),
+            'impressions': [
+                {'period': key, 'impressions': total, 'unique_visitors': estimate_cardinality(merge_sketches(sketches))}
+                for key, (total, sketches) in sorted(buckets.items())
+            ],
+        }
+
+    def assertBuckets(self):
+        # Whole months, and a range starting inside the first month (never read from its rollup)
+        end = (self.months[1] + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+        for start in (self.months[0], self.months[0] + datetime.timedelta(days=1)):
+            for bucket, period in (('month', lambda date: date.isoformat()[:7]), ('day', lambda date: date.isoformat())):
+                stats = self.get_stats(start, end, bucket)
+                expected = self.expected(start, end, period)
+                self.assertEqual({key: stats[key] for key in expected}, expected)
+
+    def test_before_rollup(self):
+        self.assertBuckets()
+
+    def test_after_rollup(self):
+        rollup_impressions()
+        self.assertEqual(MonthlyImpressions.objects.count(), len(self.months))
+        self.assertBuckets()
+
+    def test_partial_rollup(self):
+        # One month rolled up, the other still summed from its days
+        rollup_impressions()
+        MonthlyImpressions.objects.filter(month=self.months[1]).delete()
+        self.assertBuckets()
+
+    def test_hour_bucket_retention(self):
+        today = timezone.now().date()
+        oldest = today - datetime.timedelta(days=settings.IMPRESSIONS_HOURLY_RETENTION_DAYS)
+        response = self.client.get(f'/somaapp/get-impressions-stats/?from={oldest - datetime.timedelta(days=1)}&to={oldest}&bucket=hour')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/somaapp/get-impressions-stats/?from={today}&to={today}&bucket=hour')
+        self.assertEqual(response.status_code, 200)
+
+
+# Impression Recording Tests (hits counted in memory from many threads are written exactly once)
+class ImpressionRecordingTests(TestCase):
+    # Parallel recording threads
+    THREADS = 8
+    # Impressions recorded by each thread
+    HITS = 300
+    # Hours the hits are spread over (two on one day, one on the next)
+    HOURS = [
+        datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 5, 11, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 6, 0, tzinfo=datetime.timezone.utc),
+    ]
+
+    def setUp(self):
+        # The test flushes itself instead of starting the background flusher
+        patcher = mock.patch('somaapp.utilities.impression_utils.start_periodic_flush')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for state in (impression_utils._pending, impression_utils._pending_sketches, impression_utils._known_totals):
+            state.clear()
+            self.addCleanup(state.clear)
+
+    def record(self):
+        """Record HITS impressions and visitors per thread and return the expected hourly totals"""
+        # Read each date's stored total here, so the threads never touch the database
+        for hour in self.HOURS:
+            record_impression(hour)
+
+        def hits(thread):
+            for i in range(self.HITS):
+                hour = self.HOURS[i % len(self.HOURS)]
+                record_impression(hour + datetime.timedelta(minutes=i % 60))
+                record_visitor(hour, hash_value(f"visitor{thread}-{i % 20}"))
+
+        threads = [threading.Thread(target=hits, args=(thread,)) for thread in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {hour: 1 + sum(1 for i in range(self.HITS) if i % len(self.HOURS) == h) * self.THREADS for h, hour in enumerate(self.HOURS)}
+
+    def assertStored(self, hourly):
+        self.assertEqual(dict(HourlyImpressions.objects.values_list('hour', 'impressions')), hourly)
+        daily = {}
+        for hour, count in hourly.items():
+            daily[hour.date()] = daily.get(hour.date(), 0) + count
+        self.assertEqual(dict(DailyImpressions.objects.values_list('date', 'impressions')), daily)
+
+    def test_threaded_totals(self):
+        hourly = self.record()
+        self.assertEqual(flush_impressions(), sum(hourly.values()))
+        self.assertStored(hourly)
+        # Nothing is left to write twice
+        self.assertEqual(flush_impressions(), 0)
+        self.assertStored(hourly)
+
+    def test_failed_flush_is_put_back(self):
+        hourly = self.record()
+        upsert = impression_utils._upsert_impressions
+
+        def fail_daily(model, *args):
+            # The hourly write succeeds and is rolled back with the failed daily one
+            if model is DailyImpressions:
+                raise DatabaseError('Simulated failure')
+            return upsert(model, *args)
+
+        with mock.patch('somaapp.utilities.impression_utils._upsert_impressions', side_effect=fail_daily):
+            with self.assertRaises(DatabaseError):
+                flush_impressions()
+        self.assertFalse(HourlyImpressions.objects.exists())
+
+        # The retry writes every hit and visitor once
+        flush_impressions()
+        self.assertStored(hourly)
+        # Every day saw each thread's 20 visitors
+        expected = new_sketch()
+        for thread in range(self.THREADS):
+            for visitor in range(20):
+                add_hash(expected, hash_value(f"visitor{thread}-{visitor}"))
+        for sketch in DailyImpressions.objects.values_list('visitors_sketch', flat=True):
+            self.assertEqual(bytes(sketch), bytes(expected))
+
+
+# HyperLogLog Tests (estimates, merges and the locked sketch rewrite)
+class HyperLogLogTests(TestCase):
+    # Distinct values in the accuracy test
+    DISTINCT = 100000
+    # Allowed relative error (three standard errors of 1.04 / sqrt(HLL_REGISTERS))
+    TOLERANCE = 3 * 1.04 / HLL_REGISTERS ** 0.5
+
+    def sketch(self, values):
+        sketch = new_sketch()
+        for value in values:
+            add_hash(sketch, hash_value(f"visitor{value}"))
+        return sketch
+
+    def test_estimate(self):
+        estimate = estimate_cardinality(self.sketch(range(self.DISTINCT)))
+        self.assertLess(abs(estimate - self.DISTINCT) / self.DISTINCT, self.TOLERANCE)
+
+    def test_duplicates(self):
+        self.assertEqual(self.sketch(list(range(1000)) * 3), self.sketch(range(1000)))
+
+    def test_merge_is_union(self):
+        merged = merge_sketches([self.sketch(range(0, 6000)), None, self.sketch(range(4000, 10000))])
+        self.assertEqual(merged, self.sketch(range(10000)))
+
+    def test_empty(self):
+        self.assertEqual(estimate_cardinality(None), 0)
+        self.assertEqual(estimate_cardinality(new_sketch()), 0)
+        self.assertEqual(estimate_cardinality(merge_sketches([])), 0)
+
+    def test_merge_visitor_sketches(self):
+        # The stored sketch is rewritten as the union, and only dates with a row are touched
+        date = datetime.date(2026, 1, 5)
+        DailyImpressions.objects.create(date=date, visitors_sketch=bytes(self.sketch(range(100))))
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            impression_utils._merge_visitor_sketches({
+                date: self.sketch(range(50, 150)),
+                date + datetime.timedelta(days=1): self.sketch(range(10)),
+            })
+        self.assertEqual(bytes(DailyImpressions.objects.get(date=date).visitors_sketch), bytes(self.sketch(range(150))))
+        self.assertEqual(DailyImpressions.objects.count(), 1)
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', queries.captured_queries[0]['sql'])
+
+
+# Concurrent Sketch Merge Tests (parallel flushes must not overwrite each other's visitors)
+class ConcurrentSketchMergeTests(TransactionTestCase):
+    # Parallel flushes, each merging its own visitors into the same day
+    THREADS = 8
+    # Visitors merged by each flush
+    VISITORS = 200
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Worker threads need their own connections to a database file or server')
+        self.date = datetime.date(2026, 1, 5)
+        DailyImpressions.objects.create(date=self.date, visitors_sketch=bytes(new_sketch()))
+
+    def test_union(self):
+        barrier = threading.Barrier(self.THREADS)
+
+        def merge(thread):
+            sketch = new_sketch()
+            for visitor in range(self.VISITORS):
+                add_hash(sketch, hash_value(f"visitor{thread}-{visitor}"))
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    impression_utils._merge_visitor_sketches({self.date: sketch})
+            finally:
+                connection.close()
+            return sketch
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            sketches = list(executor.map(merge, range(self.THREADS)))
+        stored = DailyImpressions.objects.get(date=self.date).visitors_sketch
+        self.assertEqual(bytes(stored), bytes(merge_sketches(sketches)))
+
+
+# Snapshot Stats Tests (snapshotted and live growth stats must agree)
+class SnapshotStatsTests(TestCase):
+    # Metrics seeded below
+    METRICS = ['users', 'posts', 'parties', 'comments', 'impressions']
+    # Days back at which a record of each metric is created (spans the current and three earlier months)
+    DAYS_AGO = range(0, 120, 3)
+
+    def setUp(self):
+        cache.clear()
+        password = make_password(None)
+        now = timezone.now()
+        author = User.objects.create(username='author', email='author@example.com', password=password)
+        post = Post.objects.create(user=author, content='Post')
+        for days_ago in self.DAYS_AGO:
+            created = now - datetime.timedelta(days=days_ago)
+            user = User.objects.create(username=f"user{days_ago}", email=f"user{days_ago}@example.com", password=password, date_joined=created)
+            # Creation timestamps are set on insert, so they are moved back afterwards
+            Post.objects.filter(id=Post.objects.create(user=user, content=f"Post {days_ago}").id).update(created_at=created)
+            Parties.objects.filter(id=Parties.objects.create(party_name=f"Party {days_ago}").id).update(created_at=created)
+            Comment.objects.filter(id=Comment.objects.create(post=post, user=user, text='Comment').id).update(created_at=created)
+            DailyImpressions.objects.create(date=created.date(), impressions=days_ago + 1)
+        # Parties registered before creation dates were recorded
+        Parties.objects.filter(id__in=[Parties.objects.create(party_name=f"Legacy party {i}").id for i in range(2)]).update(created_at=None)
+
+    def get_stats(self):
+        cache.clear()
+        return {metric: get_growth_stats(metric) for metric in self.METRICS}
+
+    def snapshot(self):
+        call_command('snapshot_stats', '--backfill', stdout=io.StringIO())
+        return sorted(StatsSnapshot.objects.values_list('metric', 'period', 'date', 'count', 'total'))
+
+    def test_backfill_is_idempotent(self):
+        first = self.snapshot()
+        self.assertTrue(first)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_snapshot_matches_live(self):
+        live = self.get_stats()
+        self.snapshot()
+        _, previous_month = get_month_starts(timezone.now())
+        for metric in self.METRICS:
+            self.assertIsNotNone(get_month_snapshot(metric, previous_month.date()))
+        self.assertEqual(self.get_stats(), live)
+        # Undated parties are in the total and in no month
+        self.assertEqual(live['parties']['total'], Parties.objects.count())
+
+
+# Streaming Tests (a failure part-way through still ends in a valid JSON document)
+class StreamingTests(TestCase):
+    def setUp(self):
+        author = User.objects.create(username='author', email='author@example.com', password=make_password(None))
+        Post.objects.bulk_create([Post(user=author, content=f"Post {i}") for i in range(5)])
+
+    def stream(self, serialize_chunk):
+        response = stream_json_response(
+            'posts', Post.objects.order_by('id'), serialize_chunk,
+            extra={'message': 'Posts'}, summary=lambda count: {'count': count}, chunk_size=2
+        )
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_complete(self):
+        data = self.stream(lambda chunk: [{'id': post.id} for post in chunk])
+        self.assertEqual(len(data['posts']), 5)
+        self.assertEqual(data['count'], 5)
+        self.assertNotIn('error', data)
+
+    def test_error_mid_stream(self):
+        def serialize_chunk(chunk):
+            if chunk[0].content == 'Post 2':
+                raise ValueError('Simulated failure')
+            return [{'id': post.id} for post in chunk]
+
+        data = self.stream(serialize_chunk)
+        self.assertEqual(data['message'], 'Posts')
+        self.assertEqual(len(data['posts']), 2)
+        self.assertIn('Simulated failure', data['error'])
+        self.assertNotIn('count', data)
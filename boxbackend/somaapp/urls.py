@@ -1,5 +1,5 @@
 from django.urls import path
-from somaapp.views import SignUpUser, LoginUser, UserView, LogoutView, CheckUsernameAvailability, ResetPasswordRequest, ResetPasswordConfirm, ImportantDetails, VerifyLogin, VerifySignup, CleanupSignup, VerifyOTP, UpdateProfilePicture, UpdateUserProfile, UpdateNotificationSettings, UpdateContentPreferences, UpdatePrivacySettings, CheckExistingUserData, CreatePost, GetAllUsers, GetAllPosts, GetMyPosts, GetUserProfileById, GetUserPosts, UpvotePost, DownvotePost, DeletePost, CommentPost, GetAllParties, RegisterParty, RegisterCandidate, GetAllCandidates, GetUserStats, GetPartyStats, GetCandidateStats, TrackImpressions, GetImpressionsStats, UpdateParty, UpdateCandidate, SearchPosts
+from somaapp.views import SignUpUser, LoginUser, UserView, LogoutView, CheckUsernameAvailability, ResetPasswordRequest, ResetPasswordConfirm, ImportantDetails, VerifyLogin, VerifySignup, CleanupSignup, VerifyOTP, UpdateProfilePicture, UpdateUserProfile, UpdateNotificationSettings, UpdateContentPreferences, UpdatePrivacySettings, CheckExistingUserData, CreatePost, GetAllUsers, GetAllPosts, GetPostsByIds, GetMyPosts, GetUserProfileById, GetUserAvatar, GetUserPosts, UpvotePost, DownvotePost, DeletePost, CommentPost, GetPostComments, GetAllParties, RegisterParty, RegisterCandidate, GetAllCandidates, GetUserStats, GetPartyStats, GetCandidateStats, GetDashboardSummary, TrackImpressions, TrackEvents, GetImpressionsStats, UpdateParty, UpdateCandidate, SearchPosts
 
 
 #  Somaapp URL patterns
@@ -46,10 +46,14 @@ urlpatterns = [
     path('get-all-users/', GetAllUsers.as_view(), name='get-all-users'),
     # Get All Posts URL
     path('get-all-posts/', GetAllPosts.as_view(), name='get-all-posts'),
+    # Get Posts By IDs URL (batch lookup, e.g. ?ids=1,2,3)
+    path('get-posts/', GetPostsByIds.as_view(), name='get-posts'),
     # Get My Posts URL (authenticated user's non-anonymous posts)
     path('get-my-posts/', GetMyPosts.as_view(), name='get-my-posts'),
     # Get User Profile By ID URL (public profile)
     path('get-user-profile/<int:user_id>/', GetUserProfileById.as_view(), name='get-user-profile'),
+    # Get User Avatar URL (profile picture image referenced by the compact feed)
+    path('user-avatar/<int:user_id>/', GetUserAvatar.as_view(), name='user-avatar'),
     # Get User Posts URL (public posts by user_id)
     path('get-user-posts/<int:user_id>/', GetUserPosts.as_view(), name='get-user-posts'),
     # Upvote Post URL
@@ -60,6 +64,8 @@ urlpatterns = [
     path('delete-post/<int:post_id>/', DeletePost.as_view(), name='delete-post'),
     # Comment Post URL
     path('comment-post/<int:post_id>/', CommentPost.as_view(), name='comment-post'),
+    # Get Post Comments URL
+    path('get-post-comments/<int:post_id>/', GetPostComments.as_view(), name='get-post-comments'),
     # Get All Parties URL
     path('get-all-parties/', GetAllParties.as_view(), name='get-all-parties'),
     # Register Party URL
@@ -78,8 +84,12 @@ urlpatterns = [
     path('get-party-stats/', GetPartyStats.as_view(), name='get-party-stats'),
     # Get Candidate Statistics URL
     path('get-candidate-stats/', GetCandidateStats.as_view(), name='get-candidate-stats'),
+    # Get Dashboard Summary URL (all dashboard tiles in one request)
+    path('get-dashboard-summary/', GetDashboardSummary.as_view(), name='get-dashboard-summary'),
     # Track App Impressions URL
     path('track-impressions/', TrackImpressions.as_view(), name='track-impressions'),
+    # Track Client Events URL (batched impressions, post views and shares)
+    path('track-events/', TrackEvents.as_view(), name='track-events'),
     # Get Impressions Statistics URL
     path('get-impressions-stats/', GetImpressionsStats.as_view(), name='get-impressions-stats'),
     # Search Posts URL
@@ -0,0 +1,164 @@
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.urls import reverse
+from ..models import User
+
+
+# Avatar key inside Post.user_data snapshots
+USER_DATA_AVATAR_KEY = 'profilePicture'
+# Avatar key inside comment snapshots
+COMMENT_AVATAR_KEY = 'profile_picture'
+
+# Query parameter carrying the avatar version (see get_avatar_reference)
+AVATAR_VERSION_PARAM = 'v'
+
+# Cache-Control of a versioned avatar URL (a new picture gets a new URL)
+VERSIONED_AVATAR_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Cache-Control of an unversioned avatar URL (the picture behind it can change at any time)
+UNVERSIONED_AVATAR_CACHE_CONTROL = 'public, max-age=300'
+
+
+def get_avatar_path(user_id):
+    """Unversioned avatar URL stored in post and comment snapshots"""
+    return reverse('user-avatar', args=[user_id])
+
+
+def get_avatar_reference(user_id, updated_at):
+    """
+    Build the URL clients use to load a user's profile picture.
+
+    The user's updated_at is appended as a version so the avatar can be
+    cached indefinitely and still refresh after a profile change.
+    """
+    return f"{get_avatar_path(user_id)}?{AVATAR_VERSION_PARAM}={int(updated_at.timestamp())}"
+
+
+def get_snapshot_avatar(user):
+    """
+    Get the avatar value to store in a post or comment snapshot.
+
+    Args:
+        user (User): The author
+
+    Returns:
+        str or None: The author's avatar URL, or None without a picture
+    """
+    return get_avatar_path(user.id) if user.profile_picture else None
+
+
+def has_avatar_expression(prefix=''):
+    """
+    SQL expression telling whether a user has a profile picture, without loading it.
+
+    Args:
+        prefix (str): Lookup path to the user, e.g. "user__" on a Post queryset
+    """
+    return ExpressionWrapper(
+        Q(**{f'{prefix}profile_picture__isnull': False}) & ~Q(**{f'{prefix}profile_picture': ''}),
+        output_field=BooleanField()
+    )
+
+
+def get_user_avatar(user):
+    """
+    Get a loaded user's versioned avatar URL.
+
+    Uses the user's `has_avatar` flag when the queryset provided one (so the
+    picture column can stay deferred) and reads the picture otherwise.
+
+    Args:
+        user (User): The user
+
+    Returns:
+        str or None: The avatar URL, or None without a picture
+    """
+    has_avatar = getattr(user, 'has_avatar', None)
+    if has_avatar is None:
+        has_avatar = bool(user.profile_picture)
+    return get_avatar_reference(user.id, user.updated_at) if has_avatar else None
+
+
+def get_avatar_references(user_ids):
+    """
+    Resolve the current avatar of many users with one query.
+
+    Args:
+        user_ids (set): User IDs to resolve
+
+    Returns:
+        dict: Versioned avatar URL (or None) keyed by user ID
+    """
+    if not user_ids:
+        return {}
+
+    rows = User.objects.filter(id__in=user_ids).values('id', 'updated_at', has_avatar=has_avatar_expression())
+    return {
+        row['id']: get_avatar_reference(row['id'], row['updated_at']) if row['has_avatar'] else None
+        for row in rows
+    }
+
+
+def _fill_avatars(slots):
+    """
+    Resolve avatar slots with one lookup and write the results into them.
+
+    Args:
+        slots (list): (dict, key, user_id) tuples to fill in
+    """
+    avatars = get_avatar_references({user_id for _, _, user_id in slots})
+    for target, key, user_id in slots:
+        target[key] = avatars.get(user_id)
+
+
+def _comment_slots(comments):
+    """Avatar slots of serialized comment dicts"""
+    return [
+        (comment, COMMENT_AVATAR_KEY, comment['user_id'])
+        for comment in comments or []
+        if isinstance(comment, dict) and comment.get('user_id')
+    ]
+
+
+def resolve_comment_avatars(comments):
+    """
+    Fill in the avatars of serialized comments with current references.
+
+    Args:
+        comments (list): Serialized comment dicts (updated in place)
+
+    Returns:
+        list: The same comment dicts
+    """
+    _fill_avatars(_comment_slots(comments))
+    return comments
+
+
+def resolve_snapshot_avatars(posts):
+    """
+    Replace the avatars in serialized post snapshots with current references.
+
+    The authors of every user_data snapshot and every comment in the list are
+    resolved together, so a response costs one lookup however many posts and
+    comments it holds.
+
+    Args:
+        posts (list): Serialized post dicts (updated in place)
+
+    Returns:
+        list: The same post dicts
+    """
+    slots = []
+    for post in posts:
+        user_data = post.get('user_data')
+        if isinstance(user_data, dict) and user_data.get('userId'):
+            slots.append((user_data, USER_DATA_AVATAR_KEY, user_data['userId']))
+        slots.extend(_comment_slots(post.get('comments')))
+
+    _fill_avatars(slots)
+    return posts
+
+
+def get_avatar_cache_control(request):
+    """Cache-Control for an avatar response: long-lived only when the URL carries a version"""
+    if request.GET.get(AVATAR_VERSION_PARAM):
+        return VERSIONED_AVATAR_CACHE_CONTROL
+    return UNVERSIONED_AVATAR_CACHE_CONTROL
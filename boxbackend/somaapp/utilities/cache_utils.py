@@ -0,0 +1,145 @@
+import hashlib
+import time
+from django.core.cache import cache
+
+
+# Cache key holding the current version of the public feed
+FEED_VERSION_KEY = 'feed:version'
+# Cache keys counting feed page cache hits and misses
+FEED_CACHE_HITS_KEY = 'feed:stats:hits'
+FEED_CACHE_MISSES_KEY = 'feed:stats:misses'
+# How long a rendered feed page is kept (old versions simply expire)
+FEED_PAGE_TIMEOUT = 300
+# How long a request waits for another worker to fill a single-flight key
+SINGLE_FLIGHT_WAIT = 5
+
+
+def _new_version():
+    """A version that cannot collide with one handed out before the key was lost"""
+    return int(time.time() * 1000)
+
+
+def _increment(key):
+    """Increment a counter key, creating it if it does not exist yet"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def get_feed_version():
+    """
+    Get the current feed version, initialising it on first use.
+
+    Returns:
+        int: The version every cached feed page key is built from
+    """
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """
+    Invalidate every cached feed page in O(1).
+
+    Pages are keyed by version, so moving to a new version makes all
+    previously cached pages unreachable; they expire on their own.
+    """
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        # The version was evicted - start from a fresh, never-used value
+        cache.set(FEED_VERSION_KEY, _new_version(), timeout=None)
+
+
+def get_feed_page_key(request):
+    """
+    Build the cache key for a feed page request.
+
+    Args:
+        request: The DRF request; all query parameters are part of the key
+
+    Returns:
+        str: Cache key scoped to the current feed version
+    """
+    params = '&'.join(f"{key}={value}" for key, value in sorted(request.GET.items()))
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f"feed:page:{get_feed_version()}:{digest}"
+
+
+def get_cached_feed_page(key):
+    """
+    Look up a rendered feed page and record the hit or miss.
+
+    Args:
+        key (str): Key from get_feed_page_key
+
+    Returns:
+        dict or None: The cached response data, or None on a miss
+    """
+    data = cache.get(key)
+    _increment(FEED_CACHE_HITS_KEY if data is not None else FEED_CACHE_MISSES_KEY)
+    return data
+
+
+def set_cached_feed_page(key, data):
+    """Store a rendered feed page under the given key"""
+    cache.set(key, data, timeout=FEED_PAGE_TIMEOUT)
+
+
+def get_feed_cache_stats():
+    """
+    Get the feed page cache counters.
+
+    Returns:
+        dict: hits, misses and the current feed version
+    """
+    return {
+        'hits': cache.get(FEED_CACHE_HITS_KEY, 0),
+        'misses': cache.get(FEED_CACHE_MISSES_KEY, 0),
+        'version': get_feed_version(),
+    }
+
+
+def get_or_set_single_flight(key, compute, timeout, wait=SINGLE_FLIGHT_WAIT):
+    """
+    Get a cached value, letting only one caller at a time recompute it.
+
+    On a miss the first caller takes a lock key (cache.add is atomic) and
+    fills the cache; concurrent callers poll for that result instead of
+    running the same queries. If the value does not show up within `wait`
+    seconds (the computing worker is slow or died) they compute it themselves.
+
+    Args:
+        key (str): Cache key of the value
+        compute (callable): Builds the value on a miss
+        timeout (int): Seconds to keep the value
+        wait (float): Seconds to wait for another caller's result
+
+    Returns:
+        The cached or freshly computed value
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=int(wait) + 1):
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return compute()
@@ -0,0 +1,77 @@
+from django.db.models import F
+from django.utils import timezone
+from ..models import Post, PostCounter
+
+
+# Counter key for the total number of posts
+ALL_POSTS_KEY = 'all'
+
+
+def get_user_posts_key(user_id):
+    """Counter key for a user's non-anonymous posts"""
+    return f"user:{user_id}"
+
+
+def _get_count(key, queryset):
+    """
+    Read a counter, seeding it from the real COUNT the first time it is used.
+
+    Args:
+        key (str): The counter key
+        queryset (QuerySet): Posts the counter stands for
+
+    Returns:
+        int: The maintained count
+    """
+    count = PostCounter.objects.filter(key=key).values_list('count', flat=True).first()
+    if count is None:
+        counter, _ = PostCounter.objects.get_or_create(key=key, defaults={'count': queryset.count()})
+        count = counter.count
+    return count
+
+
+def _add(key, delta):
+    """
+    Atomically apply a delta to an existing counter.
+
+    Counters that do not exist yet are left alone: they are seeded from the
+    real COUNT on first read, which already includes this change.
+    """
+    counters = PostCounter.objects.filter(key=key)
+    if delta < 0:
+        counters = counters.filter(count__gte=-delta)
+    counters.update(count=F('count') + delta, updated_at=timezone.now())
+
+
+def get_post_count():
+    """Get the total number of posts"""
+    return _get_count(ALL_POSTS_KEY, Post.objects.all())
+
+
+def get_user_post_count(user):
+    """Get the number of non-anonymous posts by a user"""
+    return _get_count(get_user_posts_key(user.id), Post.objects.filter(user=user, is_anonymous=False))
+
+
+def record_post_created(post):
+    """
+    Count a newly created post. Call inside the transaction that creates it.
+
+    Args:
+        post (Post): The post that was created
+    """
+    _add(ALL_POSTS_KEY, 1)
+    if not post.is_anonymous:
+        _add(get_user_posts_key(post.user_id), 1)
+
+
+def record_post_deleted(post):
+    """
+    Uncount a deleted post. Call inside the transaction that deletes it.
+
+    Args:
+        post (Post): The post that was deleted
+    """
+    _add(ALL_POSTS_KEY, -1)
+    if not post.is_anonymous:
+        _add(get_user_posts_key(post.user_id), -1)
@@ -0,0 +1,55 @@
+import hashlib
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def build_etag(request, *parts):
+    """
+    Build a strong ETag from version parts and the request's query parameters.
+
+    Args:
+        request: The DRF request (query parameters change the payload)
+        *parts: Values that change whenever the payload changes
+
+    Returns:
+        str: A quoted ETag value
+    """
+    params = '&'.join(f"{key}={value}" for key, value in sorted(request.GET.items()))
+    raw = '|'.join(str(part) for part in parts) + '|' + params
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def get_queryset_version(queryset):
+    """
+    Get a cheap version of a queryset without loading its rows.
+
+    Any insert, update or delete changes either the latest updated_at or the
+    row count, so the pair identifies the current state of the rows.
+
+    Args:
+        queryset (QuerySet): A queryset over a model with an updated_at field
+
+    Returns:
+        tuple: (latest updated_at as ISO string or '', row count)
+    """
+    version = queryset.aggregate(last_updated=Max('updated_at'), total=Count('id'))
+    last_updated = version['last_updated']
+    return (last_updated.isoformat() if last_updated else '', version['total'])
+
+
+def etag_matches(request, etag):
+    """Check whether the client's If-None-Match header matches the ETag"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak validators are accepted for GET revalidation
+    client_etags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return etag in client_etags
+
+
+def not_modified_response(etag):
+    """Empty 304 response that tells the client to reuse its cached body"""
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
@@ -0,0 +1,81 @@
+import datetime
+from collections import Counter
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from ..models import Post
+from .impression_utils import get_impression_hour, record_impression, record_visitor
+from .sharded_counter_utils import get_counter_name, increment_counter
+
+
+# Event types accepted by the track-events endpoint
+IMPRESSION_EVENT = 'impression'
+POST_VIEW_EVENT = 'post_view'
+SHARE_EVENT = 'share'
+EVENT_TYPES = [IMPRESSION_EVENT, POST_VIEW_EVENT, SHARE_EVENT]
+
+# Post counter column for each post event type
+POST_EVENT_COLUMNS = {
+    POST_VIEW_EVENT: 'view_count',
+    SHARE_EVENT: 'share_count',
+}
+
+# Maximum number of events accepted in one batch
+MAX_EVENTS_PER_BATCH = 500
+
+# How far client timestamps may lie in the past (buffered offline) or the future (clock skew)
+MAX_EVENT_AGE = datetime.timedelta(days=7)
+MAX_CLOCK_SKEW = datetime.timedelta(minutes=5)
+
+
+def record_events(events, visitor_hash=None):
+    """
+    Merge a batch of validated events into their counters.
+
+    Impressions are summed per hour and added to the impression counters,
+    post views and shares are summed per post and written with one
+    batched UPDATE (a CASE per counter column), so a batch costs the same
+    few queries however many events it holds.
+
+    Args:
+        events (list): Validated event dicts with `type`, `timestamp` and, for post events, `post_id`
+        visitor_hash (int): Hashed id of the client sending the batch, counted as a
+            unique visitor on every day it has impressions
+
+    Returns:
+        dict: Number of impressions, post views and shares recorded
+    """
+    impressions = Counter()
+    post_counts = {column: Counter() for column in POST_EVENT_COLUMNS.values()}
+    for event in events:
+        if event['type'] == IMPRESSION_EVENT:
+            impressions[get_impression_hour(event['timestamp'])] += 1
+        else:
+            post_counts[POST_EVENT_COLUMNS[event['type']]][event['post_id']] += 1
+
+    for hour, count in impressions.items():
+        if settings.IMPRESSIONS_SHARDED:
+            increment_counter(get_counter_name('impressions', hour.date().isoformat()), count)
+            increment_counter(get_counter_name('hourly_impressions', hour.isoformat()), count)
+        else:
+            record_impression(hour, count)
+
+    if visitor_hash is not None:
+        for hour in {hour.replace(hour=0) for hour in impressions}:
+            record_visitor(hour, visitor_hash)
+
+    post_ids = set().union(*post_counts.values())
+    if post_ids:
+        Post.objects.filter(id__in=post_ids).update(**{
+            column: F(column) + Case(
+                *[When(id=post_id, then=Value(count)) for post_id, count in counts.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            )
+            for column, counts in post_counts.items() if counts
+        })
+
+    return {
+        'impressions': sum(impressions.values()),
+        'post_views': sum(post_counts['view_count'].values()),
+        'shares': sum(post_counts['share_count'].values()),
+    }
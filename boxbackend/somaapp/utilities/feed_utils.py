@@ -0,0 +1,176 @@
+from django.db.models import Prefetch
+from ..models import Comment, Parties, Post, User
+from ..serializers import FeedPostSerializer, PostSerializer
+from .avatar_utils import get_avatar_reference, has_avatar_expression
+from .streaming_utils import stream_json_response
+
+
+# Party columns rendered by PostSerializer.get_parties
+POST_PARTY_FIELDS = ['id', 'party_name', 'manifesto', 'votes', 'logo']
+
+# Comment columns rendered by CommentSerializer (with the author's name joined in)
+POST_COMMENT_FIELDS = ['id', 'post', 'user', 'text', 'created_at', 'user__username', 'user__full_name']
+
+# Post columns read by FeedPostSerializer (user_data and its embedded picture are never loaded)
+COMPACT_POST_FIELDS = [
+    'id', 'user', 'content', 'images', 'videos', 'is_anonymous',
+    'created_at', 'updated_at', 'upvotes', 'downvotes', 'comment_count'
+]
+
+# Maximum number of posts that can be fetched in one batch lookup
+MAX_BATCH_POST_IDS = 50
+
+
+def prepare_post_queryset(queryset):
+    """
+    Attach the related data PostSerializer reads to a Post queryset.
+
+    The author is joined in the same query and the parties and comments of
+    every post on the page are loaded with one extra query each, so
+    serializing a list of posts costs a constant number of queries regardless
+    of its length. Only the first Post.COMMENT_PREVIEW comments of each post
+    are loaded (a windowed prefetch), so a post's payload stays bounded
+    however many comments it has; `comment_count` holds the full count.
+
+    Args:
+        queryset (QuerySet): A Post queryset
+
+    Returns:
+        QuerySet: The same queryset with select_related/prefetch_related applied
+    """
+    # The search document is only read by the database, and authors' pictures
+    # are sent as avatar URLs, so neither column is loaded
+    queryset = queryset.select_related('user').defer('search_vector', 'user__profile_picture')
+    return queryset.annotate(author_has_avatar=has_avatar_expression('user__')).prefetch_related(
+        Prefetch('parties', queryset=Parties.objects.only(*POST_PARTY_FIELDS)),
+        Prefetch(
+            'comments',
+            queryset=prepare_comment_queryset(Comment.objects.all())[:Post.COMMENT_PREVIEW],
+            to_attr='preview_comments'
+        ),
+    )
+
+
+def prepare_comment_queryset(queryset):
+    """
+    Restrict a Comment queryset to the columns CommentSerializer reads.
+
+    Args:
+        queryset (QuerySet): A Comment queryset
+
+    Returns:
+        QuerySet: The queryset with the author's name joined in
+    """
+    return queryset.select_related('user').only(*POST_COMMENT_FIELDS)
+
+
+def is_compact_view(request):
+    """Check whether the client asked for the compact feed (`?view=compact`)"""
+    return request.GET.get('view') == 'compact'
+
+
+def prepare_compact_post_queryset(queryset):
+    """
+    Restrict a Post queryset to the columns FeedPostSerializer reads.
+
+    Args:
+        queryset (QuerySet): A Post queryset
+
+    Returns:
+        QuerySet: The projected queryset with compact parties prefetched
+    """
+    return queryset.only(*COMPACT_POST_FIELDS).prefetch_related(
+        Prefetch('parties', queryset=Parties.objects.only('id', 'party_name'))
+    )
+
+
+def get_feed_authors(posts):
+    """
+    Load one author stub per distinct non-anonymous author on a page.
+
+    Args:
+        posts (list): Post instances on the current page
+
+    Returns:
+        dict: Author stubs keyed by user ID (as a string, matching JSON keys)
+    """
+    return get_author_stubs({post.user_id for post in posts if not post.is_anonymous})
+
+
+def get_author_stubs(author_ids):
+    """
+    Load author stubs for a set of user IDs with one values() query.
+
+    Args:
+        author_ids (set): User IDs to load
+
+    Returns:
+        dict: Author stubs keyed by user ID (as a string, matching JSON keys)
+    """
+    if not author_ids:
+        return {}
+
+    rows = User.objects.filter(id__in=author_ids).values(
+        'id', 'username', 'full_name', 'updated_at', has_avatar=has_avatar_expression()
+    )
+
+    return {
+        str(row['id']): {
+            'id': row['id'],
+            'username': row['username'],
+            'full_name': row['full_name'],
+            'avatar': get_avatar_reference(row['id'], row['updated_at']) if row['has_avatar'] else None,
+        }
+        for row in rows
+    }
+
+
+def serialize_compact_feed(posts):
+    """
+    Serialize a page of posts in the compact feed format.
+
+    Args:
+        posts (list): Post instances from prepare_compact_post_queryset
+
+    Returns:
+        dict: `posts` (compact post dicts) and `authors` (stubs keyed by ID)
+    """
+    return {
+        'posts': FeedPostSerializer(posts, many=True).data,
+        'authors': get_feed_authors(posts),
+    }
+
+
+def stream_post_feed(queryset, compact=False, fields=None, exclude=None, extra=None, summary=None):
+    """
+    Stream posts as JSON in the full or compact feed format.
+
+    In compact mode the author IDs seen while streaming are collected and
+    their stubs are written once, after the post list.
+
+    Args:
+        queryset (QuerySet): Prepared, ordered Post queryset
+        compact (bool): Use FeedPostSerializer and append an `authors` map
+        fields (list): Sparse fieldset for PostSerializer
+        exclude (list): Excluded fields for PostSerializer
+        extra (dict): Fields written before the post list
+        summary (callable): Called with the post count, returns fields written after the list
+
+    Returns:
+        StreamingHttpResponse: application/json response
+    """
+    author_ids = set()
+
+    def serialize_chunk(chunk):
+        if compact:
+            author_ids.update(post.user_id for post in chunk if not post.is_anonymous)
+            return FeedPostSerializer(chunk, many=True).data
+        return PostSerializer(chunk, many=True, fields=fields, exclude=exclude).data
+
+    def finish(count):
+        data = dict(summary(count)) if summary else {}
+        if compact:
+            data['authors'] = get_author_stubs(author_ids)
+        return data
+
+    return stream_json_response('posts', queryset, serialize_chunk, extra=extra, summary=finish)
@@ -0,0 +1,60 @@
+def parse_fieldset(request, serializer_class):
+    """
+    Read the sparse fieldset query parameters.
+
+    Args:
+        request: The DRF request, e.g. `?fields=id,party_name,votes` or `?exclude=logo`
+        serializer_class: The SparseFieldsetMixin serializer the names are checked against
+
+    Returns:
+        tuple: (fields: list or None, exclude: list or None)
+
+    Raises:
+        ValueError: If a name is not one of the serializer's readable fields (the message lists them)
+    """
+    def split(param):
+        value = request.GET.get(param)
+        if not value:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    fields, exclude = split('fields'), split('exclude')
+    serializer_class.get_output_fields(fields, exclude)
+    return fields, exclude
+
+
+def apply_fieldset(queryset, serializer_class, fields=None, exclude=None, required=()):
+    """
+    Defer the columns a sparse fieldset does not need at the ORM level.
+
+    Unrequested columns are left out of the SELECT, joins are limited to the
+    relations still in use and prefetches are dropped when the fields that
+    read them were not requested.
+
+    Args:
+        queryset (QuerySet): Queryset for serializer_class's model
+        serializer_class: A serializer using SparseFieldsetMixin
+        fields (list): Field names to keep, or None for all
+        exclude (list): Field names to drop
+        required (iterable): Columns the view itself reads (e.g. for pagination)
+
+    Returns:
+        QuerySet: The queryset restricted with .only()
+    """
+    if fields is None and not exclude:
+        return queryset
+
+    columns = serializer_class.get_only_columns(fields, exclude) | set(required)
+    model = serializer_class.Meta.model
+
+    # Keep only the joins whose columns are still loaded
+    relations = [name for name in columns if '__' not in name and model._meta.get_field(name).is_relation]
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+
+    output_fields = serializer_class.get_output_fields(fields, exclude)
+    if not any(name in output_fields for name in serializer_class.prefetch_fields):
+        queryset = queryset.prefetch_related(None)
+
+    return queryset.only(*columns)
@@ -0,0 +1,53 @@
+import atexit
+import threading
+import time
+from django.db import connection
+
+
+# Background flusher threads started in this process, by name
+_flushers = {}
+_flushers_lock = threading.Lock()
+
+
+def _flush_loop(name, flush, interval_ms):
+    """Background thread body: call flush every interval_ms until the process exits"""
+    while True:
+        time.sleep(interval_ms / 1000)
+        try:
+            flush()
+        except Exception as e:
+            print(f"Error in {name} flush:", str(e))
+            # Start the next attempt on a fresh connection
+            connection.close()
+
+
+def _flush_at_exit(name, flush):
+    """Final flush when the worker shuts down cleanly"""
+    try:
+        flush()
+    except Exception as e:
+        print(f"Error in final {name} flush:", str(e))
+
+
+def start_periodic_flush(name, flush, interval_ms):
+    """
+    Start a daemon thread that calls `flush` every `interval_ms`, once per process.
+
+    The same function also runs at interpreter exit, so buffered data is
+    written when a worker shuts down cleanly (gunicorn and runserver exit
+    through SystemExit, which runs atexit handlers).
+
+    Args:
+        name (str): Flusher name (also the thread name); later calls with it are no-ops
+        flush (callable): Writes the buffered data; exceptions are logged and retried next time
+        interval_ms (int): Milliseconds between flushes
+    """
+    if name in _flushers:
+        return
+    with _flushers_lock:
+        if name in _flushers:
+            return
+        thread = threading.Thread(target=_flush_loop, args=(name, flush, interval_ms), name=name, daemon=True)
+        thread.start()
+        atexit.register(_flush_at_exit, name, flush)
+        _flushers[name] = thread
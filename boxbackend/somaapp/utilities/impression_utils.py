@@ -0,0 +1,482 @@
+import datetime
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DateField, DateTimeField, Exists, F, IntegerField, Max, OuterRef, Sum, Value
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from ..models import DailyImpressions, HourlyImpressions, MonthlyImpressions
+from .flush_utils import start_periodic_flush
+from .hll_utils import add_hash, estimate_cardinality, hash_value, merge_sketches, new_sketch
+from .sharded_counter_utils import get_counter_totals
+
+
+# Impressions counted by this process and not yet written, keyed by hour
+_pending = Counter()
+# Visitor sketches built by this process and not yet merged into the database, keyed by date
+_pending_sketches = {}
+# Last database total seen for each date, keyed by ISO date
+_known_totals = {}
+_pending_lock = threading.Lock()
+
+# Series buckets, finest first
+HOUR = 'hour'
+DAY = 'day'
+WEEK = 'week'
+MONTH = 'month'
+BUCKETS = [HOUR, DAY, WEEK, MONTH]
+
+# Longest range served from each bucket when the client does not pick one
+MAX_HOURLY_RANGE = datetime.timedelta(days=2)
+MAX_DAILY_RANGE = datetime.timedelta(days=92)
+MAX_WEEKLY_RANGE = datetime.timedelta(days=366)
+
+# Most buckets one stats response may hold
+MAX_SERIES_BUCKETS = 400
+
+# Trailing windows (in days) reported as unique visitor figures
+UNIQUE_VISITOR_WINDOWS = {'today': 1, 'week': 7, 'month': 30}
+
+def get_impression_hour(timestamp):
+    """Start of the UTC hour a timestamp falls in"""
+    return timestamp.astimezone(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record_impression(timestamp, count=1):
+    """
+    Count impressions in this process without touching the database.
+
+    Hits are summed per hour in memory and written by a background flush
+    every settings.IMPRESSIONS_FLUSH_INTERVAL_MS (and once more when the
+    worker shuts down), so a page view costs no write and concurrent views
+    never overwrite each other's increments.
+
+    Args:
+        timestamp (datetime): When the impressions happened
+        count (int): Number of impressions to add
+
+    Returns:
+        int: Impressions for the timestamp's date - the last flushed total
+            plus this process's pending hits (other workers' pending hits show
+            up after their next flush)
+    """
+    hour = get_impression_hour(timestamp)
+    date = hour.date()
+    key = date.isoformat()
+    if key not in _known_totals:
+        # One read the first time this process sees a date
+        _known_totals[key] = DailyImpressions.objects.filter(date=date).values_list('impressions', flat=True).first() or 0
+
+    with _pending_lock:
+        _pending[hour] += count
+        impressions = _known_totals[key] + sum(total for pending_hour, total in _pending.items() if pending_hour.date() == date)
+    start_periodic_flush('impression-flusher', flush_impressions, getattr(settings, 'IMPRESSIONS_FLUSH_INTERVAL_MS', 1000))
+    return impressions
+
+
+def get_visitor_hash(request):
+    """
+    Hash the visitor behind a request for unique-visitor counting.
+
+    Clients identify themselves with a `visitor_id` in the body or an
+    X-Visitor-Id header (e.g. a random id kept in local storage); otherwise
+    the client address and user agent stand in for it.
+
+    Args:
+        request (Request): The tracking request
+
+    Returns:
+        int: 64-bit keyed hash of the visitor id
+    """
+    visitor_id = request.data.get('visitor_id') if isinstance(request.data, dict) else None
+    visitor_id = visitor_id or request.headers.get('X-Visitor-Id')
+    if not visitor_id:
+        address = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+        visitor_id = f"{address}|{request.headers.get('User-Agent', '')}"
+    return hash_value(str(visitor_id))
+
+
+def record_visitor(timestamp, visitor_hash):
+    """
+    Add a visitor to this process's sketch for the timestamp's date.
+
+    Sketches are merged into DailyImpressions.visitors_sketch by the same
+    background flush as the impressions.
+
+    Args:
+        timestamp (datetime): When the visit happened
+        visitor_hash (int): Value from get_visitor_hash
+    """
+    date = get_impression_hour(timestamp).date()
+    with _pending_lock:
+        add_hash(_pending_sketches.setdefault(date, new_sketch()), visitor_hash)
+    start_periodic_flush('impression-flusher', flush_impressions, getattr(settings, 'IMPRESSIONS_FLUSH_INTERVAL_MS', 1000))
+
+
+def flush_impressions():
+    """
+    Write this process's pending impressions to the hourly and daily tables.
+
+    Each table gets one `INSERT ... ON CONFLICT DO UPDATE SET impressions =
+    impressions + n` covering every pending bucket, which creates missing
+    rows and adds to existing ones atomically. If the write fails the counts
+    are put back and retried on the next flush.
+
+    Returns:
+        int: Number of impressions written
+    """
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        pending_sketches = dict(_pending_sketches)
+        _pending_sketches.clear()
+    if not pending and not pending_sketches:
+        return 0
+
+    days = Counter({date: 0 for date in pending_sketches})
+    for hour, count in pending.items():
+        days[hour.date()] += count
+
+    try:
+        with transaction.atomic():
+            if pending:
+                _upsert_impressions(HourlyImpressions, 'hour', pending, connection.ops.adapt_datetimefield_value)
+            # Also creates the rows the sketches are merged into
+            totals = _upsert_impressions(DailyImpressions, 'date', days, connection.ops.adapt_datefield_value)
+            _merge_visitor_sketches(pending_sketches)
+    except Exception:
+        with _pending_lock:
+            _pending.update(pending)
+            for date, sketch in pending_sketches.items():
+                _pending_sketches[date] = merge_sketches([_pending_sketches.get(date), sketch])
+        raise
+
+    _known_totals.update(totals)
+    return sum(pending.values())
+
+
+def _merge_visitor_sketches(pending_sketches):
+    """Merge {date: sketch} into the stored daily sketches, locking the rows while they are rewritten"""
+    if not pending_sketches:
+        return
+    rows = DailyImpressions.objects.select_for_update().filter(date__in=pending_sketches).values_list('date', 'visitors_sketch')
+    for date, stored in rows:
+        DailyImpressions.objects.filter(date=date).update(
+            visitors_sketch=bytes(merge_sketches([stored, pending_sketches[date]]))
+        )
+
+
+def _upsert_impressions(model, key_field, counts, adapt):
+    """Add {key: count} to an impressions table in one statement, returning the new totals by key string"""
+    ops = connection.ops
+    table = ops.quote_name(model._meta.db_table)
+    key, impressions, created_at, updated_at = (ops.quote_name(column) for column in (key_field, 'impressions', 'created_at', 'updated_at'))
+    now = ops.adapt_datetimefield_value(timezone.now())
+
+    params = []
+    for bucket, count in counts.items():
+        params += [adapt(bucket), count, now, now]
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(counts))
+
+    sql = (
+        f"INSERT INTO {table} ({key}, {impressions}, {created_at}, {updated_at}) VALUES {values} "
+        f"ON CONFLICT ({key}) DO UPDATE SET "
+        f"{impressions} = {table}.{impressions} + EXCLUDED.{impressions}, {updated_at} = EXCLUDED.{updated_at} "
+        f"RETURNING {key}, {impressions}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {str(bucket)[:10]: total for bucket, total in cursor.fetchall()}
+
+
+def rollup_impressions(retention_days=None):
+    """
+    Roll daily impressions up into months and prune old hourly buckets.
+
+    Monthly totals and visitor sketches are rebuilt from DailyImpressions and
+    upserted, so the rollup is idempotent and can run as often as needed.
+    Only the current and previous month and older months whose days changed
+    since their last rollup are rebuilt. Hourly buckets older than the
+    retention period are deleted; the daily and monthly tables keep their
+    figures.
+
+    Args:
+        retention_days (int): Days of hourly buckets to keep, defaults to
+            settings.IMPRESSIONS_HOURLY_RETENTION_DAYS
+
+    Returns:
+        tuple: (months rebuilt, hourly buckets deleted)
+    """
+    if retention_days is None:
+        retention_days = settings.IMPRESSIONS_HOURLY_RETENTION_DAYS
+
+    rows = DailyImpressions.objects.annotate(month=TruncMonth('date')).values('month').annotate(
+        total=Sum('impressions'),
+        last_updated=Max('updated_at')
+    ).order_by()
+    rolled_up = dict(MonthlyImpressions.objects.values_list('month', 'updated_at'))
+    previous_month = (timezone.now().date().replace(day=1) - datetime.timedelta(days=1)).replace(day=1)
+    months = []
+    for row in rows:
+        recent = row['month'] >= previous_month
+        if not recent and row['month'] in rolled_up and row['last_updated'] < rolled_up[row['month']]:
+            continue
+        days = DailyImpressions.objects.filter(date__year=row['month'].year, date__month=row['month'].month)
+        sketch = merge_sketches(days.values_list('visitors_sketch', flat=True))
+        months.append(MonthlyImpressions(month=row['month'], impressions=row['total'], visitors_sketch=bytes(sketch)))
+
+    with transaction.atomic():
+        MonthlyImpressions.objects.bulk_create(
+            months,
+            update_conflicts=True,
+            unique_fields=['month'],
+            update_fields=['impressions', 'visitors_sketch', 'updated_at']
+        )
+        cutoff = get_impression_hour(timezone.now()) - datetime.timedelta(days=retention_days)
+        pruned, _ = HourlyImpressions.objects.filter(hour__lt=cutoff).delete()
+    return len(months), pruned
+
+
+def get_oldest_hourly_date():
+    """First date whose hourly buckets are still retained (older ones are pruned by rollup_impressions)"""
+    return timezone.now().date() - datetime.timedelta(days=settings.IMPRESSIONS_HOURLY_RETENTION_DAYS)
+
+
+def choose_bucket(start, end):
+    """
+    Pick the coarsest bucket that still shows detail for a date range.
+
+    Short ranges use hourly buckets while those are retained, ranges of up to
+    a quarter use days, up to a year weeks, and anything longer months.
+
+    Args:
+        start (date): First day of the range
+        end (date): Last day of the range (inclusive)
+
+    Returns:
+        str: HOUR, DAY, WEEK or MONTH
+    """
+    span = end - start + datetime.timedelta(days=1)
+    if span <= MAX_HOURLY_RANGE and start >= get_oldest_hourly_date():
+        return HOUR
+    if span <= MAX_DAILY_RANGE:
+        return DAY
+    if span <= MAX_WEEKLY_RANGE:
+        return WEEK
+    return MONTH
+
+
+def count_buckets(start, end, bucket):
+    """Number of buckets a range spans (used to cap the response size)"""
+    days = (end - start).days + 1
+    if bucket == HOUR:
+        return days * 24
+    if bucket == DAY:
+        return days
+    if bucket == WEEK:
+        return (end - get_bucket_start(start, WEEK)).days // 7 + 1
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def get_bucket_start(date, bucket):
+    """First day of the day, week (Monday) or month bucket a date falls in"""
+    if bucket == WEEK:
+        return date - datetime.timedelta(days=date.weekday())
+    if bucket == MONTH:
+        return date.replace(day=1)
+    return date
+
+
+def _month_end(month):
+    """Last day of the month starting on `month`"""
+    return (month + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+
+
+def _get_rolled_up_months(start, end, today):
+    """
+    First and last month of a range that MonthlyImpressions may answer.
+
+    Only closed months lying wholly inside the range qualify; the partial
+    months at either end and the current month are summed from their days.
+    Months in the span without a rollup row yet (rollup_impressions has not
+    run) are summed from their days too, see _exclude_rolled_up.
+
+    Returns:
+        tuple: (first month, last month) as first-of-month dates, or None
+    """
+    first = start if start.day == 1 else _month_end(start.replace(day=1)) + datetime.timedelta(days=1)
+    last_day = min(end, today.replace(day=1) - datetime.timedelta(days=1))
+    if _month_end(last_day.replace(day=1)) != last_day:
+        last_day = last_day.replace(day=1) - datetime.timedelta(days=1)
+    last = last_day.replace(day=1)
+    return (first, last) if first <= last else None
+
+
+def _exclude_rolled_up(days, rolled_up):
+    """Drop the DailyImpressions rows of months in `rolled_up` that have a MonthlyImpressions row"""
+    return days.alias(rollup_month=TruncMonth('date')).exclude(
+        Exists(MonthlyImpressions.objects.filter(month__range=rolled_up, month=OuterRef('rollup_month'))),
+        date__range=(rolled_up[0], _month_end(rolled_up[1])),
+    )
+
+
+def _get_series_rows(start, end, bucket, today):
+    """
+    Query a range's buckets and today's impressions as one statement.
+
+    The bucket rows and a row holding today's figure (period NULL) are
+    combined with UNION ALL. Month buckets read closed months from
+    MonthlyImpressions where they have been rolled up and sum the rest from
+    their days.
+
+    Returns:
+        list: (period, impressions, today's impressions) tuples
+    """
+    zero = Value(0, output_field=IntegerField())
+    if bucket == HOUR:
+        first_hour = datetime.datetime.combine(start, datetime.time(), tzinfo=datetime.timezone.utc)
+        last_hour = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time(), tzinfo=datetime.timezone.utc)
+        period_field = DateTimeField()
+        queries = [
+            HourlyImpressions.objects.filter(hour__gte=first_hour, hour__lt=last_hour)
+            .values_list('hour', 'impressions', zero).order_by()
+        ]
+    else:
+        period_field = DateField()
+        days = DailyImpressions.objects.filter(date__range=(start, end))
+        queries = []
+        rolled_up = _get_rolled_up_months(start, end, today) if bucket == MONTH else None
+        if rolled_up:
+            queries.append(
+                MonthlyImpressions.objects.filter(month__range=rolled_up)
+                .values_list('month', 'impressions', zero).order_by()
+            )
+            days = _exclude_rolled_up(days, rolled_up)
+        trunc = {DAY: F('date'), WEEK: TruncWeek('date'), MONTH: TruncMonth('date')}[bucket]
+        queries.append(
+            days.annotate(period=trunc).values('period').annotate(total=Sum('impressions'), today=zero)
+            .values_list('period', 'total', 'today').order_by()
+        )
+
+    queries.append(
+        DailyImpressions.objects.filter(date=today).values_list(Value(None, output_field=period_field), zero, 'impressions').order_by()
+    )
+    return list(queries[0].union(*queries[1:], all=True))
+
+
+def get_impression_stats(start, end, bucket, today):
+    """
+    Get a range of impressions as a fixed-size series of buckets.
+
+    Bucket totals and today's figure are read in one query, visitor
+    sketches in a second one; impressions still spread over counter shards
+    are added when sharding is enabled. Hourly buckets carry no unique
+    visitor figure (sketches are kept per day and month).
+
+    Args:
+        start (date): First day of the range
+        end (date): Last day of the range (inclusive)
+        bucket (str): HOUR, DAY, WEEK or MONTH
+        today (date): The current date
+
+    Returns:
+        dict: `series` ({'period', 'impressions'[, 'unique_visitors']} dicts oldest first),
+            `total_impressions` and `unique_visitors` over the range, `today_impressions`
+            and `unique_visitors_<window>` for UNIQUE_VISITOR_WINDOWS
+    """
+    def label(period):
+        if bucket == HOUR:
+            return period.astimezone(datetime.timezone.utc).isoformat()
+        return period.isoformat() if bucket != MONTH else period.isoformat()[:7]
+
+    series = Counter()
+    today_impressions = 0
+    for period, impressions, today_count in _get_series_rows(start, end, bucket, today):
+        if period is None:
+            today_impressions = today_count
+        else:
+            series[label(period)] += impressions
+
+    if settings.IMPRESSIONS_SHARDED:
+        daily_pending = get_counter_totals('impressions')
+        today_impressions += daily_pending.get(today.isoformat(), 0)
+        pending = get_counter_totals('hourly_impressions') if bucket == HOUR else daily_pending
+        for key, count in pending.items():
+            if not start.isoformat() <= key[:10] <= end.isoformat():
+                continue
+            if bucket == HOUR:
+                series[key] += count
+            else:
+                series[label(get_bucket_start(datetime.date.fromisoformat(key), bucket))] += count
+
+    sketches, range_sketch, windows = _get_visitor_sketches(start, end, bucket, today)
+    buckets = []
+    for period in sorted(series):
+        item = {'period': period, 'impressions': series[period]}
+        if bucket != HOUR:
+            item['unique_visitors'] = estimate_cardinality(sketches.get(period))
+        buckets.append(item)
+
+    stats = {
+        'series': buckets,
+        'total_impressions': sum(series.values()),
+        'today_impressions': today_impressions,
+        'unique_visitors': estimate_cardinality(range_sketch),
+    }
+    for name, sketch in windows.items():
+        stats[f'unique_visitors_{name}'] = estimate_cardinality(sketch)
+    return stats
+
+
+def _get_visitor_sketches(start, end, bucket, today):
+    """
+    Load the visitor sketches a stats response needs.
+
+    Daily sketches covering the range and the trailing windows come from one
+    query. Month buckets read the rolled-up sketches of closed months that
+    have them instead of their days, which takes a second query.
+
+    Returns:
+        tuple: (merged sketch per bucket label, merged sketch of the range,
+            merged sketch per UNIQUE_VISITOR_WINDOWS name)
+    """
+    window_start = today - datetime.timedelta(days=max(UNIQUE_VISITOR_WINDOWS.values()) - 1)
+    rolled_up = _get_rolled_up_months(start, end, today) if bucket == MONTH else None
+    per_bucket = {}
+    in_range = []
+
+    # Months without a rollup row yet are merged from their days below
+    months = {}
+    if rolled_up:
+        months = dict(MonthlyImpressions.objects.filter(month__range=rolled_up).values_list('month', 'visitors_sketch'))
+        for month, sketch in months.items():
+            if sketch:
+                in_range.append(sketch)
+                per_bucket.setdefault(month.isoformat()[:7], []).append(sketch)
+
+    days = DailyImpressions.objects.filter(date__range=(start, end))
+    if months:
+        days = _exclude_rolled_up(days, rolled_up)
+    windows_days = DailyImpressions.objects.filter(date__range=(window_start, today))
+    days = days.values_list('date', 'visitors_sketch').order_by().union(
+        windows_days.values_list('date', 'visitors_sketch').order_by()
+    )
+
+    windows = {name: [] for name in UNIQUE_VISITOR_WINDOWS}
+    for date, sketch in days:
+        if not sketch:
+            continue
+        if start <= date <= end and date.replace(day=1) not in months:
+            in_range.append(sketch)
+            key = get_bucket_start(date, bucket).isoformat()
+            per_bucket.setdefault(key[:7] if bucket == MONTH else key, []).append(sketch)
+        for name, length in UNIQUE_VISITOR_WINDOWS.items():
+            if today - datetime.timedelta(days=length) < date <= today:
+                windows[name].append(sketch)
+
+    return (
+        {key: merge_sketches(sketches) for key, sketches in per_bucket.items()},
+        merge_sketches(in_range),
+        {name: merge_sketches(sketches) for name, sketches in windows.items()},
+    )
@@ -0,0 +1,200 @@
+import base64
+from django.db.models import Q
+from ..models import Comment, Post
+
+
+# Default number of posts returned per page (matches the frontend)
+DEFAULT_PAGE_LIMIT = 5
+
+# Default number of comments returned per page
+DEFAULT_COMMENT_LIMIT = 20
+
+# Largest `limit` a client can ask for (larger values are clamped to it)
+MAX_PAGE_LIMIT = 100
+
+# Feed orderings (`?sort=`) and the indexed Post column each one sorts on, descending
+SORT_FIELDS = {
+    'new': 'created_at',
+    'hot': 'hot_score',
+}
+
+
+def encode_cursor(post, field='created_at'):
+    """
+    Build an opaque cursor pointing just past the given post.
+
+    Args:
+        post (Post): The last post (or comment) on the current page
+        field (str): The column the page is ordered by
+
+    Returns:
+        str: URL-safe cursor token keyed on (field, id)
+    """
+    value = getattr(post, field)
+    value = value.isoformat() if hasattr(value, 'isoformat') else repr(value)
+    raw = f"{value}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field='created_at', model=Post, parse=None):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The cursor token sent by the client
+        field (str): The column the page is ordered by
+        model: The model the cursor points into
+        parse (callable): Converts the value when `field` is an annotation rather than a model field
+
+    Returns:
+        tuple: (value of field, id: int)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, post_id = raw.rsplit('|', 1)
+        value = parse(value) if parse else model._meta.get_field(field).to_python(value)
+        return value, int(post_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def get_sort(request):
+    """
+    Read the `sort` query parameter.
+
+    Raises:
+        ValueError: If the ordering is not one of SORT_FIELDS
+    """
+    sort = request.GET.get('sort', 'new')
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort '{sort}', expected one of: {', '.join(SORT_FIELDS)}")
+    return sort
+
+
+def get_sort_field(request):
+    """
+    Get the Post column the requested ordering sorts (and keys cursors) on.
+
+    An unknown `sort` falls back to the default here; paginate_posts rejects it.
+    """
+    return SORT_FIELDS.get(request.GET.get('sort', 'new'), SORT_FIELDS['new'])
+
+
+def get_page_limit(request, default=DEFAULT_PAGE_LIMIT):
+    """Read the `limit` query parameter, clamped to 1..MAX_PAGE_LIMIT"""
+    return min(max(1, int(request.GET.get('limit', default))), MAX_PAGE_LIMIT)
+
+
+def paginate_posts(request, queryset, count=None):
+    """
+    Paginate a Post queryset newest first, or by hot score with `?sort=hot`.
+
+    Clients that send a `cursor` parameter (an empty value requests the first
+    page) get keyset pagination on (sort column, id), which costs the same on
+    every page and never runs a COUNT. All other clients keep the original
+    `page`/`limit` offset contract, including `total`.
+
+    Args:
+        request: The DRF request carrying the query parameters
+        queryset (QuerySet): The filtered Post queryset to paginate
+        count (callable): Returns the total in page mode; defaults to queryset.count()
+
+    Returns:
+        tuple: (posts: list of Post, pagination: dict of response fields)
+
+    Raises:
+        ValueError: If `page`, `limit`, `sort` or `cursor` is invalid
+    """
+    limit = get_page_limit(request)
+    sort = get_sort(request)
+    field = SORT_FIELDS[sort]
+    queryset = queryset.order_by(f'-{field}', '-id')
+    # Carry a non-default ordering over into the next/previous links
+    sort_param = f"&sort={sort}" if sort != 'new' else ''
+
+    if 'cursor' in request.GET:
+        cursor = request.GET.get('cursor', '').strip()
+        if cursor:
+            value, post_id = decode_cursor(cursor, field)
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': post_id})
+            )
+
+        # Fetch one extra row to know whether another page exists
+        posts = list(queryset[:limit + 1])
+        has_next = len(posts) > limit
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1], field) if has_next else None
+
+        return posts, {
+            'count': len(posts),
+            'limit': limit,
+            'has_next': has_next,
+            'next_cursor': next_cursor,
+            'next': f"?cursor={next_cursor}&limit={limit}{sort_param}" if has_next else None,
+        }
+
+    page = max(1, int(request.GET.get('page', 1)))
+    offset = (page - 1) * limit
+
+    total_posts = count() if count else queryset.count()
+    posts = list(queryset[offset:offset + limit])
+
+    has_next = (offset + limit) < total_posts
+    has_previous = page > 1
+
+    return posts, {
+        'count': len(posts),
+        'total': total_posts,
+        'page': page,
+        'limit': limit,
+        'has_next': has_next,
+        'has_previous': has_previous,
+        'next': f"?page={page + 1}&limit={limit}{sort_param}" if has_next else None,
+        'previous': f"?page={page - 1}&limit={limit}{sort_param}" if has_previous else None,
+    }
+
+
+def paginate_comments(request, queryset):
+    """
+    Paginate a post's comments oldest first with keyset pagination.
+
+    The first page is requested without a `cursor`; each page returns the
+    cursor of the next one, so every page is a range read of the
+    (post, created_at, id) index.
+
+    Args:
+        request: The DRF request carrying `cursor` and `limit`
+        queryset (QuerySet): The Comment queryset of one post
+
+    Returns:
+        tuple: (comments: list of Comment, pagination: dict of response fields)
+
+    Raises:
+        ValueError: If `limit` or `cursor` is invalid
+    """
+    limit = get_page_limit(request, DEFAULT_COMMENT_LIMIT)
+    queryset = queryset.order_by('created_at', 'id')
+
+    cursor = request.GET.get('cursor', '').strip()
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor, 'created_at', Comment)
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=comment_id))
+
+    # Fetch one extra row to know whether another page exists
+    comments = list(queryset[:limit + 1])
+    has_next = len(comments) > limit
+    comments = comments[:limit]
+    next_cursor = encode_cursor(comments[-1]) if has_next else None
+
+    return comments, {
+        'count': len(comments),
+        'limit': limit,
+        'has_next': has_next,
+        'next_cursor': next_cursor,
+        'next': f"?cursor={next_cursor}&limit={limit}" if has_next else None,
+    }
@@ -0,0 +1,43 @@
+from django.utils import timezone
+from ..models import Post
+
+
+# How fast scores decay with age (Hacker News style gravity)
+HOT_GRAVITY = 1.8
+# Hours added to a post's age so brand new posts do not divide by ~0
+HOT_AGE_OFFSET_HOURS = 2
+# A comment counts as much engagement as this many net votes
+HOT_COMMENT_WEIGHT = 0.5
+
+
+def compute_hot_score(upvotes, downvotes, comment_count, created_at, now=None):
+    """
+    Compute a post's time-decayed hot score.
+
+    Args:
+        upvotes (int): Upvote count
+        downvotes (int): Downvote count
+        comment_count (int): Number of comments
+        created_at (datetime): When the post was created
+        now (datetime): Reference time, defaults to the current time
+
+    Returns:
+        float: Engagement divided by (age in hours + offset) ** gravity
+    """
+    now = now or timezone.now()
+    age_hours = max((now - created_at).total_seconds(), 0) / 3600
+    engagement = (upvotes or 0) - (downvotes or 0) + HOT_COMMENT_WEIGHT * comment_count + 1
+    return engagement / (age_hours + HOT_AGE_OFFSET_HOURS) ** HOT_GRAVITY
+
+
+def refresh_hot_score(post):
+    """
+    Recompute and store the hot score of a post after its votes or comments change.
+
+    Only the hot_score column is written, so the rest of the row is untouched.
+
+    Args:
+        post (Post): The post with current vote and comment counts
+    """
+    post.hot_score = compute_hot_score(post.upvotes, post.downvotes, post.comment_count, post.created_at)
+    Post.objects.filter(id=post.id).update(hot_score=post.hot_score)
@@ -0,0 +1,181 @@
+import re
+from urllib.parse import urlencode
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Count, F, FloatField, Q, Window
+from django.db.models.functions import Cast
+from ..models import Post
+from .pagination_utils import decode_cursor, encode_cursor, get_page_limit
+
+
+# Text search configuration of Post.search_vector (no stemming, so names and any language match as typed)
+SEARCH_CONFIG = 'simple'
+
+# Default number of search results returned per page
+DEFAULT_SEARCH_LIMIT = 20
+
+# Annotation holding a result's rank (the search cursor is keyed on it)
+SEARCH_RANK_FIELD = 'search_rank'
+
+# Posts rewritten per statement when an author's snapshots are refreshed
+SNAPSHOT_REFRESH_BATCH = 500
+
+
+def get_search_query(text):
+    """
+    Build a full-text query matching posts that contain every word of a search.
+
+    Words match as prefixes, so "elect nai" finds "Elections in Nairobi".
+    Only letters and digits are kept, so user input never reaches tsquery
+    syntax.
+
+    Args:
+        text (str): The search text
+
+    Returns:
+        SearchQuery: The query, or None when the text has no words
+    """
+    terms = re.findall(r'[^\W_]+', text.lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def refresh_author_snapshots(user):
+    """
+    Copy a user's current username into the user_data snapshots of their posts.
+
+    The search vector indexes the snapshot, not the users table, so a
+    renamed author would otherwise only be found under the old name. The
+    rewrite fires the search trigger, which re-indexes each post.
+
+    Args:
+        user (User): The renamed user
+
+    Returns:
+        int: Number of posts refreshed
+    """
+    # Snapshots without a username compare as NULL, so they are matched explicitly
+    stale = Post.objects.filter(user=user).filter(
+        Q(user_data__username__isnull=True) | ~Q(user_data__username=user.username)
+    ).only('id', 'user_data')
+    refreshed = 0
+    for posts in _batched(stale.iterator(chunk_size=SNAPSHOT_REFRESH_BATCH), SNAPSHOT_REFRESH_BATCH):
+        for post in posts:
+            post.user_data = {**(post.user_data or {}), 'username': user.username}
+        refreshed += Post.objects.bulk_update(posts, ['user_data'])
+    return refreshed
+
+
+def _batched(items, size):
+    """Yield lists of up to `size` items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def search_posts(queryset, search_query):
+    """
+    Filter a Post queryset to the matches of a query (through the GIN index) and rank them.
+
+    Args:
+        queryset (QuerySet): A Post queryset
+        search_query (SearchQuery): From get_search_query
+
+    Returns:
+        QuerySet: The matches, annotated with search_rank
+    """
+    return queryset.filter(search_vector=search_query).annotate(**{
+        # ts_rank returns a real; as a double it round-trips through the cursor exactly
+        SEARCH_RANK_FIELD: Cast(SearchRank(F('search_vector'), search_query), FloatField()),
+    })
+
+
+def get_search_page(search_query, limit, after=None):
+    """
+    Read one page of ranked search results and the number of matches in one statement.
+
+    The matches are counted with a window count before the cursor filter is
+    applied, so every page reports the full count without a second query.
+
+    Args:
+        search_query (SearchQuery): From get_search_query
+        limit (int): Maximum number of results
+        after (tuple): (search_rank, id) of the last result of the previous page, or None
+
+    Returns:
+        tuple: (list of (post id, search_rank) best first, total number of matches)
+    """
+    matches = search_posts(Post.objects.all(), search_query).annotate(
+        search_total=Window(Count('pk'))
+    ).values('id', SEARCH_RANK_FIELD, 'search_total').order_by()
+    sql, params = matches.query.sql_with_params()
+
+    where = ''
+    if after is not None:
+        rank, post_id = after
+        where = f'WHERE {SEARCH_RANK_FIELD} < %s OR ({SEARCH_RANK_FIELD} = %s AND id < %s)'
+        params = (*params, rank, rank, post_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT id, {SEARCH_RANK_FIELD}, search_total FROM ({sql}) AS matches {where} '
+            f'ORDER BY {SEARCH_RANK_FIELD} DESC, id DESC LIMIT %s',
+            (*params, limit)
+        )
+        rows = cursor.fetchall()
+
+    total = rows[0][2] if rows else 0
+    return [(post_id, rank) for post_id, rank, _ in rows], total
+
+
+def paginate_search(request, queryset, search_query):
+    """
+    Paginate the results of a search, best match first, with keyset pagination.
+
+    The first page is requested without a `cursor`; each page returns the
+    cursor of the next one, keyed on (search_rank, id).
+
+    Args:
+        request: The DRF request carrying `cursor` and `limit`
+        queryset (QuerySet): Post queryset the page is loaded from (with its related data prepared)
+        search_query (SearchQuery): From get_search_query, or None to match nothing
+
+    Returns:
+        tuple: (posts: list of Post, pagination: dict of response fields)
+
+    Raises:
+        ValueError: If `limit` or `cursor` is invalid
+    """
+    limit = get_page_limit(request, DEFAULT_SEARCH_LIMIT)
+    cursor = request.GET.get('cursor', '').strip()
+    after = decode_cursor(cursor, SEARCH_RANK_FIELD, parse=float) if cursor else None
+
+    # Fetch one extra row to know whether another page exists
+    ranked, total = get_search_page(search_query, limit + 1, after) if search_query else ([], 0)
+    has_next = len(ranked) > limit
+    ranked = ranked[:limit]
+
+    # Load the page in rank order (posts deleted since the search are skipped)
+    posts_by_id = queryset.in_bulk([post_id for post_id, _ in ranked])
+    posts = []
+    for post_id, rank in ranked:
+        if post_id in posts_by_id:
+            post = posts_by_id[post_id]
+            setattr(post, SEARCH_RANK_FIELD, rank)
+            posts.append(post)
+    next_cursor = encode_cursor(posts[-1], SEARCH_RANK_FIELD) if has_next and posts else None
+
+    return posts, {
+        'count': len(posts),
+        'total': total,
+        'limit': limit,
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor,
+        'next': f"?{urlencode({'q': request.GET.get('q', ''), 'cursor': next_cursor, 'limit': limit})}" if next_cursor else None,
+    }
@@ -0,0 +1,103 @@
+import random
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from ..models import DailyImpressions, HourlyImpressions, Post, ShardedCounter
+
+
+# Counter kinds whose shards are folded into a model column by compaction:
+# kind -> (model, lookup field matched against the counter key, counter column, create missing rows)
+FOLD_TARGETS = {
+    'impressions': (DailyImpressions, 'date', 'impressions', True),
+    'hourly_impressions': (HourlyImpressions, 'hour', 'impressions', True),
+    # Buffered write-behind votes (normally flushed by utilities/vote_utils.py)
+    'post_upvotes': (Post, 'id', 'upvotes', False),
+    'post_downvotes': (Post, 'id', 'downvotes', False),
+}
+
+
+def get_counter_name(kind, key):
+    """Build a counter name from its kind and key (e.g. "impressions:2025-01-31")"""
+    return f"{kind}:{key}"
+
+
+def increment_counter(name, amount=1, shards=None):
+    """
+    Add to a sharded counter.
+
+    The increment lands on one of `shards` rows picked at random, so
+    concurrent increments of the same counter rarely wait on the same row
+    lock. The total is the sum of the shards (see get_counter_total).
+
+    Args:
+        name (str): Counter name
+        amount (int): Amount to add (may be negative)
+        shards (int): Number of shards, defaults to settings.SHARDED_COUNTER_SHARDS
+    """
+    _add_to_shard(name, random.randrange(shards or settings.SHARDED_COUNTER_SHARDS), amount)
+
+
+def _add_to_shard(name, shard, amount):
+    """Atomically add to one shard row, creating it on first use"""
+    counters = ShardedCounter.objects.filter(name=name, shard=shard)
+    # Compaction and vote flushes delete shards, so the row can vanish again
+    # between a failed insert and the next update - retry until one lands
+    while not counters.update(count=F('count') + amount, updated_at=timezone.now()):
+        try:
+            with transaction.atomic():
+                ShardedCounter.objects.create(name=name, shard=shard, count=amount)
+            return
+        except IntegrityError:
+            # Another request created this shard first
+            continue
+
+
+def get_counter_total(name):
+    """Get the amount counted on a counter's shards since its last compaction"""
+    return ShardedCounter.objects.filter(name=name).aggregate(total=Sum('count'))['total'] or 0
+
+
+def get_counter_totals(kind):
+    """
+    Get the uncompacted totals of every counter of one kind with one grouped query.
+
+    Args:
+        kind (str): Counter kind, e.g. "impressions"
+
+    Returns:
+        dict: Total keyed by counter key (the part of the name after "<kind>:")
+    """
+    prefix = f"{kind}:"
+    rows = ShardedCounter.objects.filter(name__startswith=prefix).values('name').annotate(total=Sum('count'))
+    return {row['name'][len(prefix):]: row['total'] for row in rows}
+
+
+def compact_counter(name):
+    """
+    Fold a counter's shards into one place.
+
+    Counters with a FOLD_TARGETS kind are added to their model column and
+    their shards are deleted; other counters are merged into shard 0. The
+    shards read are locked and only those rows are removed, so increments
+    made while compacting are kept for the next run.
+
+    Args:
+        name (str): Counter name
+
+    Returns:
+        int: The amount that was folded
+    """
+    kind, _, key = name.partition(':')
+    with transaction.atomic():
+        shards = list(ShardedCounter.objects.select_for_update().filter(name=name).values_list('id', 'count'))
+        total = sum(count for _, count in shards)
+        if kind in FOLD_TARGETS:
+            model, lookup, column, create_missing = FOLD_TARGETS[kind]
+            if create_missing:
+                model.objects.get_or_create(**{lookup: key}, defaults={column: 0})
+            model.objects.filter(**{lookup: key}).update(**{column: F(column) + total, 'updated_at': timezone.now()})
+        ShardedCounter.objects.filter(id__in=[shard_id for shard_id, _ in shards]).delete()
+        if kind not in FOLD_TARGETS and total:
+            _add_to_shard(name, 0, total)
+    return total
@@ -0,0 +1,148 @@
+import datetime
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+from ..models import Candidates, Comment, DailyImpressions, Parties, Post, PostVote, StatsSnapshot, User
+
+
+# Snapshot metrics: name -> (model, creation date field, field summed per row or None to count rows)
+SNAPSHOT_METRICS = {
+    'users': (User, 'date_joined', None),
+    'posts': (Post, 'created_at', None),
+    'parties': (Parties, 'created_at', None),
+    'candidates': (Candidates, 'created_at', None),
+    'votes': (PostVote, 'created_at', None),
+    'comments': (Comment, 'created_at', None),
+    'impressions': (DailyImpressions, 'date', 'impressions'),
+}
+
+
+def _is_date_field(model, field):
+    """Whether a metric's date field holds dates rather than timestamps"""
+    return model._meta.get_field(field).get_internal_type() == 'DateField'
+
+
+def get_day_start(model, field, date):
+    """Lower bound matching the start of `date` for a metric's date field"""
+    if _is_date_field(model, field):
+        return date
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def get_metric_amount(metric, filter=None):
+    """Aggregate adding up a metric (a row count or the sum of its counted field)"""
+    _, _, summed = SNAPSHOT_METRICS[metric]
+    return Sum(summed, filter=filter) if summed else Count('pk', filter=filter)
+
+
+def _amount_before(metric, date):
+    """Amount of a metric recorded before a date (the running total the period starts from)"""
+    model, field, _ = SNAPSHOT_METRICS[metric]
+    # Undated legacy rows count in every total, like in the live statistics
+    rows = model.objects.filter(Q(**{f'{field}__lt': get_day_start(model, field, date)}) | Q(**{f'{field}__isnull': True}))
+    return rows.aggregate(amount=get_metric_amount(metric))['amount'] or 0
+
+
+def _amounts_by(metric, trunc, start, end):
+    """Amount of a metric per truncated period between two dates (inclusive), with one grouped query"""
+    model, field, _ = SNAPSHOT_METRICS[metric]
+    rows = model.objects.filter(**{
+        f'{field}__gte': get_day_start(model, field, start),
+        f'{field}__lt': get_day_start(model, field, end + datetime.timedelta(days=1)),
+    })
+    period = F(field) if trunc is None else trunc(field)
+    grouped = rows.annotate(snapshot_period=period).values('snapshot_period').annotate(amount=get_metric_amount(metric)).order_by()
+    return {row['snapshot_period']: row['amount'] or 0 for row in grouped}
+
+
+def _to_date(value):
+    """Local date of a date or timestamp"""
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).date()
+    return value
+
+
+def _next_month(month):
+    """First day of the month after `month`"""
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def snapshot_metric(metric, start, end):
+    """
+    Store the daily and monthly snapshots of one metric for a range of closed days.
+
+    Every day in the range gets a row (zero-count days included) and so does
+    every month that has ended by `end`; monthly rows always cover their
+    whole month. Rows are upserted on (metric, period, date), so running the
+    same range again just refreshes it.
+
+    Args:
+        metric (str): Key of SNAPSHOT_METRICS
+        start (date): First day to snapshot
+        end (date): Last day to snapshot (should be before today)
+
+    Returns:
+        int: Number of snapshot rows written
+    """
+    is_date = _is_date_field(*SNAPSHOT_METRICS[metric][:2])
+    snapshots = []
+
+    # Days
+    days = _amounts_by(metric, None if is_date else TruncDate, start, end)
+    total = _amount_before(metric, start)
+    day = start
+    while day <= end:
+        count = days.get(day, 0)
+        total += count
+        snapshots.append(StatsSnapshot(metric=metric, period=StatsSnapshot.DAY, date=day, count=count, total=total))
+        day += datetime.timedelta(days=1)
+
+    # Months that have ended by the end of the range (last_month is exclusive)
+    first_month = start.replace(day=1)
+    last_month = end.replace(day=1)
+    if _next_month(last_month) - datetime.timedelta(days=1) == end:
+        last_month = _next_month(last_month)
+    if first_month < last_month:
+        months = {
+            _to_date(period): amount
+            for period, amount in _amounts_by(metric, TruncMonth, first_month, last_month - datetime.timedelta(days=1)).items()
+        }
+        total = _amount_before(metric, first_month)
+        month = first_month
+        while month < last_month:
+            count = months.get(month, 0)
+            total += count
+            snapshots.append(StatsSnapshot(metric=metric, period=StatsSnapshot.MONTH, date=month, count=count, total=total))
+            month = _next_month(month)
+
+    StatsSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['metric', 'period', 'date'],
+        update_fields=['count', 'total', 'updated_at'],
+        batch_size=1000
+    )
+    return len(snapshots)
+
+
+def get_first_date(metric):
+    """Date of a metric's earliest record, or None when it has none (the start of a full backfill)"""
+    model, field, _ = SNAPSHOT_METRICS[metric]
+    first = model.objects.filter(**{f'{field}__isnull': False}).order_by(field).values_list(field, flat=True).first()
+    return _to_date(first) if first is not None else None
+
+
+def get_month_snapshot(metric, month):
+    """
+    Read a metric's snapshot for one month.
+
+    Args:
+        metric (str): Key of SNAPSHOT_METRICS
+        month (date): First day of the month
+
+    Returns:
+        tuple: (count, total) or None when the month has not been snapshotted
+    """
+    return StatsSnapshot.objects.filter(
+        metric=metric, period=StatsSnapshot.MONTH, date=month
+    ).values_list('count', 'total').first()
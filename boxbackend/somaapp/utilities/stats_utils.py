@@ -0,0 +1,171 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from .cache_utils import get_or_set_single_flight
+from .impression_utils import WEEK, get_impression_stats
+from .snapshot_utils import SNAPSHOT_METRICS, get_day_start, get_metric_amount, get_month_snapshot
+
+
+# How long dashboard statistics are served from the cache
+STATS_CACHE_TIMEOUT = 60
+
+# Cache key holding the statistics of one model
+STATS_CACHE_KEY = 'stats:growth:{label}'
+
+# Cache key and lifetime of the combined dashboard summary
+DASHBOARD_CACHE_KEY = 'stats:dashboard'
+DASHBOARD_CACHE_TIMEOUT = 30
+
+
+def get_month_starts(now):
+    """
+    Get the start of the current and the previous month.
+
+    Args:
+        now (datetime): The current time
+
+    Returns:
+        tuple: (current month start, previous month start)
+    """
+    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if current_month_start.month == 1:
+        previous_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
+    else:
+        previous_month_start = current_month_start.replace(month=current_month_start.month - 1)
+    return current_month_start, previous_month_start
+
+
+def get_growth_percentage(current, previous):
+    """
+    Month-over-month growth, rounded to one decimal place.
+
+    Without a previous month any current activity counts as 100% growth.
+    """
+    if previous > 0:
+        growth_percentage = ((current - previous) / previous) * 100
+    else:
+        growth_percentage = 100.0 if current > 0 else 0.0
+    return round(growth_percentage, 1)
+
+
+def get_growth_stats(metric):
+    """
+    Get a metric's total, this month and last month.
+
+    Once the nightly snapshot_stats command has stored last month, its count
+    and running total come from that one snapshot row and only the current
+    month is counted live (an index range scan on the date field). Before
+    that, the three amounts are conditional aggregates over one scan. The
+    result is cached for STATS_CACHE_TIMEOUT seconds.
+
+    Args:
+        metric (str): Key of SNAPSHOT_METRICS, e.g. "users"
+
+    Returns:
+        dict: total, current_month, previous_month, growth_percentage and growth_direction
+    """
+    key = STATS_CACHE_KEY.format(label=metric)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    model, date_field, _ = SNAPSHOT_METRICS[metric]
+    now = timezone.now()
+    current_month_start, previous_month_start = get_month_starts(now)
+    current_filter = Q(**{
+        f'{date_field}__gte': get_day_start(model, date_field, current_month_start.date()),
+        f'{date_field}__lte': now,
+    })
+    snapshot = get_month_snapshot(metric, previous_month_start.date())
+    if snapshot is not None:
+        previous_month, previous_total = snapshot
+        current_month = model.objects.filter(current_filter).aggregate(amount=get_metric_amount(metric))['amount'] or 0
+        counts = {
+            'total': previous_total + current_month,
+            'current_month': current_month,
+            'previous_month': previous_month,
+        }
+    else:
+        previous_filter = Q(**{
+            f'{date_field}__gte': get_day_start(model, date_field, previous_month_start.date()),
+            f'{date_field}__lt': get_day_start(model, date_field, current_month_start.date()),
+        })
+        counts = model.objects.aggregate(
+            total=get_metric_amount(metric),
+            current_month=get_metric_amount(metric, current_filter),
+            previous_month=get_metric_amount(metric, previous_filter),
+        )
+        counts = {name: amount or 0 for name, amount in counts.items()}
+
+    growth_percentage = get_growth_percentage(counts['current_month'], counts['previous_month'])
+    stats = {
+        **counts,
+        'growth_percentage': growth_percentage,
+        'growth_direction': 'up' if growth_percentage >= 0 else 'down',
+    }
+    cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def _growth_tile(stats, plural):
+    """Name growth stats the way the single stats views do (e.g. total_users)"""
+    return {
+        f'total_{plural}': stats['total'],
+        f'current_month_{plural}': stats['current_month'],
+        f'previous_month_{plural}': stats['previous_month'],
+        'growth_percentage': stats['growth_percentage'],
+        'growth_direction': stats['growth_direction'],
+    }
+
+
+def _run_in_thread(func, *args):
+    """Run a query function in a pool thread and close the thread's connection afterwards"""
+    try:
+        return func(*args)
+    finally:
+        connection.close()
+
+
+def _build_dashboard_summary():
+    """Compute every dashboard tile, running the independent queries in parallel"""
+    today = timezone.now().date()
+    start = today - datetime.timedelta(days=365)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        users = executor.submit(_run_in_thread, get_growth_stats, 'users')
+        parties = executor.submit(_run_in_thread, get_growth_stats, 'parties')
+        candidates = executor.submit(_run_in_thread, get_growth_stats, 'candidates')
+        impressions = executor.submit(_run_in_thread, get_impression_stats, start, today, WEEK, today)
+
+    impression_stats = impressions.result()
+    series = impression_stats.pop('series')
+    return {
+        'users': _growth_tile(users.result(), 'users'),
+        'parties': _growth_tile(parties.result(), 'parties'),
+        'candidates': _growth_tile(candidates.result(), 'candidates'),
+        'impressions': {
+            'from': start.isoformat(),
+            'to': today.isoformat(),
+            'bucket': WEEK,
+            **impression_stats,
+            'impressions': series,
+            'count': len(series),
+        },
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_dashboard_summary():
+    """
+    Get every tile of the admin dashboard in one response.
+
+    The summary is cached for DASHBOARD_CACHE_TIMEOUT seconds and rebuilt by
+    a single caller at a time, so a burst of dashboard refreshes costs one
+    set of queries.
+
+    Returns:
+        dict: users, parties, candidates and impressions tiles plus generated_at
+    """
+    return get_or_set_single_flight(DASHBOARD_CACHE_KEY, _build_dashboard_summary, DASHBOARD_CACHE_TIMEOUT)
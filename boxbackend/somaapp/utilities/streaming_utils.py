@@ -0,0 +1,73 @@
+import json
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Rows fetched from the database (and serialized) per round trip while streaming
+STREAM_CHUNK_SIZE = 100
+
+
+def is_stream_request(request):
+    """Check whether the client asked for a streamed response (`?stream=1`)"""
+    return request.GET.get('stream', '').lower() in ('1', 'true')
+
+
+def stream_json_response(key, queryset, serialize_chunk, extra=None, summary=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream a JSON object whose `key` list is built chunk by chunk.
+
+    The queryset is read with .iterator(chunk_size=...) (prefetches run per
+    chunk) and every chunk is serialized and written out before the next is
+    fetched, so memory stays bounded by one chunk however many rows match.
+    An error part-way through ends the list and closes the object with
+    `error` and `detail` fields, so clients still receive valid JSON.
+
+    Args:
+        key (str): Name of the list in the response object, e.g. "posts"
+        queryset (QuerySet): Rows to stream, already filtered and ordered
+        serialize_chunk (callable): Turns a list of instances into a list of dicts
+        extra (dict): Fields written before the list
+        summary (callable): Called with the row count, returns fields written after the list
+        chunk_size (int): Rows per chunk
+
+    Returns:
+        StreamingHttpResponse: application/json response
+    """
+    encoder = JSONEncoder()
+
+    def write_chunk(chunk, first):
+        items = ','.join(encoder.encode(item) for item in serialize_chunk(chunk))
+        return items if first else ',' + items
+
+    def generate():
+        yield '{'
+        for name, value in (extra or {}).items():
+            yield f"{json.dumps(name)}: {encoder.encode(value)}, "
+        yield f"{json.dumps(key)}: ["
+
+        count = 0
+        chunk = []
+        try:
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(obj)
+                if len(chunk) == chunk_size:
+                    yield write_chunk(chunk, count == 0)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                yield write_chunk(chunk, count == 0)
+                count += len(chunk)
+            summary_fields = summary(count) if summary else {}
+        except Exception as e:
+            # The 200 status is already sent, so the error closes the document instead
+            print(f"Error streaming {key}:", str(e))
+            yield f"], \"error\": {encoder.encode(f'Failed to stream {key}: {str(e)}')}, "
+            yield f"\"detail\": {encoder.encode(f'The response was cut short after {count} {key}')}}}"
+            return
+
+        yield ']'
+        for name, value in summary_fields.items():
+            yield f", {json.dumps(name)}: {encoder.encode(value)}"
+        yield '}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
@@ -0,0 +1,216 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+from ..models import Post, PostVote, ShardedCounter, User
+from .cache_utils import bump_feed_version
+from .flush_utils import start_periodic_flush
+from .ranking_utils import compute_hot_score
+from .sharded_counter_utils import get_counter_name, increment_counter
+
+
+# Post counter column for each vote value
+VOTE_COLUMNS = {
+    PostVote.UPVOTE: 'upvotes',
+    PostVote.DOWNVOTE: 'downvotes',
+}
+
+# Sharded counter kind buffering each counter column's pending (not yet flushed) change;
+# counters live in the database, so the buffer is shared by every worker and never evicted
+PENDING_VOTE_KINDS = {
+    'upvotes': 'post_upvotes',
+    'downvotes': 'post_downvotes',
+}
+
+# Maximum number of buffered shard rows one flush claims
+VOTE_FLUSH_BATCH = 5000
+
+
+def is_write_behind_enabled():
+    """Check whether vote counters are buffered (settings.VOTE_WRITE_BEHIND)"""
+    return getattr(settings, 'VOTE_WRITE_BEHIND', False)
+
+
+def _apply_vote(user, post_id, value, buffered):
+    """
+    Toggle one vote inside a transaction.
+
+    Returns:
+        tuple: (action: "added", "removed" or "switched", counter deltas by column)
+    """
+    column = VOTE_COLUMNS[value]
+    opposite = VOTE_COLUMNS[-value]
+    votes = PostVote.objects.filter(user=user, post_id=post_id)
+
+    with transaction.atomic():
+        # Votes by the same user queue on the user's row, so two toggles of one
+        # ledger row (which may not exist yet) never interleave
+        User.objects.select_for_update(no_key=True).only('id').get(id=user.id)
+
+        # Clicking the same vote again takes it back
+        if votes.filter(value=value).delete()[0]:
+            deltas, action = {column: -1}, 'removed'
+        # Clicking the other vote flips it
+        elif votes.filter(value=-value).update(value=value):
+            deltas, action = {column: 1, opposite: -1}, 'switched'
+        else:
+            PostVote.objects.create(user=user, post_id=post_id, value=value)
+            deltas, action = {column: 1}, 'added'
+
+        # The counter change commits with the ledger row, buffered or not
+        if buffered:
+            # Shards are locked in a fixed column order, so an upvote switch and a
+            # downvote switch never wait on each other's shards
+            for name, delta in sorted(deltas.items()):
+                increment_counter(get_counter_name(PENDING_VOTE_KINDS[name], post_id), delta)
+        else:
+            Post.objects.filter(id=post_id).update(**{name: F(name) + delta for name, delta in deltas.items()})
+    return action, deltas
+
+
+def toggle_vote(user, post, value):
+    """
+    Toggle a user's upvote or downvote on a post.
+
+    The ledger row and the post counters change in one transaction, and the
+    counters move with F() expressions, so concurrent votes are never lost
+    and the post row is never rewritten from stale Python values. Concurrent
+    toggles by the same user are serialized on the user's row. In
+    write-behind mode the counter change goes to sharded counter rows in the
+    same transaction instead, and reaches the post row with the next flush.
+
+    Args:
+        user (User): The voter
+        post (Post): The post being voted on
+        value (int): PostVote.UPVOTE or PostVote.DOWNVOTE
+
+    Returns:
+        str: "added", "removed" or "switched"
+    """
+    buffered = is_write_behind_enabled()
+    action, _ = _apply_vote(user, post.id, value, buffered)
+
+    if buffered:
+        start_periodic_flush('vote-flusher', flush_pending_votes, getattr(settings, 'VOTE_FLUSH_INTERVAL_MS', 500))
+    return action
+
+
+def get_pending_votes(post_ids):
+    """
+    Get the buffered counter deltas of many posts with one grouped query.
+
+    Args:
+        post_ids (iterable): Post IDs to look up
+
+    Returns:
+        dict: {post_id: {column: delta}} for posts with pending deltas
+    """
+    names = {
+        get_counter_name(kind, post_id): (post_id, column)
+        for post_id in post_ids for column, kind in PENDING_VOTE_KINDS.items()
+    }
+    pending = {}
+    if not names:
+        return pending
+    rows = ShardedCounter.objects.filter(name__in=names).values('name').annotate(total=Sum('count')).order_by()
+    for row in rows:
+        if row['total']:
+            post_id, column = names[row['name']]
+            pending.setdefault(post_id, {})[column] = row['total']
+    return pending
+
+
+def get_vote_counts(post):
+    """
+    Reload a post's vote counters, including buffered votes not yet flushed.
+
+    Args:
+        post (Post): The post; upvotes and downvotes are refreshed in place
+
+    Returns:
+        tuple: (upvotes, downvotes)
+    """
+    post.refresh_from_db(fields=['upvotes', 'downvotes'])
+    if is_write_behind_enabled():
+        pending = get_pending_votes([post.id]).get(post.id, {})
+        post.upvotes += pending.get('upvotes', 0)
+        post.downvotes += pending.get('downvotes', 0)
+    return post.upvotes, post.downvotes
+
+
+def merge_pending_votes(posts):
+    """
+    Add buffered votes to serialized posts so voters see their vote immediately.
+
+    Does nothing (and skips the query) unless write-behind mode is enabled.
+
+    Args:
+        posts (list): Serialized post dicts with `id`, `upvotes` and `downvotes` (updated in place)
+
+    Returns:
+        list: The same post dicts
+    """
+    if not is_write_behind_enabled() or not posts:
+        return posts
+    pending = get_pending_votes(post['id'] for post in posts if 'id' in post)
+    for post in posts:
+        for column, delta in pending.get(post.get('id'), {}).items():
+            if column in post:
+                post[column] += delta
+    return posts
+
+
+def flush_pending_votes():
+    """
+    Write buffered votes to the post counters.
+
+    One transaction claims up to VOTE_FLUSH_BATCH buffered shard rows
+    (skipping rows another flush or a vote holds), adds them to the posts
+    with one batched UPDATE (a CASE per counter column), refreshes the hot
+    scores of those posts and deletes the claimed rows. Every delta is
+    therefore applied exactly once, by whichever worker claimed it, and a
+    crash before the commit leaves it buffered for the next flush.
+
+    Returns:
+        int: Number of posts whose counters were updated
+    """
+    columns = {kind: column for column, kind in PENDING_VOTE_KINDS.items()}
+    buffered = Q()
+    for kind in columns:
+        buffered |= Q(name__startswith=f"{kind}:")
+
+    with transaction.atomic():
+        shards = list(
+            ShardedCounter.objects.select_for_update(skip_locked=True).filter(buffered)
+            .order_by('id').values_list('id', 'name', 'count')[:VOTE_FLUSH_BATCH]
+        )
+        if not shards:
+            return 0
+
+        pending = {}
+        for _, name, count in shards:
+            kind, _, post_id = name.partition(':')
+            deltas = pending.setdefault(int(post_id), {})
+            deltas[columns[kind]] = deltas.get(columns[kind], 0) + count
+
+        updates = {
+            column: Case(
+                *[When(id=post_id, then=Value(deltas[column])) for post_id, deltas in pending.items() if column in deltas],
+                default=Value(0),
+                output_field=IntegerField()
+            )
+            for column in VOTE_COLUMNS.values()
+        }
+        Post.objects.filter(id__in=pending).update(**{column: F(column) + delta for column, delta in updates.items()})
+
+        now = timezone.now()
+        posts = list(Post.objects.filter(id__in=pending).only('id', 'upvotes', 'downvotes', 'comment_count', 'created_at'))
+        for post in posts:
+            post.hot_score = compute_hot_score(post.upvotes, post.downvotes, post.comment_count, post.created_at, now)
+        Post.objects.bulk_update(posts, ['hot_score'])
+
+        # Posts deleted since the vote just lose their buffered rows
+        ShardedCounter.objects.filter(id__in=[shard_id for shard_id, _, _ in shards]).delete()
+
+    bump_feed_version()
+    return len(pending)
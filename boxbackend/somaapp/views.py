@@ -1,20 +1,36 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .serializers import UserSerializer, PostSerializer, PartiesSerializer, CandidatesSerializer
+from .serializers import UserSerializer, PostSerializer, CommentSerializer, PartiesSerializer, CandidatesSerializer, TrackEventSerializer
 from rest_framework import status
-from .models import User, Post, Parties, Candidates, DailyImpressions
-from django.db import models
+from .models import User, Post, Comment, PostVote, Parties, Candidates, DailyImpressions, MonthlyImpressions, ShardedCounter
+from django.db import models, transaction
 import jwt, datetime
 from rest_framework.exceptions import AuthenticationFailed
 from .utilities.auth_utils.reset_password import send_password_reset_email
+from .utilities.pagination_utils import get_sort_field, paginate_posts, paginate_comments
+from .utilities.cache_utils import bump_feed_version, get_feed_version, get_feed_page_key, get_cached_feed_page, set_cached_feed_page
+from .utilities.counter_utils import get_post_count, get_user_post_count, record_post_created, record_post_deleted
+from .utilities.etag_utils import build_etag, get_queryset_version, etag_matches, not_modified_response
+from .utilities.fieldset_utils import parse_fieldset, apply_fieldset
+from .utilities.feed_utils import MAX_BATCH_POST_IDS, prepare_post_queryset, prepare_comment_queryset, prepare_compact_post_queryset, is_compact_view, serialize_compact_feed, stream_post_feed
+from .utilities.ranking_utils import refresh_hot_score
+from .utilities.vote_utils import toggle_vote, get_vote_counts, is_write_behind_enabled
+from .utilities.streaming_utils import is_stream_request, stream_json_response
+from .utilities.avatar_utils import get_avatar_cache_control
+from .utilities.sharded_counter_utils import get_counter_name, increment_counter, get_counter_total
+from .utilities.impression_utils import BUCKETS as IMPRESSION_BUCKETS, HOUR as IMPRESSION_HOUR, MAX_SERIES_BUCKETS, get_impression_hour, record_impression, get_visitor_hash, record_visitor, choose_bucket, count_buckets, get_impression_stats, get_oldest_hourly_date
+from .utilities.event_utils import MAX_EVENTS_PER_BATCH, record_events
+from .utilities.stats_utils import get_growth_stats, get_dashboard_summary
+from .utilities.search_utils import SEARCH_RANK_FIELD, get_search_query, search_posts, paginate_search, refresh_author_snapshots
+from django.conf import settings
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
-from base64 import b64encode
+from base64 import b64encode, b64decode
 import csv
 import io
 import os
@@ -222,7 +238,7 @@ class VerifyOTP(APIView):
                 user.is_email_verified = True
                 user.is_active = True
                 user.last_login = timezone.now()
-                user.save(update_fields=['is_email_verified', 'is_active', 'last_login'])
+                user.save(update_fields=['is_email_verified', 'is_active', 'last_login', 'updated_at'])
 
                 # Create JWT token now that OTP is verified
                 payload = {
@@ -583,7 +599,7 @@ class ImportantDetails(APIView):
 
         # Save the changes
         if update_fields:
-            user.save(update_fields=update_fields)
+            user.save(update_fields=update_fields + ['updated_at'])
             print("User saved successfully with fields:", update_fields)
 
         # Return success response
@@ -686,6 +702,8 @@ class UpdateProfilePicture(APIView):
             # Update the profile picture field with base64 data
             user.profile_picture = profile_picture_data
             user.save()
+            # Feed pages embed the author's picture
+            bump_feed_version()
             print("Profile picture updated successfully")
 
             # Return success response
@@ -819,7 +837,12 @@ class UpdateUserProfile(APIView):
             
             # Save the user with updated fields
             if update_fields:
-                user.save(update_fields=update_fields)
+                user.save(update_fields=update_fields + ['updated_at'])
+                # Search matches posts by the username in their snapshot
+                if 'username' in update_fields:
+                    refresh_author_snapshots(user)
+                # Feed pages embed the author's profile
+                bump_feed_version()
                 print("User profile updated successfully. Updated fields:", update_fields)
             else:
                 print("No fields to update")
@@ -1016,7 +1039,7 @@ class UpdatePrivacySettings(APIView):
             
             # Save the user with updated fields
             if update_fields:
-                user.save(update_fields=update_fields)
+                user.save(update_fields=update_fields + ['updated_at'])
                 print("Privacy settings updated successfully. Updated fields:", update_fields)
             else:
                 print("No privacy settings to update")
@@ -1134,9 +1157,15 @@ class CreatePost(APIView):
             serializer = PostSerializer(data=post_data, context={'request': request})
             
             if serializer.is_valid():
-                # Save the post
-                post = serializer.save()
+                # Save the post and count it in the same transaction
+                with transaction.atomic():
+                    post = serializer.save()
+                    record_post_created(post)
+                    refresh_hot_score(post)
                 print("Post created successfully with ID:", post.id)
+
+                # Invalidate cached feed pages
+                bump_feed_version()
                 
                 # Return success response with post data
                 return Response({
@@ -1165,31 +1194,59 @@ class UpvotePost(APIView):
             print("=== UpvotePost POST request ===")
             print("Post ID:", post_id)
             
-            # Get the post from the database
+            # Get the JWT token from the cookies or Authorization header
+            token = request.COOKIES.get('jwt')
+            if not token:
+                auth_header = request.headers.get('Authorization')
+                if auth_header and auth_header.startswith('Bearer '):
+                    token = auth_header.split(' ')[1]
+
+            if not token:
+                return Response({
+                    'error': 'Authentication required. Please log in.',
+                    'detail': 'No JWT token found in cookies or Authorization header'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
             try:
-                post = Post.objects.get(id=post_id)
+                # Decoding the JWT token
+                payload = jwt.decode(token, 'secret', algorithms=['HS256'])
+            except jwt.ExpiredSignatureError:
+                return Response({
+                    'error': 'Token has expired. Please log in again.',
+                    'detail': 'JWT token has expired'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            except Exception as e:
+                return Response({
+                    'error': 'Invalid authentication token. Please log in again.',
+                    'detail': f'JWT decode error: {str(e)}'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
+            # Votes are recorded per user
+            user = User.objects.filter(id=payload['id']).first()
+            if not user:
+                return Response({
+                    'error': 'User not found. Please log in again.',
+                    'detail': 'User ID from token not found in database'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
+            # Get the post from the database (only the columns the hot score needs)
+            try:
+                post = Post.objects.only('id', 'upvotes', 'downvotes', 'comment_count', 'created_at').get(id=post_id)
             except Post.DoesNotExist:
                 return Response({
                     'error': 'Post not found',
                     'detail': f'Post with ID {post_id} does not exist'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            # Toggle upvote (if already upvoted, remove it; if not, add it)
-            # For now, we'll just increment/decrement the count
-            # In a real app, you'd track individual user votes
-            current_upvotes = post.upvotes or 0
-            
-            # Check if this is a toggle (user clicking again)
-            # For now, we'll implement a simple toggle logic
-            # You might want to track user-specific voting state in the future
-            if current_upvotes > 0:
-                post.upvotes = current_upvotes - 1
-                action = "removed"
-            else:
-                post.upvotes = current_upvotes + 1
-                action = "added"
+            # Toggle this user's upvote (add, take back, or switch from the other vote)
+            action = toggle_vote(user, post, PostVote.UPVOTE)
             
-            post.save()
+            # Current counts, including votes still buffered in write-behind mode
+            get_vote_counts(post)
+            # Buffered votes refresh the hot score when they are flushed
+            if not is_write_behind_enabled():
+                refresh_hot_score(post)
+            bump_feed_version()
             
             print(f"Upvote {action}. New count: {post.upvotes}")
             
@@ -1197,6 +1254,7 @@ class UpvotePost(APIView):
                 'message': f'Upvote {action} successfully',
                 'post_id': post_id,
                 'new_upvotes': post.upvotes,
+                'new_downvotes': post.downvotes,
                 'action': action
             }, status=status.HTTP_200_OK)
             
@@ -1216,33 +1274,66 @@ class DownvotePost(APIView):
             print("=== DownvotePost POST request ===")
             print("Post ID:", post_id)
             
-            # Get the post from the database
+            # Get the JWT token from the cookies or Authorization header
+            token = request.COOKIES.get('jwt')
+            if not token:
+                auth_header = request.headers.get('Authorization')
+                if auth_header and auth_header.startswith('Bearer '):
+                    token = auth_header.split(' ')[1]
+
+            if not token:
+                return Response({
+                    'error': 'Authentication required. Please log in.',
+                    'detail': 'No JWT token found in cookies or Authorization header'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
             try:
-                post = Post.objects.get(id=post_id)
+                # Decoding the JWT token
+                payload = jwt.decode(token, 'secret', algorithms=['HS256'])
+            except jwt.ExpiredSignatureError:
+                return Response({
+                    'error': 'Token has expired. Please log in again.',
+                    'detail': 'JWT token has expired'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            except Exception as e:
+                return Response({
+                    'error': 'Invalid authentication token. Please log in again.',
+                    'detail': f'JWT decode error: {str(e)}'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
+            # Votes are recorded per user
+            user = User.objects.filter(id=payload['id']).first()
+            if not user:
+                return Response({
+                    'error': 'User not found. Please log in again.',
+                    'detail': 'User ID from token not found in database'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
+            # Get the post from the database (only the columns the hot score needs)
+            try:
+                post = Post.objects.only('id', 'upvotes', 'downvotes', 'comment_count', 'created_at').get(id=post_id)
             except Post.DoesNotExist:
                 return Response({
                     'error': 'Post not found',
                     'detail': f'Post with ID {post_id} does not exist'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            # Toggle downvote (if already downvoted, remove it; if not, add it)
-            current_downvotes = post.downvotes or 0
+            # Toggle this user's downvote (add, take back, or switch from the other vote)
+            action = toggle_vote(user, post, PostVote.DOWNVOTE)
             
-            # Check if this is a toggle (user clicking again)
-            if current_downvotes > 0:
-                post.downvotes = current_downvotes - 1
-                action = "removed"
-            else:
-                post.downvotes = current_downvotes + 1
-                action = "added"
-            
-            post.save()
+            # Current counts, including votes still buffered in write-behind mode
+            get_vote_counts(post)
+            # Buffered votes refresh the hot score when they are flushed
+            if not is_write_behind_enabled():
+                refresh_hot_score(post)
+            bump_feed_version()
             
             print(f"Downvote {action}. New count: {post.downvotes}")
             
             return Response({
                 'message': f'Downvote {action} successfully',
                 'post_id': post_id,
+                'new_upvotes': post.upvotes,
                 'new_downvotes': post.downvotes,
                 'action': action
             }, status=status.HTTP_200_OK)
@@ -1330,12 +1421,15 @@ class DeletePost(APIView):
 
             # Get associated data before deletion for cleanup logging
             associated_parties = list(post.parties.all())
-            comment_count = len(post.comments) if post.comments else 0
+            comment_count = post.comment_count
 
             print(f"Deleting post {post_id} with {comment_count} comments and {len(associated_parties)} associated parties")
 
             # Delete the post (Django will handle cascade deletes automatically due to CASCADE on_delete)
-            post.delete()
+            with transaction.atomic():
+                post.delete()
+                record_post_deleted(post)
+            bump_feed_version()
 
             print(f"Post {post_id} deleted successfully by user {user.username}")
 
@@ -1405,9 +1499,9 @@ class CommentPost(APIView):
                     'detail': 'User ID from token not found in database'
                 }, status=status.HTTP_401_UNAUTHORIZED)
             
-            # Get the post from the database
+            # Get the post from the database (only the columns the hot score needs)
             try:
-                post = Post.objects.get(id=post_id)
+                post = Post.objects.only('id', 'upvotes', 'downvotes', 'comment_count', 'created_at').get(id=post_id)
             except Post.DoesNotExist:
                 return Response({
                     'error': 'Post not found',
@@ -1422,43 +1516,23 @@ class CommentPost(APIView):
                     'detail': 'Comment cannot be empty'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Create comment object
-            comment = {
-                'id': f"comment_{post_id}_{int(datetime.datetime.now().timestamp())}",  # Generate unique comment ID
-                'user_id': user.id,
-                'username': user.username,
-                'user_email': user.email,
-                'profile_picture': user.profile_picture,
-                'full_name': user.full_name or user.username,
-                'text': comment_text,
-                'post_id': post_id,
-                'timestamp': datetime.datetime.now().isoformat(),
-                'created_at': datetime.datetime.now().isoformat()
-            }
-            
-            # Get existing comments or initialize empty list
-            existing_comments = post.comments or []
-            
-            # Add new comment to the list
-            existing_comments.append(comment)
+            # Insert the comment and bump the post's comment count atomically
+            # (a single row insert - concurrent comments never overwrite each other)
+            with transaction.atomic():
+                comment = Comment.objects.create(post=post, user=user, text=comment_text)
+                Post.objects.filter(id=post.id).update(comment_count=models.F('comment_count') + 1)
             
-            # Update the post with new comments
-            post.comments = existing_comments
+            post.refresh_from_db(fields=['upvotes', 'downvotes', 'comment_count'])
+            refresh_hot_score(post)
+            bump_feed_version()
             
-            # Update comment count (this is the length of comments array)
-            # Note: We're using the comments array length as the count
-            # You might want to add a separate comment_count field in the future
-            
-            # Save the post
-            post.save()
-            
-            print(f"Comment added successfully. Total comments: {len(existing_comments)}")
+            print(f"Comment added successfully. Total comments: {post.comment_count}")
             
             return Response({
                 'message': 'Comment added successfully',
-                'comment': comment,
+                'comment': CommentSerializer(comment).data,
                 'post_id': post_id,
-                'total_comments': len(existing_comments)
+                'total_comments': post.comment_count
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -1469,6 +1543,45 @@ class CommentPost(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Get Post Comments View (paginated, oldest first)
+@method_decorator(csrf_exempt, name='dispatch')
+class GetPostComments(APIView):
+    def get(self, request, post_id):
+        try:
+            # The post's maintained comment count doubles as the existence check
+            total = Post.objects.filter(id=post_id).values_list('comment_count', flat=True).first()
+            if total is None:
+                return Response({
+                    'error': 'Post not found',
+                    'detail': f'Post with ID {post_id} does not exist'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            try:
+                comments, pagination = paginate_comments(
+                    request, prepare_comment_queryset(Comment.objects.filter(post_id=post_id))
+                )
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid pagination parameters',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response({
+                'message': 'Comments fetched successfully',
+                'comments': CommentSerializer(comments, many=True).data,
+                'post_id': post_id,
+                'total': total,
+                **pagination
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            print("Error fetching comments:", str(e))
+            return Response({
+                'error': f'Failed to fetch comments: {str(e)}',
+                'detail': 'An error occurred while retrieving comments from the database'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Get All Users View
 @method_decorator(csrf_exempt, name='dispatch')
 class GetAllUsers(APIView):
@@ -1479,11 +1592,29 @@ class GetAllUsers(APIView):
             # print("Request path:", request.path)
             
             # Get only users where candidate=True from the database, ordered by newest first
+            try:
+                fields, exclude = parse_fieldset(request, UserSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             users = User.objects.filter(candidate=True).order_by('-date_joined')
+            users = apply_fieldset(users, UserSerializer, fields, exclude)
+
+            # Stream the users instead of materializing the whole table
+            if is_stream_request(request):
+                return stream_json_response(
+                    'users', users,
+                    lambda chunk: UserSerializer(chunk, many=True, fields=fields, exclude=exclude).data,
+                    extra={'message': 'Users fetched successfully'},
+                    summary=lambda count: {'count': count}
+                )
+
             print(f"Found {users.count()} candidates in database")
             
             # Serialize the users
-            serializer = UserSerializer(users, many=True)
+            serializer = UserSerializer(users, many=True, fields=fields, exclude=exclude)
             # print("Users serialized successfully")
             
             # Return the users data
@@ -1510,49 +1641,127 @@ class GetAllPosts(APIView):
             print("Request method:", request.method)
             print("Request path:", request.path)
 
-            # Get pagination parameters
-            page = int(request.GET.get('page', 1))
-            limit = int(request.GET.get('limit', 5))  # Changed to 5 to match frontend
-            print(f"Pagination: page={page}, limit={limit}")
+            # The feed version changes on every post write, so it doubles as the ETag version
+            etag = build_etag(request, 'posts', get_feed_version())
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
+            # Serve the rendered page from the versioned feed cache when possible
+            cache_key = get_feed_page_key(request)
+            cached_page = get_cached_feed_page(cache_key)
+            if cached_page is not None:
+                print("Feed page served from cache")
+                return Response(cached_page, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT', 'ETag': etag})
+
+            # Compact view projects only the feed columns and sends each author once
+            compact = is_compact_view(request)
+            queryset = Post.objects.all()
+            try:
+                fields, exclude = parse_fieldset(request, PostSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if compact:
+                queryset = prepare_compact_post_queryset(queryset)
+            else:
+                queryset = apply_fieldset(prepare_post_queryset(queryset), PostSerializer, fields, exclude, required=[get_sort_field(request)])
+
+            # Paginate the posts (cursor mode skips the total count entirely)
+            try:
+                posts, pagination = paginate_posts(request, queryset, count=get_post_count)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid pagination parameters',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            print(f"Retrieved {pagination['count']} posts, has_next={pagination['has_next']}")
+
+            # Serialize the posts
+            if compact:
+                feed = serialize_compact_feed(posts)
+            else:
+                feed = {'posts': PostSerializer(posts, many=True, fields=fields, exclude=exclude).data}
+            print("Posts serialized successfully")
 
-            # Calculate offset
-            offset = (page - 1) * limit
+            # Cache the rendered page and return the posts data with pagination info
+            data = {
+                'message': 'Posts fetched successfully',
+                **feed,
+                **pagination
+            }
+            set_cached_feed_page(cache_key, data)
+            return Response(data, status=status.HTTP_200_OK, headers={'X-Cache': 'MISS', 'ETag': etag})
 
-            # Get total count
-            total_posts = Post.objects.count()
-            print(f"Total posts in database: {total_posts}")
+        except Exception as e:
+            print("Error fetching posts:", str(e))
+            return Response({
+                'error': f'Failed to fetch posts: {str(e)}',
+                'detail': 'An error occurred while retrieving posts from the database'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # Get paginated posts from the database, ordered by newest first
-            posts = Post.objects.all().order_by('-created_at')[offset:offset + limit]
-            posts_count = posts.count()
-            print(f"Retrieved {posts_count} posts for page {page}")
 
-            # Check if there are more pages
-            has_next = (offset + limit) < total_posts
-            has_previous = page > 1
+# Get Posts By IDs View (batch lookup for notifications and deep links)
+@method_decorator(csrf_exempt, name='dispatch')
+class GetPostsByIds(APIView):
+    def get(self, request):
+        try:
+            # Parse ?ids=1,2,3 keeping the client's order and dropping duplicates
+            raw_ids = [value.strip() for value in request.GET.get('ids', '').split(',') if value.strip()]
+            try:
+                post_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+            except ValueError:
+                return Response({
+                    'error': 'Invalid post IDs',
+                    'detail': 'The "ids" parameter must be a comma-separated list of integers'
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            print(f"Pagination info: has_next={has_next}, has_previous={has_previous}")
+            if not post_ids:
+                return Response({
+                    'error': 'Post IDs are required',
+                    'detail': 'Please provide post IDs using the "ids" parameter'
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Serialize the posts
-            serializer = PostSerializer(posts, many=True)
-            print("Posts serialized successfully")
+            if len(post_ids) > MAX_BATCH_POST_IDS:
+                return Response({
+                    'error': 'Too many post IDs',
+                    'detail': f'At most {MAX_BATCH_POST_IDS} posts can be fetched per request'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # One query for the posts, with the same prefetching as the feed
+            compact = is_compact_view(request)
+            try:
+                fields, exclude = parse_fieldset(request, PostSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            queryset = Post.objects.filter(id__in=post_ids)
+            if compact:
+                queryset = prepare_compact_post_queryset(queryset)
+            else:
+                queryset = apply_fieldset(prepare_post_queryset(queryset), PostSerializer, fields, exclude)
+
+            posts_by_id = {post.id: post for post in queryset}
+            posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+            missing = [post_id for post_id in post_ids if post_id not in posts_by_id]
+
+            if compact:
+                feed = serialize_compact_feed(posts)
+            else:
+                feed = {'posts': PostSerializer(posts, many=True, fields=fields, exclude=exclude).data}
 
-            # Return the posts data with pagination info
             return Response({
                 'message': 'Posts fetched successfully',
-                'posts': serializer.data,
-                'count': posts_count,
-                'total': total_posts,
-                'page': page,
-                'limit': limit,
-                'has_next': has_next,
-                'has_previous': has_previous,
-                'next': f"?page={page + 1}&limit={limit}" if has_next else None,
-                'previous': f"?page={page - 1}&limit={limit}" if has_previous else None
+                **feed,
+                'count': len(posts),
+                'missing': missing
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            print("Error fetching posts:", str(e))
+            print("Error fetching posts by IDs:", str(e))
             return Response({
                 'error': f'Failed to fetch posts: {str(e)}',
                 'detail': 'An error occurred while retrieving posts from the database'
@@ -1595,31 +1804,29 @@ class GetMyPosts(APIView):
                     'detail': 'User ID from token not found in database'
                 }, status=status.HTTP_401_UNAUTHORIZED)
 
-            page = int(request.GET.get('page', 1))
-            limit = int(request.GET.get('limit', 5))
-            offset = (page - 1) * limit
-
-            queryset = Post.objects.filter(user=user, is_anonymous=False).order_by('-created_at')
-            total_posts = queryset.count()
-            posts = queryset[offset:offset + limit]
-            posts_count = posts.count()
-
-            has_next = (offset + limit) < total_posts
-            has_previous = page > 1
+            try:
+                fields, exclude = parse_fieldset(request, PostSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            queryset = prepare_post_queryset(Post.objects.filter(user=user, is_anonymous=False))
+            queryset = apply_fieldset(queryset, PostSerializer, fields, exclude, required=[get_sort_field(request)])
+            try:
+                posts, pagination = paginate_posts(request, queryset, count=lambda: get_user_post_count(user))
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid pagination parameters',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            serializer = PostSerializer(posts, many=True)
+            serializer = PostSerializer(posts, many=True, fields=fields, exclude=exclude)
 
             return Response({
                 'message': 'Posts fetched successfully',
                 'posts': serializer.data,
-                'count': posts_count,
-                'total': total_posts,
-                'page': page,
-                'limit': limit,
-                'has_next': has_next,
-                'has_previous': has_previous,
-                'next': f"?page={page + 1}&limit={limit}" if has_next else None,
-                'previous': f"?page={page - 1}&limit={limit}" if has_previous else None
+                **pagination
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -1635,17 +1842,23 @@ class GetMyPosts(APIView):
 class GetUserProfileById(APIView):
     def get(self, request, user_id):
         try:
-            user = User.objects.filter(id=user_id).first()
-            if not user:
+            # Check the version before loading the full profile (and its picture)
+            updated_at = User.objects.filter(id=user_id).values_list('updated_at', flat=True).first()
+            if not updated_at:
                 return Response({
                     'error': 'User not found',
                     'detail': f'No user with id {user_id}'
                 }, status=status.HTTP_404_NOT_FOUND)
+            etag = build_etag(request, 'user', user_id, updated_at.isoformat())
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
+            user = User.objects.get(id=user_id)
             serializer = UserSerializer(user)
             data = dict(serializer.data)
             data.pop('password', None)
             data.pop('email', None)
-            return Response(data, status=status.HTTP_200_OK)
+            return Response(data, status=status.HTTP_200_OK, headers={'ETag': etag})
         except Exception as e:
             print("Error fetching user profile:", str(e))
             return Response({
@@ -1654,6 +1867,41 @@ class GetUserProfileById(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Get User Avatar View (profile picture as an image, referenced by the compact feed)
+@method_decorator(csrf_exempt, name='dispatch')
+class GetUserAvatar(APIView):
+    def get(self, request, user_id):
+        try:
+            profile_picture = User.objects.filter(id=user_id).values_list('profile_picture', flat=True).first()
+            if not profile_picture:
+                return Response({
+                    'error': 'Avatar not found',
+                    'detail': f'No profile picture for user {user_id}'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            # Pictures stored as URLs are served from their original location
+            if profile_picture.startswith(('http://', 'https://')):
+                return redirect(profile_picture)
+
+            # Pictures are stored as data URLs ("data:image/png;base64,...") or bare base64
+            content_type = 'image/jpeg'
+            encoded = profile_picture
+            if profile_picture.startswith('data:'):
+                header, _, encoded = profile_picture.partition(',')
+                content_type = header[len('data:'):].split(';')[0] or content_type
+
+            response = HttpResponse(b64decode(encoded), content_type=content_type)
+            # Versioned URLs never change their image; unversioned ones (in snapshots) can
+            response['Cache-Control'] = get_avatar_cache_control(request)
+            return response
+        except Exception as e:
+            print("Error fetching user avatar:", str(e))
+            return Response({
+                'error': f'Failed to fetch user avatar: {str(e)}',
+                'detail': 'An error occurred while retrieving the profile picture'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Get User Posts View (public non-anonymous posts by user_id)
 @method_decorator(csrf_exempt, name='dispatch')
 class GetUserPosts(APIView):
@@ -1665,27 +1913,34 @@ class GetUserPosts(APIView):
                     'error': 'User not found',
                     'detail': f'No user with id {user_id}'
                 }, status=status.HTTP_404_NOT_FOUND)
-            page = int(request.GET.get('page', 1))
-            limit = int(request.GET.get('limit', 5))
-            offset = (page - 1) * limit
-            queryset = Post.objects.filter(user=user, is_anonymous=False).order_by('-created_at')
-            total_posts = queryset.count()
-            posts = queryset[offset:offset + limit]
-            posts_count = posts.count()
-            has_next = (offset + limit) < total_posts
-            has_previous = page > 1
-            serializer = PostSerializer(posts, many=True)
+            compact = is_compact_view(request)
+            queryset = Post.objects.filter(user=user, is_anonymous=False)
+            try:
+                fields, exclude = parse_fieldset(request, PostSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if compact:
+                queryset = prepare_compact_post_queryset(queryset)
+            else:
+                queryset = apply_fieldset(prepare_post_queryset(queryset), PostSerializer, fields, exclude, required=[get_sort_field(request)])
+            try:
+                posts, pagination = paginate_posts(request, queryset, count=lambda: get_user_post_count(user))
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid pagination parameters',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if compact:
+                feed = serialize_compact_feed(posts)
+            else:
+                feed = {'posts': PostSerializer(posts, many=True, fields=fields, exclude=exclude).data}
             return Response({
                 'message': 'Posts fetched successfully',
-                'posts': serializer.data,
-                'count': posts_count,
-                'total': total_posts,
-                'page': page,
-                'limit': limit,
-                'has_next': has_next,
-                'has_previous': has_previous,
-                'next': f"?page={page + 1}&limit={limit}" if has_next else None,
-                'previous': f"?page={page - 1}&limit={limit}" if has_previous else None
+                **feed,
+                **pagination
             }, status=status.HTTP_200_OK)
         except Exception as e:
             print("Error fetching user posts:", str(e))
@@ -1704,20 +1959,45 @@ class GetAllParties(APIView):
             # print("Request method:", request.method)
             # print("Request path:", request.path)
             
+            # Answer revalidation requests from the table version without serializing
+            last_updated, total = get_queryset_version(Parties.objects.all())
+            etag = build_etag(request, 'parties', last_updated, total)
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
             # Get all parties from the database, ordered by votes (highest first) then by party name
+            try:
+                fields, exclude = parse_fieldset(request, PartiesSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             parties = Parties.objects.all().order_by('-votes', 'party_name')
+            parties = apply_fieldset(parties, PartiesSerializer, fields, exclude)
+
+            # Stream the parties instead of materializing the whole table
+            if is_stream_request(request):
+                response = stream_json_response(
+                    'parties', parties,
+                    lambda chunk: PartiesSerializer(chunk, many=True, fields=fields, exclude=exclude).data,
+                    extra={'message': 'Parties fetched successfully'},
+                    summary=lambda count: {'count': count}
+                )
+                response['ETag'] = etag
+                return response
             # print(f"Found {parties.count()} parties in database")
             
             # Serialize the parties
-            serializer = PartiesSerializer(parties, many=True)
+            serializer = PartiesSerializer(parties, many=True, fields=fields, exclude=exclude)
             # print("Parties serialized successfully")
             
             # Return the parties data
             return Response({
                 'message': 'Parties fetched successfully',
                 'parties': serializer.data,
-                'count': parties.count()
-            }, status=status.HTTP_200_OK)
+                'count': total
+            }, status=status.HTTP_200_OK, headers={'ETag': etag})
             
         except Exception as e:
             print("Error fetching parties:", str(e))
@@ -1840,20 +2120,45 @@ class GetAllCandidates(APIView):
             # print("Request method:", request.method)
             # print("Request path:", request.path)
             
+            # Answer revalidation requests from the table version without serializing
+            last_updated, total = get_queryset_version(Candidates.objects.all())
+            etag = build_etag(request, 'candidates', last_updated, total)
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
             # Get all candidates from the database, ordered by votes (highest first) then by name
+            try:
+                fields, exclude = parse_fieldset(request, CandidatesSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             candidates = Candidates.objects.all().order_by('-votes', 'candidate_name')
+            candidates = apply_fieldset(candidates, CandidatesSerializer, fields, exclude)
+
+            # Stream the candidates instead of materializing the whole table
+            if is_stream_request(request):
+                response = stream_json_response(
+                    'candidates', candidates,
+                    lambda chunk: CandidatesSerializer(chunk, many=True, fields=fields, exclude=exclude).data,
+                    extra={'message': 'Candidates fetched successfully'},
+                    summary=lambda count: {'count': count}
+                )
+                response['ETag'] = etag
+                return response
             # print(f"Found {candidates.count()} candidates in database")
             
             # Serialize the candidates
-            serializer = CandidatesSerializer(candidates, many=True)
+            serializer = CandidatesSerializer(candidates, many=True, fields=fields, exclude=exclude)
             print("Candidates serialized successfully")
             
             # Return the candidates data
             return Response({
                 'message': 'Candidates fetched successfully',
                 'candidates': serializer.data,
-                'count': candidates.count()
-            }, status=status.HTTP_200_OK)
+                'count': total
+            }, status=status.HTTP_200_OK, headers={'ETag': etag})
             
         except Exception as e:
             print("Error fetching candidates:", str(e))
@@ -1871,60 +2176,25 @@ class GetUserStats(APIView):
             print("=== GetUserStats GET request ===")
             print("Request method:", request.method)
             print("Request path:", request.path)
-            
-            # Get total users count
-            total_users = User.objects.count()
-            print(f"Total users: {total_users}")
-            
-            # Calculate growth percentage (comparing current month vs previous month)
-            from django.utils import timezone
-            from datetime import timedelta
-            
-            now = timezone.now()
-            # Start of current month
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Start of previous month
-            if current_month_start.month == 1:
-                previous_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
-            else:
-                previous_month_start = current_month_start.replace(month=current_month_start.month - 1)
-            
-            # Count users joined in current month
-            current_month_users = User.objects.filter(
-                date_joined__gte=current_month_start,
-                date_joined__lte=now
-            ).count()
-            
-            # Count users joined in previous month
-            previous_month_users = User.objects.filter(
-                date_joined__gte=previous_month_start,
-                date_joined__lt=current_month_start
-            ).count()
-            
-            # Calculate growth percentage
-            if previous_month_users > 0:
-                growth_percentage = ((current_month_users - previous_month_users) / previous_month_users) * 100
-            else:
-                # If no users in previous month, consider current month users as 100% growth
-                growth_percentage = 100.0 if current_month_users > 0 else 0.0
-            
-            # Round to 1 decimal place
-            growth_percentage = round(growth_percentage, 1)
-            
-            print(f"Current month users: {current_month_users}")
-            print(f"Previous month users: {previous_month_users}")
-            print(f"Growth percentage: {growth_percentage}%")
-            
+
+            # Total, current month and previous month counts in one query (cached briefly)
+            stats = get_growth_stats('users')
+
+            print(f"Total users: {stats['total']}")
+            print(f"Current month users: {stats['current_month']}")
+            print(f"Previous month users: {stats['previous_month']}")
+            print(f"Growth percentage: {stats['growth_percentage']}%")
+
             # Return the user statistics
             return Response({
                 'message': 'User statistics fetched successfully',
-                'total_users': total_users,
-                'current_month_users': current_month_users,
-                'previous_month_users': previous_month_users,
-                'growth_percentage': growth_percentage,
-                'growth_direction': 'up' if growth_percentage >= 0 else 'down'
+                'total_users': stats['total'],
+                'current_month_users': stats['current_month'],
+                'previous_month_users': stats['previous_month'],
+                'growth_percentage': stats['growth_percentage'],
+                'growth_direction': stats['growth_direction']
             }, status=status.HTTP_200_OK)
-            
+
         except Exception as e:
             print("Error fetching user statistics:", str(e))
             return Response({
@@ -1941,44 +2211,25 @@ class GetPartyStats(APIView):
             print("=== GetPartyStats GET request ===")
             print("Request method:", request.method)
             print("Request path:", request.path)
-            
-            # Get total parties count
-            total_parties = Parties.objects.count()
-            print(f"Total parties: {total_parties}")
-            
-            # Calculate growth percentage (comparing current month vs previous month)
-            from django.utils import timezone
-            from datetime import timedelta
-            
-            now = timezone.now()
-            # Start of current month
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Start of previous month
-            if current_month_start.month == 1:
-                previous_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
-            else:
-                previous_month_start = current_month_start.replace(month=current_month_start.month - 1)
-            
-            # Count parties registered in current month
-            current_month_parties = Parties.objects.filter(
-                id__gte=1  # Since Parties model doesn't have date_joined, we'll use a simple approach
-            ).count()
-            
-            # For now, we'll set a default growth percentage
-            # In a real app, you'd track when parties were created
-            growth_percentage = 12.5  # Default value
-            
-            print(f"Current month parties: {current_month_parties}")
-            print(f"Growth percentage: {growth_percentage}%")
-            
+
+            # Total, current month and previous month counts in one query (cached briefly)
+            stats = get_growth_stats('parties')
+
+            print(f"Total parties: {stats['total']}")
+            print(f"Current month parties: {stats['current_month']}")
+            print(f"Previous month parties: {stats['previous_month']}")
+            print(f"Growth percentage: {stats['growth_percentage']}%")
+
             # Return the party statistics
             return Response({
                 'message': 'Party statistics fetched successfully',
-                'total_parties': total_parties,
-                'growth_percentage': growth_percentage,
-                'growth_direction': 'up'
+                'total_parties': stats['total'],
+                'current_month_parties': stats['current_month'],
+                'previous_month_parties': stats['previous_month'],
+                'growth_percentage': stats['growth_percentage'],
+                'growth_direction': stats['growth_direction']
             }, status=status.HTTP_200_OK)
-            
+
         except Exception as e:
             print("Error fetching party statistics:", str(e))
             return Response({
@@ -1995,44 +2246,25 @@ class GetCandidateStats(APIView):
             print("=== GetCandidateStats GET request ===")
             print("Request method:", request.method)
             print("Request path:", request.path)
-            
-            # Get total candidates count
-            total_candidates = Candidates.objects.count()
-            print(f"Total candidates: {total_candidates}")
-            
-            # Calculate growth percentage (comparing current month vs previous month)
-            from django.utils import timezone
-            from datetime import timedelta
-            
-            now = timezone.now()
-            # Start of current month
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Start of previous month
-            if current_month_start.month == 1:
-                previous_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
-            else:
-                previous_month_start = current_month_start.replace(month=current_month_start.month - 1)
-            
-            # Count candidates registered in current month
-            current_month_candidates = Candidates.objects.filter(
-                id__gte=1  # Since Candidates model doesn't have date_joined, we'll use a simple approach
-            ).count()
-            
-            # For now, we'll set a default growth percentage
-            # In a real app, you'd track when candidates were created
-            growth_percentage = 4.5  # Default value
-            
-            print(f"Current month candidates: {current_month_candidates}")
-            print(f"Growth percentage: {growth_percentage}%")
-            
+
+            # Total, current month and previous month counts in one query (cached briefly)
+            stats = get_growth_stats('candidates')
+
+            print(f"Total candidates: {stats['total']}")
+            print(f"Current month candidates: {stats['current_month']}")
+            print(f"Previous month candidates: {stats['previous_month']}")
+            print(f"Growth percentage: {stats['growth_percentage']}%")
+
             # Return the candidate statistics
             return Response({
                 'message': 'Candidate statistics fetched successfully',
-                'total_candidates': total_candidates,
-                'growth_percentage': growth_percentage,
-                'growth_direction': 'up'
+                'total_candidates': stats['total'],
+                'current_month_candidates': stats['current_month'],
+                'previous_month_candidates': stats['previous_month'],
+                'growth_percentage': stats['growth_percentage'],
+                'growth_direction': stats['growth_direction']
             }, status=status.HTTP_200_OK)
-            
+
         except Exception as e:
             print("Error fetching candidate statistics:", str(e))
             return Response({
@@ -2041,39 +2273,77 @@ class GetCandidateStats(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Get Dashboard Summary View
+@method_decorator(csrf_exempt, name='dispatch')
+class GetDashboardSummary(APIView):
+    """
+    View to get every admin dashboard tile (users, parties, candidates and
+    the last year of impressions) in one request. The summary is cached
+    briefly and rebuilt by one request at a time.
+    """
+    def get(self, request):
+        try:
+            print("=== GetDashboardSummary GET request ===")
+
+            summary = get_dashboard_summary()
+            print(f"Dashboard summary generated at {summary['generated_at']}")
+
+            # Return the dashboard summary
+            return Response({
+                'message': 'Dashboard summary fetched successfully',
+                **summary
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            print("Error fetching dashboard summary:", str(e))
+            return Response({
+                'error': f'Failed to fetch dashboard summary: {str(e)}',
+                'detail': 'An error occurred while calculating the dashboard statistics'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Track App Impressions View
 @method_decorator(csrf_exempt, name='dispatch')
 class TrackImpressions(APIView):
     """
     View to track app impressions. This endpoint should be called every time
     a user accesses the app (both logged in and not logged in users).
-    It increments the impression count for the current date.
+    It increments the impression count for the current date. Hits are
+    buffered per worker and written in batches, so the count in the
+    response can trail other workers by one flush interval.
     """
     def post(self, request):
         try:
             print("=== TrackImpressions POST request ===")
 
-            # Get today's date
-            today = timezone.now().date()
+            # Get the current time and today's date
+            now = timezone.now()
+            today = now.date()
             print(f"Tracking impressions for date: {today}")
 
-            # Try to get the existing record for today, or create a new one
-            impression_record, created = DailyImpressions.objects.get_or_create(
-                date=today,
-                defaults={'impressions': 0}
-            )
+            if settings.IMPRESSIONS_SHARDED:
+                # Spread the increment over shard rows instead of locking today's single row
+                counter_name = get_counter_name('impressions', today.isoformat())
+                increment_counter(counter_name)
+                increment_counter(get_counter_name('hourly_impressions', get_impression_hour(now).isoformat()))
+                compacted = DailyImpressions.objects.filter(date=today).values_list('impressions', flat=True).first()
+                impressions_today = (compacted or 0) + get_counter_total(counter_name)
+                created = impressions_today == 1
+            else:
+                # Count the hit in memory; a background flush upserts it into today's row
+                impressions_today = record_impression(now)
+                created = impressions_today == 1
 
-            # Increment the impressions count
-            impression_record.impressions += 1
-            impression_record.save()
+            # Count the visitor towards today's unique visitors
+            record_visitor(now, get_visitor_hash(request))
 
-            print(f"Impressions for {today}: {impression_record.impressions} (created: {created})")
+            print(f"Impressions for {today}: {impressions_today} (created: {created})")
 
             # Return success response
             return Response({
                 'message': 'Impression tracked successfully',
                 'date': today.isoformat(),
-                'impressions_today': impression_record.impressions,
+                'impressions_today': impressions_today,
                 'is_new_day': created
             }, status=status.HTTP_200_OK)
 
@@ -2085,12 +2355,77 @@ class TrackImpressions(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Track Events View
+@method_decorator(csrf_exempt, name='dispatch')
+class TrackEvents(APIView):
+    """
+    View to ingest a batch of client events (impressions, post views and shares).
+    Clients buffer events and send them together every few seconds, e.g.
+    {"events": [{"type": "post_view", "post_id": 12, "timestamp": "..."}]}.
+    Invalid events are reported back and the rest are recorded.
+    """
+    def post(self, request):
+        try:
+            print("=== TrackEvents POST request ===")
+
+            # Accept {"events": [...]} or a bare list
+            events = request.data.get('events') if isinstance(request.data, dict) else request.data
+            if not isinstance(events, list):
+                return Response({
+                    'error': 'Events are required',
+                    'detail': 'Please provide a list of events in the "events" field'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if len(events) > MAX_EVENTS_PER_BATCH:
+                return Response({
+                    'error': 'Too many events',
+                    'detail': f'A batch can hold at most {MAX_EVENTS_PER_BATCH} events'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Validate every event, keeping the valid ones
+            valid_events = []
+            rejected = []
+            for index, event in enumerate(events):
+                serializer = TrackEventSerializer(data=event)
+                if serializer.is_valid():
+                    valid_events.append((index, serializer.validated_data))
+                else:
+                    rejected.append({'index': index, 'errors': serializer.errors})
+
+            # Check every referenced post with one query
+            post_ids = {event['post_id'] for _, event in valid_events if 'post_id' in event}
+            existing_post_ids = set(Post.objects.filter(id__in=post_ids).values_list('id', flat=True)) if post_ids else set()
+            accepted = []
+            for index, event in valid_events:
+                if 'post_id' in event and event['post_id'] not in existing_post_ids:
+                    rejected.append({'index': index, 'errors': {'post_id': ['Post not found.']}})
+                else:
+                    accepted.append(event)
+
+            recorded = record_events(accepted, get_visitor_hash(request))
+            print(f"Recorded {len(accepted)} events, rejected {len(rejected)}: {recorded}")
+
+            return Response({
+                'message': 'Events tracked successfully',
+                'accepted': len(accepted),
+                'recorded': recorded,
+                'rejected': sorted(rejected, key=lambda item: item['index'])
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            print("Error tracking events:", str(e))
+            return Response({
+                'error': f'Failed to track events: {str(e)}',
+                'detail': 'An error occurred while tracking the events'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Search Posts View
 @method_decorator(csrf_exempt, name='dispatch')
 class SearchPosts(APIView):
     """
-    View to search posts by content, username, or other criteria.
-    Supports partial matching and case-insensitive search.
+    View to search posts by content or author username.
+    Uses PostgreSQL full-text search: words match as prefixes, results are
+    ranked best first and paginated with a cursor.
     """
     def get(self, request):
         try:
@@ -2106,40 +2441,56 @@ class SearchPosts(APIView):
 
             print(f"Searching for: '{query}'")
 
-            # Search posts by content (case-insensitive partial match)
-            posts_content = Post.objects.filter(content__icontains=query)
-
-            # Search posts by username in user_data JSON field
-            posts_username = Post.objects.filter(user_data__username__icontains=query)
-
-            # Search posts by user's actual username (for non-anonymous posts)
-            posts_user = Post.objects.filter(
-                user__username__icontains=query,
-                is_anonymous=False
-            )
-
-            # Combine all search results using Q objects to avoid union issues
-            from django.db.models import Q
-            combined_query = Q(content__icontains=query) | \
-                           Q(user_data__username__icontains=query) | \
-                           Q(user__username__icontains=query, is_anonymous=False)
+            # Full-text query over the indexed search document (None when the text has no words)
+            search_query = get_search_query(query)
 
-            all_posts = Post.objects.filter(combined_query)
+            # Compact view projects only the feed columns and sends each author once
+            compact = is_compact_view(request)
+            try:
+                fields, exclude = parse_fieldset(request, PostSerializer)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid fields',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if compact:
+                all_posts = prepare_compact_post_queryset(Post.objects.all())
+            else:
+                all_posts = apply_fieldset(prepare_post_queryset(Post.objects.all()), PostSerializer, fields, exclude, required=[get_sort_field(request)])
+
+            # Stream unbounded results, best match first, instead of materializing them
+            if is_stream_request(request):
+                matches = search_posts(all_posts, search_query) if search_query else all_posts.none()
+                return stream_post_feed(
+                    matches.order_by(f'-{SEARCH_RANK_FIELD}', '-id'), compact=compact, fields=fields, exclude=exclude,
+                    extra={'query': query},
+                    summary=lambda count: {'count': count, 'message': f'Found {count} posts matching "{query}"'}
+                )
 
-            # Order by newest first
-            posts = all_posts.order_by('-created_at')
+            # Rank and count the matches in one statement and load one page of them
+            try:
+                posts, pagination = paginate_search(request, all_posts, search_query)
+            except ValueError as e:
+                return Response({
+                    'error': 'Invalid pagination parameters',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            posts_count = pagination['total']
 
-            print(f"Found {posts.count()} posts matching search query")
+            print(f"Found {posts_count} posts matching search query")
 
             # Serialize the posts
-            serializer = PostSerializer(posts, many=True)
+            if compact:
+                feed = serialize_compact_feed(posts)
+            else:
+                feed = {'posts': PostSerializer(posts, many=True, fields=fields, exclude=exclude).data}
             print("Posts serialized successfully")
 
             # Return the search results
             return Response({
-                'message': f'Found {posts.count()} posts matching "{query}"',
-                'posts': serializer.data,
-                'count': posts.count(),
+                'message': f'Found {posts_count} posts matching "{query}"',
+                **feed,
+                **pagination,
                 'query': query
             }, status=status.HTTP_200_OK)
 
@@ -2155,49 +2506,82 @@ class SearchPosts(APIView):
 @method_decorator(csrf_exempt, name='dispatch')
 class GetImpressionsStats(APIView):
     """
-    View to get impressions statistics. Returns total impressions and daily breakdown.
+    View to get impressions statistics for a date range.
+    Accepts ?from=YYYY-MM-DD&to=YYYY-MM-DD (default the last 30 days) and
+    ?bucket=hour|day|week|month (default the coarsest bucket that still shows
+    detail), and returns the range aggregated into at most MAX_SERIES_BUCKETS buckets.
     """
     def get(self, request):
         try:
             print("=== GetImpressionsStats GET request ===")
 
-            # Get all impression records ordered by date (newest first)
-            impressions = DailyImpressions.objects.all().order_by('date')
-
-            # Calculate total impressions
-            total_impressions = DailyImpressions.objects.aggregate(
-                total=models.Sum('impressions')
-            )['total'] or 0
-
-            # Get today's impressions
+            # Answer revalidation requests from the table version (today's figure depends on the date)
             today = timezone.now().date()
-            today_impressions = 0
+            last_updated, total = get_queryset_version(DailyImpressions.objects.all())
+            # Impressions counted on shards but not compacted yet change the figures too
+            shards_updated, shard_count = get_queryset_version(ShardedCounter.objects.filter(
+                models.Q(name__startswith='impressions:') | models.Q(name__startswith='hourly_impressions:')
+            ))
+            # Month buckets read the monthly rollups
+            months_updated, month_count = get_queryset_version(MonthlyImpressions.objects.all())
+            etag = build_etag(
+                request, 'impressions', today.isoformat(), last_updated, total, shards_updated, shard_count,
+                months_updated, month_count
+            )
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
+            # Parse the requested range
             try:
-                today_record = DailyImpressions.objects.get(date=today)
-                today_impressions = today_record.impressions
-            except DailyImpressions.DoesNotExist:
-                pass
-
-            # Serialize the impressions data
-            impressions_data = []
-            for impression in impressions:
-                impressions_data.append({
-                    'date': impression.date.isoformat(),
-                    'impressions': impression.impressions,
-                    'created_at': impression.created_at.isoformat(),
-                    'updated_at': impression.updated_at.isoformat()
-                })
-
-            print(f"Total impressions: {total_impressions}, Today's impressions: {today_impressions}")
+                end = datetime.date.fromisoformat(request.GET['to']) if request.GET.get('to') else today
+                start = datetime.date.fromisoformat(request.GET['from']) if request.GET.get('from') else end - datetime.timedelta(days=29)
+            except ValueError:
+                return Response({
+                    'error': 'Invalid date range',
+                    'detail': 'Please provide "from" and "to" as YYYY-MM-DD dates'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if start > end:
+                return Response({
+                    'error': 'Invalid date range',
+                    'detail': '"from" must not be after "to"'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            bucket = request.GET.get('bucket') or choose_bucket(start, end)
+            if bucket not in IMPRESSION_BUCKETS:
+                return Response({
+                    'error': 'Invalid bucket',
+                    'detail': f'"bucket" must be one of: {", ".join(IMPRESSION_BUCKETS)}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            # Hourly buckets older than the retention period have been pruned
+            if bucket == IMPRESSION_HOUR and start < get_oldest_hourly_date():
+                return Response({
+                    'error': 'Range too old',
+                    'detail': f'Hourly buckets are kept for {settings.IMPRESSIONS_HOURLY_RETENTION_DAYS} days, use a coarser bucket'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if count_buckets(start, end, bucket) > MAX_SERIES_BUCKETS:
+                return Response({
+                    'error': 'Range too large',
+                    'detail': f'The range spans more than {MAX_SERIES_BUCKETS} {bucket} buckets, use a coarser bucket'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            stats = get_impression_stats(start, end, bucket, today)
+            print(f"Impressions from {start} to {end} by {bucket}: {len(stats['series'])} buckets, total {stats['total_impressions']}")
 
             # Return success response
             return Response({
                 'message': 'Impressions statistics fetched successfully',
-                'total_impressions': total_impressions,
-                'today_impressions': today_impressions,
-                'daily_impressions': impressions_data,
-                'count': impressions.count()
-            }, status=status.HTTP_200_OK)
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'bucket': bucket,
+                'total_impressions': stats['total_impressions'],
+                'today_impressions': stats['today_impressions'],
+                'unique_visitors': stats['unique_visitors'],
+                'unique_visitors_today': stats['unique_visitors_today'],
+                'unique_visitors_week': stats['unique_visitors_week'],
+                'unique_visitors_month': stats['unique_visitors_month'],
+                'impressions': stats['series'],
+                'count': len(stats['series'])
+            }, status=status.HTTP_200_OK, headers={'ETag': etag})
 
         except Exception as e:
             print("Error fetching impressions statistics:", str(e))
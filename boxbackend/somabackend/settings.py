@@ -102,6 +102,53 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared Redis cache when REDIS_URL is set (production), otherwise per-process local memory
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Vote write-behind
+# When enabled, vote counter changes are buffered in sharded counter rows (see
+# utilities/vote_utils.py) and written to Post.upvotes/downvotes in batched
+# UPDATEs every VOTE_FLUSH_INTERVAL_MS
+
+VOTE_WRITE_BEHIND = os.getenv("VOTE_WRITE_BEHIND", "false").lower() == "true"
+VOTE_FLUSH_INTERVAL_MS = int(os.getenv("VOTE_FLUSH_INTERVAL_MS", "500"))
+
+
+# Sharded counters
+# Hot counters can spread their increments over SHARDED_COUNTER_SHARDS rows;
+# run `manage.py compact_sharded_counters` periodically to fold them back
+
+SHARDED_COUNTER_SHARDS = int(os.getenv("SHARDED_COUNTER_SHARDS", "16"))
+IMPRESSIONS_SHARDED = os.getenv("IMPRESSIONS_SHARDED", "false").lower() == "true"
+
+# Impression batching
+# Unsharded impressions are counted in memory per worker and upserted into
+# HourlyImpressions and DailyImpressions every IMPRESSIONS_FLUSH_INTERVAL_MS
+# (and on worker shutdown). Run `manage.py rollup_impressions` periodically to
+# build MonthlyImpressions and drop hourly buckets older than the retention
+
+IMPRESSIONS_FLUSH_INTERVAL_MS = int(os.getenv("IMPRESSIONS_FLUSH_INTERVAL_MS", "1000"))
+IMPRESSIONS_HOURLY_RETENTION_DAYS = int(os.getenv("IMPRESSIONS_HOURLY_RETENTION_DAYS", "14"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -166,6 +213,12 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
     'cache-control',
     'x-file-name',
+    'if-none-match',
+]
+
+# Response headers readable by frontend JavaScript (conditional GET)
+CORS_EXPOSE_HEADERS = [
+    'etag',
 ]
 
 # Allow all HTTP methods
@@ -17,6 +17,7 @@ import {
     ChartTooltipContent,
 } from "@/components/ui/chart"
 import { useEffect, useState } from "react"
+import { fetchDashboardSummary } from "@/lib/dashboard-summary"
 
 export const description = "An interactive bar chart"
 
@@ -60,18 +61,13 @@ export function ChartBarInteractive() {
         try {
             setImpressionStats((prev) => ({ ...prev, loading: true, error: null }))
 
-            const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/somaapp/get-impressions-stats/`)
+            // Last year of impressions in weekly buckets, shared with the stat cards' summary request
+            const data = (await fetchDashboardSummary()).impressions
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`)
-            }
-
-            const data = await response.json()
-
-            // Process daily impressions data for chart
-            const processedChartData = (data.daily_impressions || []).map(
-                (item: { date: string; impressions?: number }) => ({
-                    date: item.date,
+            // Process impressions buckets for chart (each period is the first day of its week)
+            const processedChartData = (data.impressions || []).map(
+                (item: { period: string; impressions?: number }) => ({
+                    date: item.period,
                     impressions: item.impressions ?? 0,
                 })
             )
@@ -79,7 +75,7 @@ export function ChartBarInteractive() {
             setImpressionStats({
                 total_impressions: data.total_impressions || 0,
                 today_impressions: data.today_impressions || 0,
-                daily_impressions: data.daily_impressions || [],
+                daily_impressions: processedChartData,
                 loading: false,
                 error: null
             })
@@ -90,7 +86,7 @@ export function ChartBarInteractive() {
             // Log the data for debugging
             // console.log('--------------------Total impressions:', data.total_impressions);
             // console.log('--------------------Today impressions:', data.today_impressions);
-            // console.log('--------------------Daily breakdown:', data.daily_impressions);
+            // console.log('--------------------Weekly breakdown:', data.impressions);
             // console.log('--------------------Processed chart data:', processedChartData);
 
         } catch (error) {
@@ -119,7 +115,7 @@ export function ChartBarInteractive() {
                 <div className="flex flex-1 flex-col font-comfortaa justify-center gap-1 px-6 pt-4 pb-3 sm:!py-0">
                     <CardTitle>App Impressions</CardTitle>
                     <CardDescription>
-                        Showing total impressions over time
+                        Showing weekly impressions over the last year
                     </CardDescription>
                 </div>
                 <div className="flex">
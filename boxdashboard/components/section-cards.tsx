@@ -8,6 +8,7 @@ import {
     CardHeader,
     CardTitle,
 } from "@/components/ui/card"
+import { fetchDashboardSummary } from "@/lib/dashboard-summary"
 
 interface UserStats {
     total_users: number
@@ -50,46 +51,38 @@ export function SectionCards() {
     const [loading, setLoading] = useState(true)
     const [error, setError] = useState<string | null>(null)
 
-    // Function to fetch user statistics from backend
-    const fetchUserStats = async () => {
-        let response: Response | undefined = undefined
+    // Function to fetch every statistic from the backend in one dashboard summary request
+    const fetchAllStats = async (force = false) => {
         try {
             setLoading(true)
             setError(null)
 
-            response = await fetch('http://localhost:8000/somaapp/get-user-stats/', {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                credentials: 'include', // Include cookies for authentication if needed
-            })
+            const data = await fetchDashboardSummary(force)
+            // console.log('Dashboard summary data:', data)
 
-            if (!response.ok) {
-                await response.text()
-                throw new Error(`HTTP error! status: ${response.status} - ${response.statusText}`)
+            if (data.message !== 'Dashboard summary fetched successfully') {
+                throw new Error('Failed to fetch dashboard statistics')
             }
 
-            const data = await response.json()
-            // console.log('API response data:', data)
-
-            if (data.message === 'User statistics fetched successfully') {
-                setUserStats({
-                    total_users: data.total_users,
-                    growth_percentage: data.growth_percentage,
-                    growth_direction: data.growth_direction,
-                    current_month_users: data.current_month_users,
-                    previous_month_users: data.previous_month_users
-                })
-            } else {
-                throw new Error('Failed to fetch user statistics')
-            }
+            setUserStats({
+                total_users: data.users.total_users,
+                growth_percentage: data.users.growth_percentage,
+                growth_direction: data.users.growth_direction,
+                current_month_users: data.users.current_month_users,
+                previous_month_users: data.users.previous_month_users
+            })
+            setPartyStats({
+                total_parties: data.parties.total_parties,
+                growth_percentage: data.parties.growth_percentage,
+                growth_direction: data.parties.growth_direction
+            })
+            setCandidateStats({
+                total_candidates: data.candidates.total_candidates,
+                growth_percentage: data.candidates.growth_percentage,
+                growth_direction: data.candidates.growth_direction
+            })
         } catch (err) {
-            console.error('Error fetching user statistics:', err)
-            if (response) {
-                // console.error('Response status:', response.status)
-                // console.error('Response statusText:', response.statusText)
-            }
+            console.error('Error fetching dashboard statistics:', err)
             setError(err instanceof Error ? err.message : 'Unknown error occurred')
             // Set fallback data on error
             setUserStats({
@@ -99,116 +92,23 @@ export function SectionCards() {
                 current_month_users: 0,
                 previous_month_users: 0
             })
-        } finally {
-            setLoading(false)
-        }
-    }
-
-    // Function to fetch party statistics from backend
-    const fetchPartyStats = async () => {
-        let response: Response | undefined = undefined
-        try {
-            response = await fetch('http://localhost:8000/somaapp/get-party-stats/', {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                credentials: 'include',
-            })
-
-            if (!response.ok) {
-                await response.text()
-                throw new Error(`HTTP error! status: ${response.status} - ${response.statusText}`)
-            }
-
-            const data = await response.json()
-            // console.log('Party API response data:', data)
-
-            if (data.message === 'Party statistics fetched successfully') {
-                setPartyStats({
-                    total_parties: data.total_parties,
-                    growth_percentage: data.growth_percentage,
-                    growth_direction: data.growth_direction
-                })
-            } else {
-                throw new Error('Failed to fetch party statistics')
-            }
-        } catch (err) {
-            console.error('Error fetching party statistics:', err)
-            if (response) {
-                // console.error('Response status:', response.status)
-                // console.error('Response statusText:', response.statusText)
-            }
-            // Set fallback data on error
             setPartyStats({
                 total_parties: 45,
                 growth_percentage: 12.5,
                 growth_direction: 'up'
             })
-        }
-    }
-
-    // Function to fetch candidate statistics from backend
-    const fetchCandidateStats = async () => {
-        let response: Response | undefined = undefined
-        try {
-            response = await fetch('http://localhost:8000/somaapp/get-candidate-stats/', {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                credentials: 'include',
-            })
-
-            if (!response.ok) {
-                await response.text()
-                throw new Error(`HTTP error! status: ${response.status} - ${response.statusText}`)
-            }
-
-            const data = await response.json()
-            // console.log('Candidate API response data:', data)
-
-            if (data.message === 'Candidate statistics fetched successfully') {
-                setCandidateStats({
-                    total_candidates: data.total_candidates,
-                    growth_percentage: data.growth_percentage,
-                    growth_direction: data.growth_direction
-                })
-            } else {
-                throw new Error('Failed to fetch candidate statistics')
-            }
-        } catch (err) {
-            console.error('Error fetching candidate statistics:', err)
-            if (response) {
-                // console.error('Response status:', response.status)
-                // console.error('Response statusText:', response.statusText)
-            }
-            // Set fallback data on error
             setCandidateStats({
                 total_candidates: 23,
                 growth_percentage: 4.5,
                 growth_direction: 'up'
             })
+        } finally {
+            setLoading(false)
         }
     }
 
     // Fetch all statistics on component mount
     useEffect(() => {
-        const fetchAllStats = async () => {
-            setLoading(true)
-            try {
-                await Promise.all([
-                    fetchUserStats(),
-                    fetchPartyStats(),
-                    fetchCandidateStats()
-                ])
-            } catch (error) {
-                // console.error('Error fetching statistics:', error)
-            } finally {
-                setLoading(false)
-            }
-        }
-        
         fetchAllStats()
     }, [])
 
@@ -239,7 +139,7 @@ export function SectionCards() {
                         <div className="text-muted-foreground text-xs">
                             <span className="text-red-500">Error: {error}</span>
                             <button
-                                onClick={fetchUserStats}
+                                onClick={() => fetchAllStats(true)}
                                 className="ml-2 text-blue-500 hover:text-blue-700 underline"
                             >
                                 Retry
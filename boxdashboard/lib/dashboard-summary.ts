@@ -0,0 +1,37 @@
+// Every dashboard tile comes from one get-dashboard-summary request. Components
+// mounting together share the request in flight instead of each firing their own.
+
+const SUMMARY_URL = `${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/somaapp/get-dashboard-summary/`
+
+// How long a fetched summary is reused (matches the backend cache lifetime)
+const SUMMARY_MAX_AGE_MS = 30_000
+
+let pending: Promise<any> | null = null
+let fetchedAt = 0
+
+export function fetchDashboardSummary(force = false): Promise<any> {
+    if (pending && !force && Date.now() - fetchedAt < SUMMARY_MAX_AGE_MS) {
+        return pending
+    }
+
+    fetchedAt = Date.now()
+    pending = fetch(SUMMARY_URL, {
+        method: 'GET',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        credentials: 'include',
+    }).then(async (response) => {
+        if (!response.ok) {
+            await response.text()
+            throw new Error(`HTTP error! status: ${response.status} - ${response.statusText}`)
+        }
+        return response.json()
+    })
+
+    // A failed request should not be reused
+    pending.catch(() => {
+        pending = null
+    })
+    return pending
+}
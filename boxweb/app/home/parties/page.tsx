@@ -28,6 +28,7 @@ import { useAppSelector } from "@/redux/hooks";
 import { InstagramCarousel } from '@/components/ui/instagram-carousel';
 import * as React from "react";
 import { toast, Toaster } from 'sonner';
+import { fetchPostComments, getAvatarSrc } from '@/lib/soma-api';
 import {
     Drawer,
     DrawerClose,
@@ -473,6 +474,7 @@ interface Post {
     updated_at: string;
     upvotes: number;
     downvotes: number;
+    comment_count: number;
     comments: any[];
     parties?: Party[];
 }
@@ -679,7 +681,7 @@ const getUserDisplayName = (user: User): string => {
 // Function to get user profile picture with fallback
 const getUserProfilePicture = (user: User): string => {
     if (user.profile_picture && user.profile_picture.trim()) {
-        return user.profile_picture;
+        return getAvatarSrc(user.profile_picture);
     }
     // Return a default avatar or use Unsplash placeholder
     return `https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face`;
@@ -831,7 +833,7 @@ export default function InboxPage() {
     };
 
     const getUserProfilePicture = (user: User) => {
-        return user.profile_picture || "https://images.unsplash.com/photo-1494790108377-be9c29b29330?w=200&h=200&fit=crop";
+        return user.profile_picture ? getAvatarSrc(user.profile_picture) : "https://images.unsplash.com/photo-1494790108377-be9c29b29330?w=200&h=200&fit=crop";
     };
 
     // Function to filter candidates based on selected tab
@@ -1335,10 +1337,17 @@ export default function InboxPage() {
         }
     };
 
-    const handleComment = (post: Post) => {
+    const handleComment = async (post: Post) => {
         console.log('💬 Commenting on post:', post.id);
         setSelectedPostForComment(post);
         setCommentDrawerOpen(true);
+        // Posts only embed their first comments; load the full thread for the drawer
+        try {
+            const comments = await fetchPostComments(post.id);
+            setSelectedPostForComment((prev) => (prev && prev.id === post.id ? { ...prev, comments } : prev));
+        } catch (err) {
+            console.error('Error fetching comments:', err);
+        }
     };
 
     const handleSubmitComment = async () => {
@@ -1375,14 +1384,15 @@ export default function InboxPage() {
                     const updatedComments = [...(selectedPostForComment.comments || []), data.comment];
                     setSelectedPostForComment({
                         ...selectedPostForComment,
-                        comments: updatedComments
+                        comments: updatedComments,
+                        comment_count: (selectedPostForComment.comment_count ?? 0) + 1
                     });
 
                     // Also update the post in the main posts list
                     setPosts(prevPosts =>
                         prevPosts.map(post =>
                             post.id === selectedPostForComment.id
-                                ? { ...post, comments: updatedComments }
+                                ? { ...post, comments: updatedComments, comment_count: (post.comment_count ?? 0) + 1 }
                                 : post
                         )
                     );
@@ -1933,7 +1943,7 @@ export default function InboxPage() {
                                                     title="Comment"
                                                 >
                                                     <MessageCircle className="w-5 h-5" />
-                                                    <span className="text-sm font-medium text-gray-700">{post.comments?.length || 0}</span>
+                                                    <span className="text-sm font-medium text-gray-700">{post.comment_count ?? post.comments?.length ?? 0}</span>
                                                 </button>
                                         </div>
                                         <button className="text-gray-600 hover:text-blue-500 transition-colors">
@@ -2183,10 +2193,7 @@ export default function InboxPage() {
                                             <div className="w-8 h-8 rounded-full overflow-hidden bg-gray-200">
                                                 {comment.profile_picture ? (
                                                     <Image
-                                                        src={comment.profile_picture.startsWith('data:')
-                                                            ? comment.profile_picture
-                                                            : `data:image/jpeg;base64,${comment.profile_picture}`
-                                                        }
+                                                        src={getAvatarSrc(comment.profile_picture)}
                                                         alt={comment.full_name || comment.username || 'User'}
                                                         width={32}
                                                         height={32}
@@ -9,6 +9,7 @@ import { useRouter } from "next/navigation";
 import { useState, useEffect, useRef } from "react";
 import useWindowSize from "@/hooks/useWindow";
 import Image from "next/image";
+import { getAvatarSrc } from "@/lib/soma-api";
 
 
 
@@ -30,20 +31,30 @@ export default function SearchPage() {
     const [searchResults, setSearchResults] = useState<any[]>([]);
     const [isLoading, setIsLoading] = useState(false);
     const [error, setError] = useState("");
+    // Results come one page at a time, best match first
+    const [searchTotal, setSearchTotal] = useState(0);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const searchInputRef = useRef<HTMLInputElement>(null);
 
-    // Function to search posts
-    const searchPosts = async (query: string) => {
+    // Function to search posts (pass the previous page's cursor to load the next page)
+    const searchPosts = async (query: string, cursor: string | null = null) => {
         if (!query.trim()) {
             setSearchResults([]);
+            setNextCursor(null);
             return;
         }
 
-        setIsLoading(true);
+        if (cursor) {
+            setIsLoadingMore(true);
+        } else {
+            setIsLoading(true);
+        }
         setError("");
 
         try {
-            const response = await fetch(`http://127.0.0.1:8000/somaapp/search-posts/?q=${encodeURIComponent(query)}`, {
+            const page = `cursor=${encodeURIComponent(cursor ?? '')}`;
+            const response = await fetch(`http://127.0.0.1:8000/somaapp/search-posts/?q=${encodeURIComponent(query)}&${page}`, {
                 method: 'GET',
                 headers: {
                     'Content-Type': 'application/json',
@@ -55,7 +66,10 @@ export default function SearchPage() {
             }
 
             const data = await response.json();
-            setSearchResults(data.posts || []);
+            const posts = data.posts || [];
+            setSearchResults(previous => cursor ? [...previous, ...posts] : posts);
+            setSearchTotal(data.total ?? posts.length);
+            setNextCursor(data.has_next ? data.next_cursor : null);
         } catch (err) {
             console.error('Search error:', err);
             if (err instanceof Error) {
@@ -71,9 +85,14 @@ export default function SearchPage() {
             } else {
                 setError('Failed to search posts. Please try again.');
             }
-            setSearchResults([]);
+            // A failed "load more" keeps the results already shown
+            if (!cursor) {
+                setSearchResults([]);
+                setNextCursor(null);
+            }
         } finally {
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     };
 
@@ -89,6 +108,7 @@ export default function SearchPage() {
                 searchPosts(searchQuery);
             } else {
                 setSearchResults([]);
+                setNextCursor(null);
             }
         }, 300); // 300ms debounce
 
@@ -159,7 +179,7 @@ export default function SearchPage() {
                             {!isLoading && searchResults.length > 0 && (
                                 <>
                                     <div className="text-sm text-gray-600">
-                                        Found {searchResults.length} result{searchResults.length !== 1 ? 's' : ''} for "{searchQuery}"
+                                        Found {searchTotal} result{searchTotal !== 1 ? 's' : ''} for "{searchQuery}"
                                     </div>
                                     {searchResults.map((post) => (
                                         <div
@@ -171,10 +191,7 @@ export default function SearchPage() {
                                                 <div className="w-10 h-10 bg-blue-50 dark:bg-blue-900/20 rounded-full flex items-center justify-center text-sm font-medium overflow-hidden">
                                                     {post.profile_picture ? (
                                                         <Image
-                                                            src={post.profile_picture.startsWith('data:')
-                                                                ? post.profile_picture
-                                                                : `data:image/jpeg;base64,${post.profile_picture}`
-                                                            }
+                                                            src={getAvatarSrc(post.profile_picture)}
                                                             alt={post.username}
                                                             width={40}
                                                             height={40}
@@ -286,15 +303,25 @@ export default function SearchPage() {
                                                     <span>👎</span>
                                                     <span>{post.downvotes || 0}</span>
                                                 </span>
-                                                {post.comments && post.comments.length > 0 && (
+                                                {post.comment_count > 0 && (
                                                     <span className="flex items-center space-x-1">
                                                         <span>💬</span>
-                                                        <span>{post.comments.length}</span>
+                                                        <span>{post.comment_count}</span>
                                                     </span>
                                                 )}
                                             </div>
                             </div>
                                     ))}
+                                    {nextCursor && (
+                                        <Button
+                                            variant="outline"
+                                            className="w-full"
+                                            disabled={isLoadingMore}
+                                            onClick={() => searchPosts(searchQuery, nextCursor)}
+                                        >
+                                            {isLoadingMore ? 'Loading...' : 'Load more results'}
+                                        </Button>
+                                    )}
                                 </>
                             )}
 
@@ -29,6 +29,7 @@ import {
     DrawerTitle,
 } from '@/components/ui/drawer';
 import { toast } from 'sonner';
+import { fetchPostComments, getAvatarSrc } from '@/lib/soma-api';
 import { Toaster } from '@/components/ui/sonner';
 import { NotificationsDialog } from '@/components/PodcastsPage/notificationsDialog';
 import { SearchQueryDialog } from '@/components/PodcastsPage/searchQueryDialog';
@@ -60,6 +61,7 @@ interface Post {
     created_at: string;
     upvotes: number;
     downvotes: number;
+    comment_count: number;
     comments: any[];
 }
 
@@ -103,7 +105,7 @@ const getUserDisplayName = (user: User): string => {
 };
 
 const getUserProfilePicture = (user: User): string => {
-    if (user.profile_picture && String(user.profile_picture).trim()) return user.profile_picture;
+    if (user.profile_picture && String(user.profile_picture).trim()) return getAvatarSrc(user.profile_picture);
     return `https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face`;
 };
 
@@ -258,9 +260,16 @@ export default function UserProfileByIdPage() {
         }
     };
 
-    const handleComment = (post: Post) => {
+    const handleComment = async (post: Post) => {
         setSelectedPostForComment(post);
         setCommentDrawerOpen(true);
+        // Posts only embed their first comments; load the full thread for the drawer
+        try {
+            const comments = await fetchPostComments(post.id);
+            setSelectedPostForComment((prev) => (prev && prev.id === post.id ? { ...prev, comments } : prev));
+        } catch (err) {
+            console.error('Error fetching comments:', err);
+        }
     };
 
     const handleSubmitComment = async () => {
@@ -758,7 +767,7 @@ export default function UserProfileByIdPage() {
                                                                         >
                                                                             <MessageCircle className="w-5 h-5" />
                                                                             <span className="text-sm font-medium text-gray-700">
-                                                                                {post.comments?.length ?? 0}
+                                                                                {post.comment_count ?? post.comments?.length ?? 0}
                                                                             </span>
                                                                         </button>
                                                                     </div>
@@ -876,11 +885,7 @@ export default function UserProfileByIdPage() {
                                             <div className="w-8 h-8 rounded-full overflow-hidden bg-gray-200">
                                                 {comment.profile_picture ? (
                                                     <Image
-                                                        src={
-                                                            comment.profile_picture.startsWith('data:')
-                                                                ? comment.profile_picture
-                                                                : `data:image/jpeg;base64,${comment.profile_picture}`
-                                                        }
+                                                        src={getAvatarSrc(comment.profile_picture)}
                                                         alt={comment.full_name || comment.username || 'User'}
                                                         width={32}
                                                         height={32}
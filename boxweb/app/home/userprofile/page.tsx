@@ -38,6 +38,7 @@ import {
     DrawerTitle,
 } from '@/components/ui/drawer';
 import { toast } from 'sonner';
+import { fetchPostComments, getAvatarSrc } from '@/lib/soma-api';
 import { Toaster } from '@/components/ui/sonner';
 
 const categories = [
@@ -99,6 +100,7 @@ interface Post {
     updated_at: string;
     upvotes: number;
     downvotes: number;
+    comment_count: number;
     comments: any[];
     parties?: any[];
 }
@@ -166,7 +168,7 @@ const getUserDisplayName = (user: User): string => {
 };
 
 const getUserProfilePicture = (user: User): string => {
-    if (user.profile_picture && String(user.profile_picture).trim()) return user.profile_picture;
+    if (user.profile_picture && String(user.profile_picture).trim()) return getAvatarSrc(user.profile_picture);
     return `https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face`;
 };
 
@@ -287,9 +289,16 @@ export default function PodcastsPage() {
         }
     };
 
-    const handleComment = (post: Post) => {
+    const handleComment = async (post: Post) => {
         setSelectedPostForComment(post);
         setCommentDrawerOpen(true);
+        // Posts only embed their first comments; load the full thread for the drawer
+        try {
+            const comments = await fetchPostComments(post.id);
+            setSelectedPostForComment((prev) => (prev && prev.id === post.id ? { ...prev, comments } : prev));
+        } catch (err) {
+            console.error('Error fetching comments:', err);
+        }
     };
 
     const handleSubmitComment = async () => {
@@ -782,7 +791,7 @@ export default function PodcastsPage() {
                                                                         title="Comment"
                                                                     >
                                                                         <MessageCircle className="w-5 h-5" />
-                                                                        <span className="text-sm font-medium text-gray-700">{post.comments?.length ?? 0}</span>
+                                                                        <span className="text-sm font-medium text-gray-700">{post.comment_count ?? post.comments?.length ?? 0}</span>
                                                                     </button>
                                                                 </div>
                                                             </div>
@@ -905,7 +914,7 @@ export default function PodcastsPage() {
                                                 <div className="w-8 h-8 rounded-full overflow-hidden bg-gray-200">
                                                     {comment.profile_picture ? (
                                                         <Image
-                                                            src={comment.profile_picture.startsWith('data:') ? comment.profile_picture : `data:image/jpeg;base64,${comment.profile_picture}`}
+                                                            src={getAvatarSrc(comment.profile_picture)}
                                                             alt={comment.full_name || comment.username || 'User'}
                                                             width={32}
                                                             height={32}
@@ -10,6 +10,7 @@ import { Separator } from "@/components/ui/separator";
 import { Drawer, DrawerContent, DrawerHeader, DrawerTitle, DrawerDescription, DrawerFooter, DrawerClose } from "@/components/ui/drawer";
 // import { Textarea } from "@/components/ui/textarea"; // Not available, using native textarea
 import { useAuth } from "@/context/auth-context";
+import { fetchPostComments, getAvatarSrc } from "@/lib/soma-api";
 import Image from 'next/image';
 
 interface Post {
@@ -34,6 +35,7 @@ interface Post {
     updated_at: string;
     upvotes: number;
     downvotes: number;
+    comment_count: number;
     comments: any[];
 }
 
@@ -89,7 +91,9 @@ export default function PostDetailsPage() {
                 if (!foundPost) {
                     setError('Post not found');
                 } else {
-                    setPost(foundPost);
+                    // The feed only embeds the first comments; load the full thread
+                    const comments = await fetchPostComments(foundPost.id);
+                    setPost({ ...foundPost, comments });
                 }
             } catch (err) {
                 console.error('Error fetching post:', err);
@@ -123,6 +127,7 @@ export default function PostDetailsPage() {
                 headers: {
                     'Content-Type': 'application/json',
                 },
+                credentials: 'include',
             });
 
             if (!response.ok) {
@@ -169,6 +174,7 @@ export default function PostDetailsPage() {
                 headers: {
                     'Content-Type': 'application/json',
                 },
+                credentials: 'include',
             });
 
             if (!response.ok) {
@@ -235,7 +241,8 @@ export default function PostDetailsPage() {
                 if (data.comment) {
                     setPost(prev => prev ? {
                         ...prev,
-                        comments: [...(prev.comments || []), data.comment]
+                        comments: [...(prev.comments || []), data.comment],
+                        comment_count: (prev.comment_count ?? prev.comments?.length ?? 0) + 1
                     } : null);
                 }
 
@@ -317,10 +324,7 @@ export default function PostDetailsPage() {
                                             </AvatarFallback>
                                         ) : post.user_data?.profilePicture ? (
                                             <AvatarImage
-                                                src={post.user_data.profilePicture.startsWith('data:')
-                                                    ? post.user_data.profilePicture
-                                                    : `data:image/jpeg;base64,${post.user_data.profilePicture}`
-                                                }
+                                                src={getAvatarSrc(post.user_data.profilePicture)}
                                                 alt={post.user_data.fullName || post.user_data.username}
                                             />
                                         ) : (
@@ -461,7 +465,7 @@ export default function PostDetailsPage() {
                                         title="Comment"
                                     >
                                         <MessageCircle className="w-5 h-5" />
-                                        <span className="text-sm font-medium text-gray-700">{post.comments?.length || 0}</span>
+                                        <span className="text-sm font-medium text-gray-700">{post.comment_count ?? post.comments?.length ?? 0}</span>
                                     </button>
                                 </div>
                             </CardContent>
@@ -490,7 +494,7 @@ export default function PostDetailsPage() {
                                 </div>
                                 <div className="flex justify-between text-sm">
                                     <span className="text-muted-foreground">Comments</span>
-                                    <span>{post.comments?.length || 0}</span>
+                                    <span>{post.comment_count ?? post.comments?.length ?? 0}</span>
                                 </div>
                                 {post.is_anonymous && (
                                     <div className="flex justify-between text-sm">
@@ -512,10 +516,7 @@ export default function PostDetailsPage() {
                                         <Avatar className="w-10 h-10">
                                             {post.user_data?.profilePicture ? (
                                                 <AvatarImage
-                                                    src={post.user_data.profilePicture.startsWith('data:')
-                                                        ? post.user_data.profilePicture
-                                                        : `data:image/jpeg;base64,${post.user_data.profilePicture}`
-                                                    }
+                                                    src={getAvatarSrc(post.user_data.profilePicture)}
                                                     alt={post.user_data.fullName || post.user_data.username}
                                                 />
                                             ) : (
@@ -561,12 +562,10 @@ export default function PostDetailsPage() {
                                                 </div>
                                             ) : post.user_data?.profilePicture ? (
                                                 <Image
-                                                    src={post.user_data.profilePicture.startsWith('data:')
-                                                        ? post.user_data.profilePicture
-                                                        : `data:image/jpeg;base64,${post.user_data.profilePicture}`
-                                                    }
+                                                    src={getAvatarSrc(post.user_data.profilePicture)}
                                                     alt={post.user_data.fullName || post.user_data.username}
                                                     width={32}
+                                                    unoptimized
                                                     height={32}
                                                     className="object-cover"
                                                 />
@@ -603,12 +602,10 @@ export default function PostDetailsPage() {
                                             <Avatar className="w-8 h-8">
                                                 {comment.profile_picture ? (
                                                     <Image
-                                                        src={comment.profile_picture.startsWith('data:')
-                                                            ? comment.profile_picture
-                                                            : `data:image/jpeg;base64,${comment.profile_picture}`
-                                                        }
+                                                        src={getAvatarSrc(comment.profile_picture)}
                                                         alt={comment.full_name || comment.username || 'User'}
                                                         width={32}
+                                                        unoptimized
                                                         height={32}
                                                         className="object-cover"
                                                     />
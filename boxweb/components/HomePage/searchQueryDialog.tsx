@@ -28,19 +28,29 @@ export function SearchQueryDialog({
     const [searchResults, setSearchResults] = useState<any[]>([]);
     const [isLoading, setIsLoading] = useState(false);
     const [error, setError] = useState("");
+    // Results come one page at a time, best match first
+    const [searchTotal, setSearchTotal] = useState(0);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
 
-    // Function to search posts
-    const searchPosts = async (query: string) => {
+    // Function to search posts (pass the previous page's cursor to load the next page)
+    const searchPosts = async (query: string, cursor: string | null = null) => {
         if (!query.trim()) {
             setSearchResults([]);
+            setNextCursor(null);
             return;
         }
 
-        setIsLoading(true);
+        if (cursor) {
+            setIsLoadingMore(true);
+        } else {
+            setIsLoading(true);
+        }
         setError("");
 
         try {
-            const response = await fetch(`http://127.0.0.1:8000/somaapp/search-posts/?q=${encodeURIComponent(query)}`, {
+            const page = `cursor=${encodeURIComponent(cursor ?? '')}`;
+            const response = await fetch(`http://127.0.0.1:8000/somaapp/search-posts/?q=${encodeURIComponent(query)}&${page}`, {
                 method: 'GET',
                 headers: {
                     'Content-Type': 'application/json',
@@ -52,7 +62,10 @@ export function SearchQueryDialog({
             }
 
             const data = await response.json();
-            setSearchResults(data.posts || []);
+            const posts = data.posts || [];
+            setSearchResults(previous => cursor ? [...previous, ...posts] : posts);
+            setSearchTotal(data.total ?? posts.length);
+            setNextCursor(data.has_next ? data.next_cursor : null);
         } catch (err) {
             console.error('Search error:', err);
             if (err instanceof Error) {
@@ -68,9 +81,14 @@ export function SearchQueryDialog({
             } else {
                 setError('Failed to search posts. Please try again.');
             }
-            setSearchResults([]);
+            // A failed "load more" keeps the results already shown
+            if (!cursor) {
+                setSearchResults([]);
+                setNextCursor(null);
+            }
         } finally {
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     };
 
@@ -89,6 +107,7 @@ export function SearchQueryDialog({
                 searchPosts(searchQuery);
             } else {
                 setSearchResults([]);
+                setNextCursor(null);
             }
         }, 300); // 300ms debounce
 
@@ -100,6 +119,7 @@ export function SearchQueryDialog({
         if (!searchQueryModal) {
             setSearchQuery("");
             setSearchResults([]);
+            setNextCursor(null);
             setError("");
         }
     }, [searchQueryModal]);
@@ -150,7 +170,7 @@ export function SearchQueryDialog({
                             {!isLoading && searchResults.length > 0 && (
                                 <div className="space-y-4">
                                     <div className="text-sm text-gray-600 px-3">
-                                        Found {searchResults.length} result{searchResults.length !== 1 ? 's' : ''} for "{searchQuery}"
+                                        Found {searchTotal} result{searchTotal !== 1 ? 's' : ''} for "{searchQuery}"
                                     </div>
                                     {searchResults.map((post) => (
                                         <div
@@ -185,12 +205,22 @@ export function SearchQueryDialog({
                                             <div className="flex items-center space-x-4 mt-2 text-xs text-gray-500">
                                                 <span>👍 {post.upvotes || 0}</span>
                                                 <span>👎 {post.downvotes || 0}</span>
-                                                {post.comments && post.comments.length > 0 && (
-                                                    <span>💬 {post.comments.length}</span>
+                                                {post.comment_count > 0 && (
+                                                    <span>💬 {post.comment_count}</span>
                                                 )}
                                             </div>
                                         </div>
                                     ))}
+                                    {nextCursor && (
+                                        <Button
+                                            variant="outline"
+                                            className="w-full"
+                                            disabled={isLoadingMore}
+                                            onClick={() => searchPosts(searchQuery, nextCursor)}
+                                        >
+                                            {isLoadingMore ? 'Loading...' : 'Load more results'}
+                                        </Button>
+                                    )}
                                 </div>
                             )}
                         </div>
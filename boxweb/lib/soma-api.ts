@@ -116,3 +116,47 @@ export async function fetchCandidateById(id: number): Promise<Candidate | null>
     const candidates = await fetchAllCandidates();
     return candidates.find((c) => c.id === id) ?? null;
 }
+
+// Interface for one page of the get-post-comments endpoint
+export interface GetPostCommentsResponse {
+    message: string;
+    comments: any[];
+    post_id: number;
+    total: number;
+    count: number;
+    has_next: boolean;
+    next_cursor: string | null;
+}
+
+// Post lists only embed a post's first comments; this loads all of them page by page
+export async function fetchPostComments(postId: number | string): Promise<any[]> {
+    const comments: any[] = [];
+    let cursor: string | null = null;
+    do {
+        const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`${API_BASE_URL}/somaapp/get-post-comments/${postId}/${query}`, {
+            method: 'GET',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            credentials: 'include',
+        });
+
+        if (!response.ok) {
+            const errorText = await response.text();
+            throw new Error(`HTTP error! status: ${response.status} - ${errorText}`);
+        }
+
+        const data: GetPostCommentsResponse = await response.json();
+        comments.push(...data.comments);
+        cursor = data.has_next ? data.next_cursor : null;
+    } while (cursor);
+    return comments;
+}
+
+// Avatars are served as URLs by the API; older snapshots may still hold base64
+export function getAvatarSrc(picture: string): string {
+    if (picture.startsWith('data:') || picture.startsWith('http')) return picture;
+    if (picture.startsWith('/')) return `${API_BASE_URL}${picture}`;
+    return `data:image/jpeg;base64,${picture}`;
+}